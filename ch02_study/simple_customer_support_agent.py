@@ -1,10 +1,20 @@
 from typing import TypedDict, Annotated, Sequence
 import operator
+from functools import lru_cache
 from langchain.tools import tool
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage, ToolMessage
-from langgraph.graph import StateGraph
-from langchain_groq import ChatGroq  # 이 줄을 꼭 추가해야 합니다!
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+from langgraph.graph import StateGraph, END
+
+import sys
+from pathlib import Path
+
+# 저장소 루트의 공통 모듈(common/)을 가져올 수 있도록 경로를 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.checkpoint import checkpointer_from_env, invoke_resumable, new_thread_id  # noqa: E402
+from common.llm import create_chat_model  # noqa: E402
+from common.tool_cache import cache_policy, default_executor  # noqa: E402
+from common.tracing import get_tracer, traced_node  # noqa: E402
+from common.usage import request_scope, usage_tracker  # noqa: E402
 
 # 환경변수 확인
 import os
@@ -26,6 +36,8 @@ class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
 
 # -- 1) 주문 취소 도구 정의
+# 주문 상태를 바꾸는 도구이므로 결과를 절대 캐시하지 않습니다.
+@cache_policy(side_effects=True)
 @tool
 def cancel_order(order_id: str) -> str:
     """배송되지 않은 주문을 취소합니다."""
@@ -33,19 +45,18 @@ def cancel_order(order_id: str) -> str:
     return f"주문 {order_id}이(가) 취소되었습니다."
 
 
-# -- 2) 에이전트 구조 정의: LLM 호출, 도구 실행, 다시 LLM 호출
-def call_model(state):
-    msgs = state["messages"]
-    order = state.get("order", {"order_id": "UNKNOWN"})
+# -- 2) 에이전트 구조 정의: LLM 호출(분류), 도구 실행, 다시 LLM 호출(답변)
+# 단계마다 노드를 나누므로 노드가 끝날 때마다 체크포인트가 저장됩니다.
+# 중단된 실행을 이어서 하면 이미 끝난 LLM 호출과 주문 취소(부작용)를 다시 하지 않습니다.
+# 모델은 import 시점이 아니라 첫 호출 때 한 번만 만들고 이후 호출에서 재사용합니다.
+@lru_cache(maxsize=None)
+def get_llm():
+    # LLM 초기화 (Groq llama-3.3-70b, 응답 캐시 적용)
+    llm = create_chat_model()
+    return llm, llm.bind_tools([cancel_order]) # 도구 바인딩
 
-    # LLM 초기화
-    # LLM 초기화 (Google Gemini 무료 모델 사용)
-    llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0
-    )
-
-    llm_with_tools = llm.bind_tools([cancel_order]) # 도구 바인딩
+def with_system_prompt(state):
+    order = state.get("order", {"order_id": "UNKNOWN"})
 
     # 시스템 프롬프트는 모델이 할 일을 정확히 알려줍니다
     prompt = (
@@ -55,32 +66,45 @@ def call_model(state):
         간단한 확인 메시지를 보내세요.
         그렇지 않으면 일반적으로 응답하세요.'''
     )
-    full = [SystemMessage(content=prompt)] + msgs
+    return [SystemMessage(content=prompt)] + list(state["messages"])
 
+def classify_request(state):
     # 1차 LLM 패스: 도구 호출 여부 결정
-    first = llm_with_tools.invoke(full)
-    out = [first]
+    _, llm_with_tools = get_llm()
+    first = llm_with_tools.invoke(with_system_prompt(state))
+    return {"messages": [first]}
 
-    if getattr(first, "tool_calls", None):
-        # cancel_order 도구 실행
-        tc = first.tool_calls[0]
-        result = cancel_order.invoke(tc["args"])
-        out.append(ToolMessage(content=result, tool_call_id=tc["id"]))
+def route_after_classify(state):
+    # 도구 호출이 있으면 주문 취소로, 없으면 1차 응답이 곧 최종 답변입니다.
+    return "cancel_order" if getattr(state["messages"][-1], "tool_calls", None) else END
 
-        # 2차 LLM 패스: 최종 확인 텍스트 생성
-        second = llm.invoke(full + out)
-        out.append(second)
+def run_cancel_order(state):
+    # cancel_order 도구 실행 (도구 호출마다 ToolMessage 하나)
+    tool_calls = state["messages"][-1].tool_calls
+    return {"messages": [default_executor().invoke(cancel_order, tc) for tc in tool_calls]}
 
-    return {"messages": out}
+def reply(state):
+    # 2차 LLM 패스: 최종 확인 텍스트 생성
+    llm, _ = get_llm()
+    return {"messages": [llm.invoke(with_system_prompt(state))]}
 
 # -- 3) StateGraph로 에이전트 구조 연결
-def construct_graph():
+# checkpointer를 넘기면 노드가 끝날 때마다 상태를 thread_id별로 저장하고, 중단된 실행을 이어서 할 수 있습니다.
+def construct_graph(checkpointer=None):
     g = StateGraph(AgentState)  # TypedDict 사용
-    g.add_node("assistant", call_model)
-    g.set_entry_point("assistant")
-    return g.compile()
-
-graph = construct_graph()
+    g.add_node("classify", traced_node("classify", classify_request))
+    g.add_node("cancel_order", traced_node("cancel_order", run_cancel_order))
+    g.add_node("reply", traced_node("reply", reply))
+    g.set_entry_point("classify")
+    g.add_conditional_edges("classify", route_after_classify, ["cancel_order", END])
+    g.add_edge("cancel_order", "reply")
+    g.add_edge("reply", END)
+    return g.compile(checkpointer=checkpointer)
+
+# 기본 그래프(체크포인터 없음)도 처음 필요할 때 한 번만 컴파일합니다.
+@lru_cache(maxsize=None)
+def get_graph():
+    return construct_graph()
 
 # -- * 그래프 구조 시각화 코드 추가
 def save_graph_image(graph):
@@ -93,10 +117,38 @@ def save_graph_image(graph):
     except Exception as e:
         print(f"시각화 중 오류 발생: {e}")
 
-if __name__ == "__main__":
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--thread-id", help="체크포인트를 구분하는 thread ID (기본: 실행마다 새로 만듦)")
+    parser.add_argument("--resume", action="store_true", help="--thread-id로 지정한 thread의 중단된 실행을 이어서 합니다.")
+    args = parser.parse_args()
+    if args.resume and not args.thread_id:
+        parser.error("--resume에는 이어서 실행할 --thread-id가 필요합니다.")
+    # 같은 thread를 다시 쓰는 것은 --resume일 때뿐이므로, 지정하지 않으면 새 thread를 씁니다.
+    thread_id = args.thread_id or new_thread_id("order-B73973")
+
+    # LANGGRAPH_CHECKPOINT_DB가 설정된 경우에만 체크포인터를 사용합니다.
+    checkpointer = checkpointer_from_env()
+    graph = construct_graph(checkpointer) if checkpointer is not None else get_graph()
+    if checkpointer is not None:
+        print(f"thread ID: {thread_id} (중단되면 --thread-id {thread_id} --resume으로 이어서 실행)")
+
     example_order = {"order_id": "B73973"}
     convo = [HumanMessage(content="주문 #B73973를 취소해주세요.")]
-    result = graph.invoke({"order": example_order, "messages": convo})
+    inputs = {"order": example_order, "messages": convo}
+    # TRACE_FILE / TRACE_OTLP_ENDPOINT가 설정되어 있으면 이 요청의 노드/LLM/도구 호출이 하나의 trace로 기록됩니다.
+    # 토큰 사용량은 thread ID별로 집계되고, REQUEST_TOKEN_BUDGET이 있으면 이 요청에 예산이 적용됩니다.
+    with get_tracer().span("support_request", kind="request", thread_id=thread_id), request_scope(session=thread_id):
+        if checkpointer is not None:
+            result = invoke_resumable(graph, inputs, thread_id, resume=args.resume)
+        else:
+            result = graph.invoke(inputs)
     for msg in result["messages"]:
         print(f"{msg.type}: {msg.content}")
-    save_graph_image(graph)
\ No newline at end of file
+    print(usage_tracker.report())
+    save_graph_image(graph)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+날씨 MCP 서버 부하 생성기
+`initialize`, `tools/list`, `tools/call`을 동시성 단계별로 일정 시간 동안 보내고
+초당 요청 수(req/s)와 지연 시간 백분위(p50/p90/p99)를 출력합니다.
+동시성을 올려도 req/s가 더 이상 늘지 않고 지연만 커지는 지점이 서버의 포화점입니다.
+
+실행 (서버를 먼저 띄운 뒤):
+    python ch04_study/mcp_servers/MCP_weather_server.py --workers 4
+    python ch04_study/benchmarks/mcp_load_benchmark.py --concurrency 1 8 32 128 --duration 10
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+LOCATIONS = ["NYC", "London", "San Francisco", "Seoul", "서울", "new york", "Paris", "Tokyo"]
+
+
+def build_request(method: str, request_id: int, location: str) -> Dict:
+    request = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if method == "initialize":
+        request["params"] = {"protocolVersion": "2024-11-05", "capabilities": {}, "clientInfo": {"name": "load-test", "version": "1.0.0"}}
+    elif method == "tools/call":
+        request["params"] = {"name": "weather", "arguments": {"location": location}}
+    return request
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def run_level(client: httpx.AsyncClient, url: str, method: str, concurrency: int, duration: float) -> Dict:
+    """concurrency개의 작업자가 duration초 동안 요청을 반복해서 보냅니다."""
+    latencies: List[float] = []
+    errors = 0
+    ids = itertools.count(1)
+    locations = itertools.cycle(LOCATIONS)
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            payload = build_request(method, next(ids), next(locations))
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=payload)
+                if response.status_code != 200 or "error" in response.json():
+                    errors += 1
+                    continue
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "method": method,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(ms) if ms else 0.0,
+        "p50_ms": percentile(ms, 50),
+        "p90_ms": percentile(ms, 90),
+        "p99_ms": percentile(ms, 99),
+    }
+
+
+async def main_async(args) -> List[Dict]:
+    url = args.url.rstrip("/") + "/mcp"
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    results = []
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        print(f"{'method':<12} {'conc':>5} {'req/s':>10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for method in args.methods:
+            for concurrency in args.concurrency:
+                result = await run_level(client, url, method, concurrency, args.duration)
+                results.append(result)
+                print(
+                    f"{method:<12} {concurrency:>5} {result['rps']:>10.1f} {result['p50_ms']:>8.2f} "
+                    f"{result['p90_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7}"
+                )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="날씨 MCP 서버 주소")
+    parser.add_argument("--methods", nargs="+", default=["initialize", "tools/list", "tools/call"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32, 128])
+    parser.add_argument("--duration", type=float, default=5.0, help="단계별 측정 시간(초)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="요청 타임아웃(초)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
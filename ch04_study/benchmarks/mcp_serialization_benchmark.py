@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+MCP 서버 직렬화 마이크로 벤치마크
+요청 1건당 응답 생성 + 직렬화 + 출력 비용을 기존 방식(dict 재생성 + json.dumps + 줄마다 flush)과
+현재 방식(미리 직렬화한 바이트 + 빠른 코덱 + 버퍼링된 바이너리 출력)으로 비교합니다.
+
+실행: python ch04_study/benchmarks/mcp_serialization_benchmark.py [--requests 100000]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import MCP_math_server as math_server  # noqa: E402
+from mcp_servers import jsonrpc_codec  # noqa: E402
+
+REQUESTS = {
+    "initialize": {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+    "tools/list": {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+    "tools/call": {
+        "jsonrpc": "2.0",
+        "id": 3,
+        "method": "tools/call",
+        "params": {"name": "math", "arguments": {"expression": "(3 + 5) * 12"}},
+    },
+}
+
+
+def legacy_response(request):
+    """기존 구현처럼 매 요청마다 중첩 dict를 새로 만듭니다."""
+    method = request["method"]
+    if method == "initialize":
+        result = {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {"tools": {}},
+            "serverInfo": {"name": "math-server", "version": "1.0.0"},
+        }
+    elif method == "tools/list":
+        result = {
+            "tools": [
+                {
+                    "name": "math",
+                    "description": "수학 표현식을 계산합니다. 예: (3 + 5) * 12",
+                    "inputSchema": {
+                        "type": "object",
+                        "properties": {
+                            "expression": {"type": "string", "description": "계산할 수학 표현식"}
+                        },
+                        "required": ["expression"],
+                    },
+                }
+            ]
+        }
+    else:
+        value = math_server.compute_math(request["params"]["arguments"]["expression"])
+        result = {"content": [{"type": "text", "text": f"계산 결과: {value}"}]}
+    return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+
+def bench_legacy(lines, out):
+    """json.loads → dict 생성 → json.dumps → 텍스트 write + 줄마다 flush"""
+    for line in lines:
+        request = json.loads(line)
+        out.write(json.dumps(legacy_response(request)) + "\n")
+        out.flush()
+
+
+def bench_current(lines, out):
+    """바이트 줄 → 코덱 loads → 사전 직렬화 응답 → 모아서 한 번에 write + flush"""
+    responses = [math_server.process_line(line) for line in lines]
+    out.write(b"\n".join(responses) + b"\n")
+    out.flush()
+
+
+def measure(func, lines, out, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(lines, out)
+        best = min(best, time.perf_counter() - start)
+    return best / len(lines) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="메서드별 요청 수")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    codec = "orjson" if jsonrpc_codec.orjson is not None else "json (stdlib)"
+    print(f"codec: {codec}, requests/method: {args.requests}")
+    print(f"{'method':<12} {'legacy (us/req)':>16} {'current (us/req)':>17} {'speedup':>8}")
+
+    devnull = open(os.devnull, "wb", buffering=0)
+    text_out = io.TextIOWrapper(open(os.devnull, "wb"), encoding="utf-8")
+    binary_out = io.BufferedWriter(devnull, buffer_size=64 * 1024)
+
+    for method, request in REQUESTS.items():
+        text_lines = [json.dumps(request)] * args.requests
+        byte_lines = [line.encode() for line in text_lines]
+        legacy = measure(bench_legacy, text_lines, text_out, args.repeat)
+        current = measure(bench_current, byte_lines, binary_out, args.repeat)
+        print(f"{method:<12} {legacy:>16.2f} {current:>17.2f} {legacy / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+MCP 전송 방식 벤치마크: stdio vs streamable HTTP vs in-process
+번들된 수학/날씨 MCP 서버를 로컬에서 띄우고, 지원하는 모든 전송 방식으로
+`tools/list`와 `tools/call`을 동시성 단계와 페이로드 크기별로 호출합니다.
+처리량(req/s), p50/p99 지연 시간, 요청당 CPU 시간을 출력하고 JSON 파일로 저장합니다.
+버전 간 결과를 비교할 때는 저장된 JSON 파일을 diff 합니다.
+
+실행: python ch04_study/benchmarks/mcp_transport_benchmark.py --output results.json
+CPU 시간에 서버 프로세스 사용량까지 포함하려면 psutil이 필요합니다.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+CH04_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CH04_DIR))
+
+from mcp_sessions import MCPSessionManager  # noqa: E402
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MCP_SERVERS_DIR = CH04_DIR / "mcp_servers"
+
+# (서버, 전송 방식) → 연결 설정. weather/streamable_http의 URL은 실행 시 포트로 채웁니다.
+TRANSPORTS = {
+    ("math", "stdio"): {
+        "command": sys.executable,
+        "args": [str(MCP_SERVERS_DIR / "MCP_math_server.py")],
+        "transport": "stdio",
+    },
+    ("math", "in_process"): {
+        "handler": "mcp_servers.MCP_math_server:handle_jsonrpc_request",
+        "transport": "in_process",
+    },
+    ("weather", "streamable_http"): {
+        "url": "http://127.0.0.1:{port}/mcp",
+        "transport": "streamable_http",
+    },
+    ("weather", "in_process"): {
+        "handler": "mcp_servers.MCP_weather_server:handle_jsonrpc_request",
+        "transport": "in_process",
+    },
+}
+
+
+def make_arguments(server: str, payload_size: int) -> Dict[str, str]:
+    """대략 payload_size 바이트 크기의 도구 인자를 만듭니다. (서버가 무시하는 공백으로 채움)"""
+    if server == "math":
+        base = "(3 + 5) * 12"
+        return {"expression": base + " " * max(payload_size - len(base), 0)}
+    return {"location": "Seoul" + " " * max(payload_size - 5, 0)}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def cpu_seconds() -> float:
+    """현재 프로세스와 (psutil이 있으면) 모든 자식 프로세스의 누적 CPU 시간."""
+    total = time.process_time()
+    if psutil is not None:
+        for child in psutil.Process().children(recursive=True):
+            try:
+                times = child.cpu_times()
+                total += times.user + times.system
+            except psutil.Error:
+                pass
+    return total
+
+
+async def run_case(session, server: str, operation: str, concurrency: int, payload_size: int, requests: int) -> Dict[str, Any]:
+    arguments = make_arguments(server, payload_size)
+    remaining = requests
+    latencies: List[float] = []
+    errors = 0
+
+    async def call():
+        if operation == "tools/list":
+            return await session.list_tools()
+        return await session.call_tool(server, arguments)
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                result = await call()
+                if getattr(result, "isError", False):
+                    errors += 1
+                    continue
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    cpu_start = cpu_seconds()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    cpu_used = cpu_seconds() - cpu_start
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "operation": operation,
+        "concurrency": concurrency,
+        "payload_bytes": payload_size if operation == "tools/call" else 0,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(ms, 50),
+        "p99_ms": percentile(ms, 99),
+        "cpu_ms_per_request": cpu_used / max(len(latencies), 1) * 1000,
+    }
+
+
+def start_weather_server(port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, str(MCP_SERVERS_DIR / "MCP_weather_server.py"), "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("날씨 MCP 서버가 시작되지 않았습니다.")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=CH04_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main_async(args) -> List[Dict[str, Any]]:
+    selected = [key for key in TRANSPORTS if not args.transports or f"{key[0]}/{key[1]}" in args.transports]
+    connections = {}
+    for server, transport in selected:
+        connection = dict(TRANSPORTS[(server, transport)])
+        if "url" in connection:
+            connection["url"] = connection["url"].format(port=args.port)
+        connections[f"{server}/{transport}"] = connection
+
+    manager = MCPSessionManager(connections)
+    results = []
+    print(f"{'transport':<26} {'operation':<10} {'conc':>4} {'bytes':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'cpu ms/req':>10}")
+    try:
+        for name in connections:
+            server, transport = name.split("/")
+            session = await manager.session(name)
+            await session.call_tool(server, make_arguments(server, 16))  # 워밍업
+            for operation in ("tools/list", "tools/call"):
+                sizes = args.payload_sizes if operation == "tools/call" else [0]
+                for payload_size in sizes:
+                    for concurrency in args.concurrency:
+                        result = await run_case(session, server, operation, concurrency, payload_size, args.requests)
+                        result.update(server=server, transport=transport)
+                        results.append(result)
+                        print(
+                            f"{name:<26} {operation:<10} {concurrency:>4} {result['payload_bytes']:>6} "
+                            f"{result['rps']:>9.1f} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+                            f"{result['cpu_ms_per_request']:>10.3f}"
+                        )
+    finally:
+        await manager.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transports", nargs="*", help="예: math/stdio weather/in_process (기본: 전부)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--payload-sizes", nargs="+", type=int, default=[16, 1024, 16384], help="tools/call 인자 크기(바이트)")
+    parser.add_argument("--requests", type=int, default=500, help="케이스별 요청 수")
+    parser.add_argument("--port", type=int, default=8765, help="벤치마크용 날씨 서버 포트")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    needs_http = not args.transports or "weather/streamable_http" in args.transports
+    weather_process = start_weather_server(args.port) if needs_http else None
+    try:
+        results = asyncio.run(main_async(args))
+    finally:
+        if weather_process is not None:
+            weather_process.terminate()
+            weather_process.wait(timeout=10)
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_includes_servers": psutil is not None,
+                "requests_per_case": args.requests,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
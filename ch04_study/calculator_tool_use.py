@@ -1,7 +1,13 @@
+import sys
+from functools import lru_cache
+from pathlib import Path
 from langchain_core.tools import tool
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import HumanMessage, ToolMessage, AIMessage
-from langchain_groq import ChatGroq  # 이 줄을 꼭 추가해야 합니다!
+from langchain_core.messages import HumanMessage
+
+# 저장소 루트의 공통 모듈(common/)을 가져올 수 있도록 경로를 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.tool_cache import cache_policy, default_executor  # noqa: E402
+from common.tools import ToolRegistry  # noqa: E402
 
 # 환경변수 확인
 import os
@@ -18,16 +24,20 @@ except ImportError:
 #     )
 
 # 도구 정의
+# 같은 인자면 항상 같은 결과이므로 만료 없이 캐시합니다. (공용 실행기 common/tool_cache.py)
+@cache_policy(pure=True)
 @tool
 def multiply(x: float, y: float) -> float:
     """'x'와 'y'를 곱합니다."""
     return x * y
 
+@cache_policy(pure=True)
 @tool
 def exponentiate(x: float, y: float) -> float:
     """'x'를 'y'제곱합니다."""
     return x**y
 
+@cache_policy(pure=True)
 @tool
 def add(x: float, y: float) -> float:
     """'x'와 'y'를 더합니다."""
@@ -35,35 +45,46 @@ def add(x: float, y: float) -> float:
 
 tools = [multiply, exponentiate, add]
 
+# 이름 조회, 스키마 생성, 바인딩은 공용 도구 레지스트리에 맡깁니다. (common/tools/)
+calculator_registry = ToolRegistry()
+for calculator_tool in tools:
+    calculator_registry.register(calculator_tool)
+
 # LLM 초기화 및 도구 바인딩
-llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0
-    )
-llm_with_tools = llm.bind_tools(tools)
-
-query = "393 * 12.25는 얼마인가요? 그리고 11 + 49는요?"
-messages = [HumanMessage(query)]
-
-ai_msg = llm_with_tools.invoke(messages)
-messages.append(ai_msg)
-
-for tool_call in ai_msg.tool_calls:
-    selected_tool = {
-        "add": add,
-        "multiply": multiply,
-        "exponentiate": exponentiate
-    }[tool_call["name"]]
-    result = selected_tool.invoke(tool_call['args'])
-    
-    print(f"Tool: {tool_call['name']}")
-    print(f"Args: {tool_call['args']}")
-    print(f"Result: {result}")
-    print()
-    
-    # ToolMessage 생성
-    tool_msg = ToolMessage(content=str(result), tool_call_id=tool_call["id"])
-    messages.append(tool_msg)
-
-final_response = llm_with_tools.invoke(messages)
-print(final_response.content)
\ No newline at end of file
+# import 시점이 아니라 처음 필요할 때 한 번만 만들고 재사용합니다.
+@lru_cache(maxsize=None)
+def get_llm_with_tools():
+    # 요청 제한(RPM/TPM, 적응형 동시성)과 응답 캐시가 적용된 공용 채팅 모델을 사용합니다.
+    from common.llm import create_chat_model
+
+    llm = create_chat_model()
+    return calculator_registry.bind(llm)
+
+def main():
+    # 도구 호출은 공용 실행기로 실행합니다. (도구별 캐시 정책에 따라 결과 재사용)
+    tool_executor = default_executor()
+    llm_with_tools = get_llm_with_tools()
+
+    query = "393 * 12.25는 얼마인가요? 그리고 11 + 49는요?"
+    messages = [HumanMessage(query)]
+
+    ai_msg = llm_with_tools.invoke(messages)
+    messages.append(ai_msg)
+
+    for tool_call in ai_msg.tool_calls:
+        selected_tool = calculator_registry.get(tool_call["name"])
+        # ToolCall을 넘기면 현재 호출 ID를 가진 ToolMessage를 돌려받습니다.
+        tool_msg = tool_executor.invoke(selected_tool, tool_call)
+
+        print(f"Tool: {tool_call['name']}")
+        print(f"Args: {tool_call['args']}")
+        print(f"Result: {tool_msg.content}")
+        print()
+
+        messages.append(tool_msg)
+
+    final_response = llm_with_tools.invoke(messages)
+    print(final_response.content)
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,196 @@
 import asyncio
+import os
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
 from typing import Any, Sequence, TypedDict
 
 from langchain_core.messages import HumanMessage
-from langchain_core.tools import Tool
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_core.tools import BaseTool
 from langgraph.graph import StateGraph
 
+# 공용 모듈(common/)을 가져올 수 있도록 저장소 루트를 경로에 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mcp_sessions import MCPSessionManager  # noqa: E402
+from common.tracing import get_tracer, traced_node  # noqa: E402
 
-class AgentState(TypedDict):
+MCP_SERVERS_DIR = Path(__file__).resolve().parent / "mcp_servers"
+
+
+class AgentState(TypedDict, total=False):
     messages: Sequence[Any]
+    plan: list[dict[str, Any]]
+
+
+# 수학 서버 연결 방식
+# - in_process: 같은 프로세스에서 handle_jsonrpc_request를 직접 호출합니다. (기본값, 호출당 수 μs)
+# - stdio: 별도 python3 프로세스로 실행합니다. (격리가 필요할 때, MCP_MATH_TRANSPORT=stdio)
+MATH_SERVER_CONNECTIONS = {
+    "in_process": {
+        "handler": "mcp_servers.MCP_math_server:handle_jsonrpc_request",
+        "transport": "in_process",
+    },
+    "stdio": {
+        "command": "python3",
+        "args": [str(MCP_SERVERS_DIR / "MCP_math_server.py")],
+        "transport": "stdio",
+    },
+}
+
+# MCP 서버 연결 설정
+MCP_SERVERS = {
+    "math": MATH_SERVER_CONNECTIONS[os.getenv("MCP_MATH_TRANSPORT", "in_process")],
+    "weather": {
+        # `python ch04_study/mcp_servers/MCP_weather_server.py`으로 MCP 서버를 먼저 실행합니다.
+        "url": "http://0.0.0.0:8000/mcp",
+        "transport": "streamable_http",
+    },
+}
+
+# 서버마다 세션 하나를 열어 두고 재사용합니다. (도구 호출마다 프로세스 생성/핸드셰이크를 하지 않음)
+# 도구 목록은 이름 → 도구 dict로 캐시되며 TTL 또는 tools/list_changed 알림 시 갱신됩니다.
+# math/weather는 부작용 없는 조회이므로 같은 인자의 동시 호출은 한 번만 보냅니다.
+mcp_sessions = MCPSessionManager(MCP_SERVERS, tools_ttl=300.0, coalesce_tools={"math", "weather"})
+
+# MCP 세션 관리자에서 도구 목록 가져오기
+async def get_mcp_tools() -> list[BaseTool]:
+    return list((await mcp_sessions.get_tools()).values())
+
+
+# ─── Planner ────────────────────────────────────────────────────────────────
+# 복합 질의("서울 날씨는? 그리고 (3+5)*12는?")를 하위 요청으로 나누는 구분자
+# 쉼표는 "weather in Seoul, Korea"처럼 위치 안에도 쓰이므로, 뒤에 새 요청(날씨/계산 키워드나 수식)이
+# 시작될 때만 구분자로 봅니다.
+NEW_INTENT = r"(?:(?i:weather|what|how|calculate|compute)\b|날씨|계산|[\d(])"
+CLAUSE_SEPARATORS = re.compile(rf"\s+(?:and|그리고|또)\s+|[?;]|,\s*(?={NEW_INTENT})|\n")
+MATH_PATTERN = re.compile(r"\d\s*[-+*/^]|[-+*/^]\s*[\d(]|\)\s*[-+*/^]")
+
+
+def parse_weather_location(text: str) -> str:
+    if "weather in" in text.lower():
+        return text.lower().split("weather in")[1].strip().rstrip("?").strip()
+    if "의 날씨" in text:
+        return text.split("의 날씨")[0].strip()
+    return "NYC"
+
+
+def plan_subrequests(message: str) -> list[dict[str, Any]]:
+    """
+    메시지에서 모든 하위 요청을 추출합니다.
+    데모 목적으로, 수학 표현식(숫자와 연산자)이 포함된 구절은 수학 도구로,
+    'weather'나 '날씨'가 포함된 구절은 날씨 도구로 보냅니다.
+    어느 쪽에도 해당하지 않는 구절이 날씨 구절 바로 뒤에 오면 위치로 간주합니다. ("weather in Seoul and London")
+    """
+    plan: list[dict[str, Any]] = []
+    seen: set[tuple[str, str]] = set()
+    previous_kind = None
+
+    for clause in (c.strip() for c in CLAUSE_SEPARATORS.split(message)):
+        if not clause:
+            continue
+        # 실제로는 LLM이 적절한 도구를 판단하지만 여기서는 시연을 위해 간단하게 판단합니다.
+        if MATH_PATTERN.search(clause):
+            kind, tool_input = "math", {"expression": clause}
+        elif "weather" in clause.lower() or "날씨" in clause:
+            kind, tool_input = "weather", {"location": parse_weather_location(clause)}
+        elif previous_kind == "weather":
+            kind, tool_input = "weather", {"location": clause}
+        else:
+            previous_kind = None
+            continue
+
+        previous_kind = kind
+        key = (kind, str(tool_input))
+        if key not in seen:
+            seen.add(key)
+            plan.append({"server": kind, "tool": kind, "input": tool_input, "text": clause})
+    return plan
+
 
+async def plan_requests(state: AgentState) -> dict[str, Any]:
+    """마지막 사용자 메시지를 하위 요청 목록으로 나눕니다."""
+    return {"plan": plan_subrequests(state["messages"][-1].content)}
 
-# MCP 도구 클라이언트 생성
-mcp_client = MultiServerMCPClient(
-    {
-        "math": {
-            "command": "python3",
-            "args": ["ch04/mcp_servers/MCP_math_server.py"],
-            "transport": "stdio",
-        },
-        "weather": {
-            # `python ch04/mcp_servers/MCP_weather_server.py`으로 MCP 서버를 먼저 실행합니다.
-            "url": "http://0.0.0.0:8000/mcp",
-            "transport": "streamable_http",
-        },
-    }
-)
 
-# MCP 도구 클라이언트에서 도구 목록 가져오기
-async def get_mcp_tools() -> list[Tool]:
-    return await mcp_client.get_tools()
+# ─── Concurrent Dispatch ────────────────────────────────────────────────────
+# 서버별 동시 호출 수 제한과 하위 요청별 타임아웃(초)
+SERVER_CONCURRENCY = {"math": 4, "weather": 8}
+TOOL_TIMEOUT = 10.0
+_server_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def server_semaphore(server: str) -> asyncio.Semaphore:
+    semaphore = _server_semaphores.get(server)
+    if semaphore is None:
+        semaphore = _server_semaphores[server] = asyncio.Semaphore(SERVER_CONCURRENCY.get(server, 4))
+    return semaphore
+
+
+async def call_subrequest_tool(tool_name: str, tool_input: Any) -> str:
+    # 도구 조회도 (재)연결과 핸드셰이크를 할 수 있으므로 호출과 같은 타임아웃/오류 처리 안에서 합니다.
+    if await mcp_sessions.get_tool(tool_name) is None:
+        return f"{tool_name} 도구를 사용할 수 없습니다."
+    return await mcp_sessions.call_tool(tool_name, tool_input)
+
+
+async def run_subrequest(step: dict[str, Any]) -> str:
+    tool_name = step["tool"]
+    async with server_semaphore(step["server"]):
+        try:
+            return await asyncio.wait_for(call_subrequest_tool(tool_name, step["input"]), TOOL_TIMEOUT)
+        except asyncio.TimeoutError:
+            return f"{tool_name} 도구 응답 시간이 초과되었습니다."
+        except Exception as e:
+            return f"{tool_name} 도구 호출 중 오류가 발생했습니다: {e}"
 
 
 async def call_mcp_tools(state: AgentState) -> dict[str, Any]:
     """
-    state["messages"]를 포함한 AgentState를 받아 어떤 MCP 도구를 호출할지 결정합니다.
-    데모 목적으로, 사용자 메시지에 'weather'나 '날씨'가 포함되어 있으면 날씨 도구를 호출하고,
-    수학 표현식(숫자/연산자)이 포함되어 있으면 수학 도구를 호출합니다.
-    그 외의 경우에는 기본 메시지를 반환합니다.
+    계획된 모든 하위 요청을 서버에 동시에 보내고 결과를 하나의 응답으로 합칩니다.
+    전체 지연 시간은 하위 요청 지연의 합이 아니라 가장 느린 요청의 지연이 됩니다.
     """
-    messages = state["messages"]
-    last_msg = messages[-1].content.lower()
-
-    # MCP_TOOLS를 전역 변수로 선언하여 한 번만 가져옵니다.
-    global MCP_TOOLS
-    if "MCP_TOOLS" not in globals():
-        MCP_TOOLS = await mcp_client.get_tools()
-
-    # 간단한 판단: 숫자/연산자 토큰이 있으면 "math"를, 'weather'나 '날씨'가 포함되어 있으면 "weather"를 선택합니다.
-    # 실제로는 LLM이 적절한 도구를 판단하지만 여기서는 시연을 위해 간단하게 판단합니다.
-    if any(token in last_msg for token in ["+", "-", "*", "/", "(", ")"]):
-        tool_name = "math"
-        tool_input = {"expression": messages[-1].content}
-    elif "weather" in last_msg or "날씨" in messages[-1].content:
-        tool_name = "weather"
-        content = messages[-1].content
-
-        if "weather in" in content.lower():
-            location = content.lower().split("weather in")[1].strip().rstrip("?").strip()
-        elif "의 날씨" in content:
-            location = content.split("의 날씨")[0].strip()
-        else:
-            location = "NYC"
-        tool_input = {"location": location}
-    else:
+    plan = state.get("plan") or []
+    if not plan:
         return {
             "messages": [
                 {"role": "assistant", "content": "수학 또는 날씨 질문만 답변할 수 있습니다."}
             ]
         }
 
-    tool_obj = next((t for t in MCP_TOOLS if t.name == tool_name), None)
-    if tool_obj is None:
-        return {
-            "messages": [
-                {"role": "assistant", "content": f"{tool_name} 도구를 사용할 수 없습니다."}
-            ]
-        }
-
-    mcp_result: str = await tool_obj.ainvoke(tool_input)
+    results = await asyncio.gather(*(run_subrequest(step) for step in plan))
 
-    return {"messages": [{"role": "assistant", "content": mcp_result}]}
+    if len(results) == 1:
+        content = results[0]
+    else:
+        content = "\n".join(f"- {step['text']}: {result}" for step, result in zip(plan, results))
+    return {"messages": [{"role": "assistant", "content": content}]}
 
 
 def construct_graph():
     g = StateGraph(AgentState)
-    g.add_node("assistant", call_mcp_tools)
-    g.set_entry_point("assistant")
+    g.add_node("plan_requests", traced_node("plan_requests", plan_requests))
+    g.add_node("assistant", traced_node("assistant", call_mcp_tools))
+    g.set_entry_point("plan_requests")
+    g.add_edge("plan_requests", "assistant")
     return g.compile()
 
 
-GRAPH = construct_graph()
+# 그래프는 import 시점이 아니라 첫 질의 때 한 번만 컴파일합니다.
+@lru_cache(maxsize=None)
+def get_graph():
+    return construct_graph()
+
+
+async def run_query(name: str, initial_state: dict[str, Any]) -> dict[str, Any]:
+    # TRACE_FILE / TRACE_OTLP_ENDPOINT가 설정되어 있으면 질의마다 하나의 trace로 기록됩니다.
+    with get_tracer().span(name, kind="request"):
+        return await get_graph().ainvoke(initial_state)
 
 
 async def run_math_query():
     initial_state = {"messages": [HumanMessage(content="(3 + 5) * 12은 얼마인가요?")]}
-    result = await GRAPH.ainvoke(initial_state)
+    result = await run_query("math_query", initial_state)
     assistant_msg = result["messages"][-1]
     content = (
         assistant_msg.get("content")
@@ -107,11 +202,27 @@ async def run_math_query():
 
 async def run_weather_query():
     initial_state = {"messages": [HumanMessage(content="NYC의 날씨는 어때요?")]}
-    result = await GRAPH.ainvoke(initial_state)
+    result = await run_query("weather_query", initial_state)
     assistant_msg = result["messages"][-1]
     print("Weather answer:", assistant_msg["content"])
 
 
+async def run_compound_query():
+    initial_state = {"messages": [HumanMessage(content="what's the weather in Seoul and what is (3+5)*12")]}
+    result = await run_query("compound_query", initial_state)
+    assistant_msg = result["messages"][-1]
+    print("Compound answer:", assistant_msg["content"])
+
+
+async def main():
+    # 모든 질의가 같은 이벤트 루프에서 같은 세션을 재사용하도록 한 번에 실행합니다.
+    try:
+        await run_math_query()
+        await run_weather_query()
+        await run_compound_query()
+    finally:
+        await mcp_sessions.close()
+
+
 if __name__ == "__main__":
-    asyncio.run(run_math_query())
-    asyncio.run(run_weather_query())
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+프로세스 내(in-process) MCP 전송 계층
+같은 저장소에 있는 MCP 서버의 `handle_jsonrpc_request`를 서브프로세스 없이 직접 호출합니다.
+클라이언트 쪽은 일반 mcp.ClientSession을 그대로 사용하므로 initialize, tools/list, tools/call 등
+프로토콜 동작은 stdio 전송과 동일하고, 프로세스 생성/파이프 I/O/JSON 문자열 변환 비용만 사라집니다.
+
+연결 설정 예:
+    {
+        "transport": "in_process",
+        "handler": "mcp_servers.MCP_math_server:handle_jsonrpc_request",
+        "offload": False,  # True이면 핸들러를 워커 스레드에서 실행 (CPU를 오래 쓰는 핸들러용)
+    }
+"""
+import importlib
+import inspect
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Union
+
+import anyio
+from mcp import ClientSession
+from mcp.shared.message import SessionMessage
+from mcp.types import JSONRPCMessage
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+
+def resolve_handler(handler: Union[str, Handler]) -> Handler:
+    """"패키지.모듈:함수" 문자열 또는 호출 가능 객체를 핸들러로 변환합니다."""
+    if callable(handler):
+        return handler
+    module_name, _, attr = handler.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "handle_jsonrpc_request")
+
+
+async def dispatch(handler: Handler, request: Dict[str, Any], offload: bool = False) -> Any:
+    """요청 dict를 핸들러에 전달합니다. 동기/비동기 핸들러를 모두 지원합니다."""
+    if offload:
+        response = await anyio.to_thread.run_sync(handler, request)
+    else:
+        response = handler(request)
+    if inspect.isawaitable(response):
+        response = await response
+    return response
+
+
+def internal_error(request_id: Any, error: Exception) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32603, "message": f"Internal error: {error}"}}
+
+
+@asynccontextmanager
+async def in_process_session(connection: Dict[str, Any]) -> AsyncIterator[ClientSession]:
+    """메모리 스트림으로 핸들러와 연결된 ClientSession을 만듭니다. (initialize는 호출하지 않음)"""
+    handler = resolve_handler(connection["handler"])
+    offload = connection.get("offload", False)
+    session_kwargs = connection.get("session_kwargs") or {}
+    # 동기 핸들러를 이벤트 루프에서 바로 실행하면 중간에 양보하지 않으므로 태스크로 띄워도 겹치지 않습니다.
+    # 이때는 태스크 생성 비용(요청당 수십 μs)을 아끼기 위해 받은 자리에서 처리합니다.
+    concurrent = offload or inspect.iscoroutinefunction(handler)
+
+    client_send, server_receive = anyio.create_memory_object_stream(32)
+    server_send, client_receive = anyio.create_memory_object_stream(32)
+
+    async def respond(request: Dict[str, Any]) -> None:
+        try:
+            response = await dispatch(handler, request, offload)
+            if response is None:
+                return
+            message = JSONRPCMessage.model_validate(response)
+        except Exception as e:
+            # 핸들러 예외로 세션 전체가 끝나지 않도록 해당 요청에만 JSON-RPC 오류로 응답합니다.
+            message = JSONRPCMessage.model_validate(internal_error(request.get("id"), e))
+        try:
+            await server_send.send(SessionMessage(message))
+        except (anyio.BrokenResourceError, anyio.ClosedResourceError):
+            # 응답이 나오기 전에 클라이언트 세션이 닫혔으면 버립니다.
+            pass
+
+    async def serve() -> None:
+        async with server_receive, server_send:
+            # 비동기/오프로드 핸들러는 요청마다 태스크를 띄워서 느린 호출이 뒤따르는 요청을 막지 않게 합니다.
+            # (응답 순서는 완료 순)
+            async with anyio.create_task_group() as requests:
+                async for session_message in server_receive:
+                    request = session_message.message.model_dump(by_alias=True, mode="json", exclude_none=True)
+                    # Notification(id 없음)에는 stdio 서버와 마찬가지로 응답하지 않습니다.
+                    if request.get("id") is None:
+                        continue
+                    if concurrent:
+                        requests.start_soon(respond, request)
+                    else:
+                        await respond(request)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(serve)
+        async with client_send, client_receive:
+            async with ClientSession(client_receive, client_send, **session_kwargs) as session:
+                yield session
+        tg.cancel_scope.cancel()
@@ -3,11 +3,22 @@
 표준 MCP (Model Context Protocol) Math Server
 JSON-RPC 2.0 프로토콜을 사용하여 수학 계산을 수행합니다.
 """
+import os
 import sys
-import json
 import ast
 import operator
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from .jsonrpc_codec import dumps, encode_response, encode_result, error_response, loads, prebuild_result
+    from .metrics import MetricsRegistry, instrument
+except ImportError:  # 스크립트로 직접 실행하는 경우
+    from jsonrpc_codec import dumps, encode_response, encode_result, error_response, loads, prebuild_result
+    from metrics import MetricsRegistry, instrument
+
+READ_CHUNK_SIZE = 64 * 1024
 
 # ─── Safe Expression Evaluation ────────────────────────────────────────────────
 ALLOWED_OPERATORS = {
@@ -46,7 +57,66 @@ def compute_math(expression: str) -> float:
     except Exception as e:
         raise ValueError(f"수식 '{expression}' 계산 오류: {e}")
 
+# ─── Static Results ─────────────────────────────────────────────────────────────
+# initialize / tools/list 결과는 변하지 않으므로 모듈 로드 시 한 번만 만들고 직렬화해 둡니다.
+INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {}
+    },
+    "serverInfo": {
+        "name": "math-server",
+        "version": "1.0.0"
+    }
+}
+
+TOOLS_LIST_RESULT = {
+    "tools": [
+        {
+            "name": "math",
+            "description": "수학 표현식을 계산합니다. 예: (3 + 5) * 12",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "expression": {
+                        "type": "string",
+                        "description": "계산할 수학 표현식"
+                    }
+                },
+                "required": ["expression"]
+            }
+        }
+    ]
+}
+
+STATIC_RESULTS = {
+    "initialize": INITIALIZE_RESULT,
+    "tools/list": TOOLS_LIST_RESULT,
+    # MCP 세션 상태 확인용 ping은 빈 result로 응답합니다.
+    "ping": {},
+}
+STATIC_RESULT_BYTES = {method: prebuild_result(result) for method, result in STATIC_RESULTS.items()}
+
+# ─── Metrics ────────────────────────────────────────────────────────────────────
+# 메서드/도구별 요청 수와 지연 시간을 기록합니다. `stats` 메서드로 조회하거나,
+# MCP_STATS_INTERVAL(초)을 설정하면 주기적으로 stderr에 출력합니다.
+METRICS = MetricsRegistry(
+    methods=(*STATIC_RESULTS, "tools/call", "stats"),
+    tools=[tool["name"] for tool in TOOLS_LIST_RESULT["tools"]],
+)
+
+def start_stats_dump(interval: float) -> None:
+    """interval초마다 지표 요약을 stderr에 한 줄 JSON으로 출력합니다. (stdout은 프로토콜 전용)"""
+    def dump():
+        while True:
+            time.sleep(interval)
+            sys.stderr.write(dumps(METRICS.snapshot()).decode("utf-8") + "\n")
+            sys.stderr.flush()
+    
+    threading.Thread(target=dump, name="stats-dump", daemon=True).start()
+
 # ─── JSON-RPC 2.0 Handler ───────────────────────────────────────────────────────
+@instrument(METRICS)
 def handle_jsonrpc_request(request: Dict[str, Any]) -> Dict[str, Any]:
     """JSON-RPC 2.0 요청을 처리합니다."""
     jsonrpc = request.get("jsonrpc")
@@ -56,56 +126,12 @@ def handle_jsonrpc_request(request: Dict[str, Any]) -> Dict[str, Any]:
     
     # JSON-RPC 2.0 검증
     if jsonrpc != "2.0":
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {
-                "code": -32600,
-                "message": "Invalid Request: jsonrpc must be '2.0'"
-            }
-        }
+        return error_response(request_id, -32600, "Invalid Request: jsonrpc must be '2.0'")
     
     # 메서드별 처리
     try:
-        if method == "initialize":
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {}
-                    },
-                    "serverInfo": {
-                        "name": "math-server",
-                        "version": "1.0.0"
-                    }
-                }
-            }
-        
-        elif method == "tools/list":
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {
-                    "tools": [
-                        {
-                            "name": "math",
-                            "description": "수학 표현식을 계산합니다. 예: (3 + 5) * 12",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "expression": {
-                                        "type": "string",
-                                        "description": "계산할 수학 표현식"
-                                    }
-                                },
-                                "required": ["expression"]
-                            }
-                        }
-                    ]
-                }
-            }
+        if method in STATIC_RESULTS:
+            return {"jsonrpc": "2.0", "id": request_id, "result": STATIC_RESULTS[method]}
         
         elif method == "tools/call":
             tool_name = params.get("name")
@@ -127,64 +153,81 @@ def handle_jsonrpc_request(request: Dict[str, Any]) -> Dict[str, Any]:
                     }
                 }
             else:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Unknown tool: {tool_name}"
-                    }
-                }
+                return error_response(request_id, -32601, f"Unknown tool: {tool_name}")
+        
+        elif method == "stats":
+            return {"jsonrpc": "2.0", "id": request_id, "result": METRICS.snapshot()}
         
         else:
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32601,
-                    "message": f"Method not found: {method}"
-                }
-            }
+            return error_response(request_id, -32601, f"Method not found: {method}")
     
     except Exception as e:
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {
-                "code": -32603,
-                "message": f"Internal error: {str(e)}"
-            }
-        }
+        return error_response(request_id, -32603, f"Internal error: {str(e)}")
+
+def serialize_jsonrpc_response(request: Dict[str, Any]) -> bytes:
+    """요청을 처리하고 응답을 바이트로 직렬화합니다. 정적 응답은 미리 직렬화한 바이트를 재사용합니다."""
+    if request.get("jsonrpc") == "2.0":
+        method = request.get("method")
+        static = STATIC_RESULT_BYTES.get(method)
+        if static is not None:
+            start = time.perf_counter()
+            response = encode_result(request.get("id"), static)
+            METRICS.observe(method, None, "ok", time.perf_counter() - start)
+            return response
+    return encode_response(handle_jsonrpc_request(request))
+
+def process_line(line: bytes) -> Optional[bytes]:
+    """한 줄의 JSON-RPC 메시지를 처리해 응답 바이트를 반환합니다. 응답이 없으면 None을 반환합니다."""
+    line = line.strip()
+    if not line:
+        return None
+    
+    try:
+        request = loads(line)
+    except ValueError as e:
+        return encode_response(error_response(None, -32700, f"Parse error: {e}"))
+    
+    # Notification인 경우 (id가 없는 경우) 응답하지 않음
+    # notifications/initialized 같은 notification은 무시
+    if not isinstance(request, dict) or request.get("id") is None:
+        return None
+    
+    return serialize_jsonrpc_response(request)
 
 # ─── Main Loop ───────────────────────────────────────────────────────────────────
 def main():
-    """stdin에서 JSON-RPC 요청을 읽고 stdout으로 응답을 출력합니다."""
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+    """stdin에서 JSON-RPC 요청을 읽고 stdout으로 응답을 출력합니다.
+
+    줄 단위 write + flush 대신, 한 번에 읽어 들인 청크 안의 모든 요청을 처리한 뒤
+    응답을 모아 바이너리 stdout에 한 번만 쓰고 flush합니다.
+    """
+    interval = float(os.getenv("MCP_STATS_INTERVAL", "0"))
+    if interval > 0:
+        start_stats_dump(interval)
+    
+    stdin_fd = sys.stdin.fileno()
+    stdout = sys.stdout.buffer
+    pending = b""
+    
+    while True:
+        chunk = os.read(stdin_fd, READ_CHUNK_SIZE)
+        if not chunk:
+            break
         
-        try:
-            request = json.loads(line)
-            
-            # Notification인 경우 (id가 없는 경우) 응답하지 않음
-            if "id" not in request or request.get("id") is None:
-                # notifications/initialized 같은 notification은 무시
-                continue
-            
-            response = handle_jsonrpc_request(request)
-        except json.JSONDecodeError as e:
-            response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": f"Parse error: {e}"
-                }
-            }
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
         
-        sys.stdout.write(json.dumps(response) + "\n")
-        sys.stdout.flush()
+        out = [response for response in map(process_line, lines) if response is not None]
+        if out:
+            out.append(b"")
+            stdout.write(b"\n".join(out))
+            stdout.flush()
+    
+    # 개행 없이 끝난 마지막 요청 처리
+    response = process_line(pending)
+    if response is not None:
+        stdout.write(response + b"\n")
+        stdout.flush()
 
 if __name__ == "__main__":
     main()
@@ -3,11 +3,30 @@
 MCP (Model Context Protocol) Weather Server - HTTP 버전
 JSON-RPC 2.0 프로토콜을 사용하여 날씨 정보를 제공합니다.
 """
-from fastapi import FastAPI, Request, HTTPException
+import argparse
+import hashlib
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+import time
+from fastapi import FastAPI, Request, HTTPException, Response
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional, Union
 import uvicorn
 
+try:
+    from .jsonrpc_codec import encode_response, encode_result, error_response, loads, prebuild_result
+    from .location_index import DEFAULT_DATA_PATH, LocationIndex, normalize
+    from .metrics import MetricsRegistry, instrument, render_gauges
+    from .ttl_cache import create_cache
+    from .weather_providers import create_provider
+except ImportError:  # 스크립트로 직접 실행하는 경우
+    from jsonrpc_codec import encode_response, encode_result, error_response, loads, prebuild_result
+    from location_index import DEFAULT_DATA_PATH, LocationIndex, normalize
+    from metrics import MetricsRegistry, instrument, render_gauges
+    from ttl_cache import create_cache
+    from weather_providers import create_provider
+
 # ─── JSON-RPC 2.0 Schemas ───────────────────────────────────────────────────
 class JSONRPCRequest(BaseModel):
     jsonrpc: str
@@ -21,30 +40,134 @@ class JSONRPCResponse(BaseModel):
     result: Optional[Dict[str, Any]] = None
     error: Optional[Dict[str, Any]] = None
 
+# ─── Weather Provider ───────────────────────────────────────────────────────
+# 위치 인덱스는 서버 시작 시 한 번만 만듭니다. (WEATHER_LOCATIONS_FILE로 데이터 파일 변경 가능)
+LOCATION_INDEX = LocationIndex.from_file(Path(os.getenv("WEATHER_LOCATIONS_FILE", DEFAULT_DATA_PATH)))
+
+# WEATHER_PROVIDER_URL이 설정되면 해당 날씨 API를 비동기로 호출하고, 없으면 더미 데이터를 사용합니다.
+# 로컬 부하 테스트: python3 fake_weather_provider.py --latency 0.2
+WEATHER_PROVIDER = create_provider(
+    LOCATION_INDEX,
+    base_url=os.getenv("WEATHER_PROVIDER_URL"),
+    timeout=float(os.getenv("WEATHER_PROVIDER_TIMEOUT", "5")),
+)
+
+async def get_weather_data(location: str) -> str:
+    """날씨 제공자에서 날씨 데이터를 가져옵니다."""
+    return await WEATHER_PROVIDER.fetch(location)
+
 # ─── FastAPI App ────────────────────────────────────────────────────────────
-app = FastAPI(title="Weather MCP Server")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 종료 시 진행 중인 요청이 끝난 뒤(uvicorn graceful shutdown) 업스트림 연결과 캐시 연결을 정리합니다.
+    await WEATHER_PROVIDER.aclose()
+    await WEATHER_CACHE.aclose()
 
-def get_weather_data(location: str) -> str:
-    """더미 날씨 데이터를 반환합니다."""
-    location_lower = location.lower().strip()
-    
-    # 더미 날씨 데이터
-    weather_data = {
-        "nyc": "뉴욕의 현재 날씨: 화씨 58도 (섭씨 14도), 맑음",
-        "new york": "뉴욕의 현재 날씨: 화씨 58도 (섭씨 14도), 맑음",
-        "london": "런던의 현재 날씨: 화씨 48도 (섭씨 9도), 흐림",
-        "san francisco": "샌프란시스코의 현재 날씨: 화씨 62도 (섭씨 17도), 안개",
-        "seoul": "서울의 현재 날씨: 화씨 45도 (섭씨 7도), 맑음",
+app = FastAPI(title="Weather MCP Server", lifespan=lifespan)
+
+# ─── Weather Cache ──────────────────────────────────────────────────────────
+# 위치별 날씨는 몇 분 동안 변하지 않으므로 TTL 캐시에 보관합니다.
+# TTL이 지난 뒤 WEATHER_CACHE_STALE_TTL 동안은 이전 값을 바로 응답하고 백그라운드에서 갱신합니다.
+# 여러 워커로 실행할 때는 WEATHER_CACHE_URL=redis://... 로 워커 간 공유 캐시를 사용합니다.
+WEATHER_CACHE = create_cache(
+    url=os.getenv("WEATHER_CACHE_URL"),
+    maxsize=int(os.getenv("WEATHER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("WEATHER_CACHE_TTL", "300")),
+    stale_ttl=float(os.getenv("WEATHER_CACHE_STALE_TTL", "60")),
+)
+
+def weather_cache_key(location: str) -> str:
+    """같은 장소를 가리키는 다른 표기("NYC", "New York")가 같은 캐시 항목을 쓰도록 키를 만듭니다."""
+    place = LOCATION_INDEX.resolve(location)
+    return place.key if place is not None else normalize(location)
+
+async def get_cached_weather(location: str) -> str:
+    """캐시를 거쳐 날씨 정보를 반환합니다."""
+    return await WEATHER_CACHE.get_or_load(weather_cache_key(location), lambda: get_weather_data(location))
+
+# ─── Static Results ─────────────────────────────────────────────────────────
+# initialize / tools/list 결과는 변하지 않으므로 모듈 로드 시 한 번만 만들고 직렬화해 둡니다.
+INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {}
+    },
+    "serverInfo": {
+        "name": "weather-server",
+        "version": "1.0.0"
     }
-    
-    # 부분 매칭 시도
-    for key, value in weather_data.items():
-        if key in location_lower or location_lower in key:
-            return value
-    
-    return f"{location}의 날씨 정보를 찾을 수 없습니다. 대략 화씨 65도 (섭씨 18도)입니다."
+}
 
-def handle_jsonrpc_request(request: Dict[str, Any]) -> Dict[str, Any]:
+TOOLS_LIST_RESULT = {
+    "tools": [
+        {
+            "name": "weather",
+            "description": "특정 위치의 날씨 정보를 제공합니다. 예: NYC, London, Seoul",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "날씨를 조회할 위치"
+                    }
+                },
+                "required": ["location"]
+            }
+        }
+    ]
+}
+
+STATIC_RESULTS = {
+    "initialize": INITIALIZE_RESULT,
+    "tools/list": TOOLS_LIST_RESULT,
+    # MCP 세션 상태 확인용 ping은 빈 result로 응답합니다.
+    "ping": {},
+}
+STATIC_RESULT_BYTES = {method: prebuild_result(result) for method, result in STATIC_RESULTS.items()}
+
+# Notification에 대한 빈 응답과 서버 상태 응답도 미리 직렬화해 둡니다.
+EMPTY_RESPONSE_BYTES = b'{"jsonrpc":"2.0"}'
+ROOT_RESPONSE_BYTES = prebuild_result({
+    "status": "running",
+    "server": "MCP Weather Server",
+    "version": "1.0.0",
+    "protocol": "JSON-RPC 2.0"
+})
+
+# ─── HTTP Caching ───────────────────────────────────────────────────────────
+def make_etag(content: bytes) -> str:
+    return '"' + hashlib.sha1(content).hexdigest()[:16] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 현재 ETag와 일치하는지 확인합니다. (약한 비교)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+# 조건부 응답(304)은 GET 리소스에만 씁니다. POST /mcp의 JSON-RPC 응답은 요청 id가 들어가서
+# 매번 본문이 다르고, 클라이언트는 항상 같은 id의 응답을 받아야 하기 때문입니다.
+# ETag는 실제로 보내는 본문 바이트 전체로 만듭니다.
+TOOLS_RESPONSE_BYTES = STATIC_RESULT_BYTES["tools/list"]
+TOOLS_CACHE_HEADERS = {
+    "ETag": make_etag(TOOLS_RESPONSE_BYTES),
+    "Cache-Control": "public, max-age=300",
+}
+ROOT_CACHE_HEADERS = {
+    "ETag": make_etag(ROOT_RESPONSE_BYTES),
+    "Cache-Control": "public, max-age=60",
+}
+
+# ─── Metrics ────────────────────────────────────────────────────────────────
+# 메서드/도구별 요청 수와 지연 시간 히스토그램을 기록하고 GET /metrics로 노출합니다.
+METRICS = MetricsRegistry(
+    methods=(*STATIC_RESULTS, "tools/call", "notifications/initialized"),
+    tools=[tool["name"] for tool in TOOLS_LIST_RESULT["tools"]],
+)
+
+@instrument(METRICS)
+async def handle_jsonrpc_request(request: Dict[str, Any]) -> Dict[str, Any]:
     """JSON-RPC 2.0 요청을 처리합니다."""
     jsonrpc = request.get("jsonrpc")
     method = request.get("method")
@@ -53,56 +176,12 @@ def handle_jsonrpc_request(request: Dict[str, Any]) -> Dict[str, Any]:
     
     # JSON-RPC 2.0 검증
     if jsonrpc != "2.0":
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {
-                "code": -32600,
-                "message": "Invalid Request: jsonrpc must be '2.0'"
-            }
-        }
+        return error_response(request_id, -32600, "Invalid Request: jsonrpc must be '2.0'")
     
     # 메서드별 처리
     try:
-        if method == "initialize":
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {}
-                    },
-                    "serverInfo": {
-                        "name": "weather-server",
-                        "version": "1.0.0"
-                    }
-                }
-            }
-        
-        elif method == "tools/list":
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {
-                    "tools": [
-                        {
-                            "name": "weather",
-                            "description": "특정 위치의 날씨 정보를 제공합니다. 예: NYC, London, Seoul",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "location": {
-                                        "type": "string",
-                                        "description": "날씨를 조회할 위치"
-                                    }
-                                },
-                                "required": ["location"]
-                            }
-                        }
-                    ]
-                }
-            }
+        if method in STATIC_RESULTS:
+            return {"jsonrpc": "2.0", "id": request_id, "result": STATIC_RESULTS[method]}
         
         elif method == "tools/call":
             tool_name = params.get("name")
@@ -118,7 +197,7 @@ def handle_jsonrpc_request(request: Dict[str, Any]) -> Dict[str, Any]:
                     else:
                         location = query
                 
-                weather_info = get_weather_data(location)
+                weather_info = await get_cached_weather(location)
                 return {
                     "jsonrpc": "2.0",
                     "id": request_id,
@@ -132,38 +211,43 @@ def handle_jsonrpc_request(request: Dict[str, Any]) -> Dict[str, Any]:
                     }
                 }
             else:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Unknown tool: {tool_name}"
-                    }
-                }
+                return error_response(request_id, -32601, f"Unknown tool: {tool_name}")
         
         elif method == "notifications/initialized":
             # Notification은 응답하지 않음
             return None
         
         else:
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32601,
-                    "message": f"Method not found: {method}"
-                }
-            }
+            return error_response(request_id, -32601, f"Method not found: {method}")
     
     except Exception as e:
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {
-                "code": -32603,
-                "message": f"Internal error: {str(e)}"
-            }
-        }
+        return error_response(request_id, -32603, f"Internal error: {str(e)}")
+
+async def serialize_jsonrpc_response(request: Dict[str, Any]) -> bytes:
+    """요청을 처리하고 응답을 바이트로 직렬화합니다. 정적 응답은 미리 직렬화한 바이트를 재사용합니다."""
+    if request.get("jsonrpc") == "2.0":
+        method = request.get("method")
+        static = STATIC_RESULT_BYTES.get(method)
+        if static is not None:
+            start = time.perf_counter()
+            response = encode_result(request.get("id"), static)
+            METRICS.observe(method, None, "ok", time.perf_counter() - start)
+            return response
+    
+    response = await handle_jsonrpc_request(request)
+    if response is None:
+        return EMPTY_RESPONSE_BYTES
+    return encode_response(response)
+
+def json_bytes_response(content: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """이미 직렬화된 JSON 바이트를 FastAPI의 범용 인코딩 없이 그대로 반환합니다."""
+    return Response(content=content, media_type="application/json", headers=headers)
+
+def cacheable_response(request: Request, content: bytes, cache_headers: Dict[str, str]) -> Response:
+    """ETag/Cache-Control을 붙여 응답하고, 클라이언트가 같은 ETag를 보냈으면 304로 응답합니다."""
+    if etag_matches(request.headers.get("if-none-match"), cache_headers["ETag"]):
+        return Response(status_code=304, headers=cache_headers)
+    return json_bytes_response(content, headers=cache_headers)
 
 @app.post("/mcp")
 async def handle_mcp(request: Request):
@@ -171,41 +255,73 @@ async def handle_mcp(request: Request):
     MCP JSON-RPC 2.0 요청을 처리합니다.
     """
     try:
-        body = await request.json()
+        body = loads(await request.body())
         
         # Notification인 경우 (id가 없는 경우) 응답하지 않음
         if "id" not in body or body.get("id") is None:
-            return {"jsonrpc": "2.0"}
-        
-        response = handle_jsonrpc_request(body)
-        
-        if response is None:
-            return {"jsonrpc": "2.0"}
+            return json_bytes_response(EMPTY_RESPONSE_BYTES)
         
-        return response
+        return json_bytes_response(await serialize_jsonrpc_response(body))
         
     except Exception as e:
-        return {
-            "jsonrpc": "2.0",
-            "id": None,
-            "error": {
-                "code": -32700,
-                "message": f"Parse error: {str(e)}"
-            }
-        }
+        return json_bytes_response(encode_response(error_response(None, -32700, f"Parse error: {str(e)}")))
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """서버 상태 확인"""
-    return {
-        "status": "running",
-        "server": "MCP Weather Server",
-        "version": "1.0.0",
-        "protocol": "JSON-RPC 2.0"
-    }
+    return cacheable_response(request, ROOT_RESPONSE_BYTES, ROOT_CACHE_HEADERS)
+
+@app.get("/tools")
+async def tools(request: Request):
+    """도구 목록(tools/list의 result)을 조건부 GET으로 제공합니다. (If-None-Match가 일치하면 304)"""
+    return cacheable_response(request, TOOLS_RESPONSE_BYTES, TOOLS_CACHE_HEADERS)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """날씨 캐시의 적중률과 제거(eviction) 횟수, 업스트림 요청/병합 횟수를 반환합니다."""
+    return {**WEATHER_CACHE.stats(), "provider": WEATHER_PROVIDER.stats()}
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 형식의 요청 지표와 캐시 통계를 반환합니다. (워커 프로세스별 값)"""
+    content = METRICS.render_prometheus() + render_gauges("mcp_weather_cache", WEATHER_CACHE.stats())
+    return Response(content=content, media_type="text/plain; version=0.0.4")
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Weather Server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", "1")),
+        help="워커 프로세스 수 (여러 워커에서 캐시를 공유하려면 WEATHER_CACHE_URL 설정)",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=10,
+        help="종료 신호 후 진행 중인 요청을 기다리는 최대 시간(초)",
+    )
+    parser.add_argument("--access-log", action="store_true", help="요청별 access log 출력")
+    args = parser.parse_args()
+
+    print(f"Starting MCP Weather Server on http://{args.host}:{args.port} (workers={args.workers})")
+    print(f"MCP endpoint: http://{args.host}:{args.port}/mcp")
+    if args.workers > 1 and not os.getenv("WEATHER_CACHE_URL"):
+        print("주의: WEATHER_CACHE_URL이 없으면 워커마다 별도의 캐시를 사용합니다.")
+
+    # 여러 워커를 띄우려면 앱을 import 문자열로 전달해야 합니다.
+    uvicorn.run(
+        "MCP_weather_server:app",
+        app_dir=str(Path(__file__).resolve().parent),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        access_log=args.access_log,
+    )
 
 if __name__ == "__main__":
-    # Run with: python3 MCP_weather_server.py
-    print("Starting MCP Weather Server on http://0.0.0.0:8000")
-    print("MCP endpoint: http://0.0.0.0:8000/mcp")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Run with: python3 MCP_weather_server.py [--workers 4]
+    main()
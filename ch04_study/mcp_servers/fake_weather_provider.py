@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+오프라인 부하 테스트용 가짜 날씨 API 서버
+실제 날씨 제공자 대신 `GET /weather?location=...`에 지정한 지연 시간 뒤 응답합니다.
+
+실행: python3 fake_weather_provider.py --port 8001 --latency 0.2 --jitter 0.05
+날씨 서버 연결: WEATHER_PROVIDER_URL=http://127.0.0.1:8001 python3 MCP_weather_server.py
+"""
+import argparse
+import asyncio
+import random
+
+from fastapi import FastAPI
+import uvicorn
+
+try:
+    from .location_index import LocationIndex
+except ImportError:  # 스크립트로 직접 실행하는 경우
+    from location_index import LocationIndex
+
+app = FastAPI(title="Fake Weather Provider")
+app.state.latency = 0.2
+app.state.jitter = 0.0
+app.state.requests = 0
+
+LOCATION_INDEX = LocationIndex.from_file()
+
+
+@app.get("/weather")
+async def weather(location: str):
+    """설정한 지연 후 날씨 정보를 반환합니다."""
+    app.state.requests += 1
+    delay = app.state.latency + random.uniform(-app.state.jitter, app.state.jitter)
+    await asyncio.sleep(max(delay, 0.0))
+
+    place = LOCATION_INDEX.resolve(location)
+    if place is not None:
+        summary = place.weather
+    else:
+        celsius = random.randint(-5, 30)
+        summary = f"{location}의 현재 날씨: 화씨 {celsius * 9 // 5 + 32}도 (섭씨 {celsius}도), 맑음"
+    return {"location": location, "summary": summary}
+
+
+@app.get("/")
+async def root():
+    """서버 상태 및 누적 요청 수 확인"""
+    return {
+        "status": "running",
+        "server": "Fake Weather Provider",
+        "latency": app.state.latency,
+        "jitter": app.state.jitter,
+        "requests": app.state.requests,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 날씨 API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2, help="응답 지연 시간(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 시간에 더할 ±무작위 편차(초)")
+    args = parser.parse_args()
+
+    app.state.latency = args.latency
+    app.state.jitter = args.jitter
+    print(f"Starting Fake Weather Provider on http://{args.host}:{args.port} (latency={args.latency}s)")
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,66 @@
+"""
+MCP 서버 공용 JSON-RPC 2.0 직렬화 유틸리티
+정적 응답은 미리 직렬화해 두고, 동적 응답은 orjson(설치된 경우)으로 빠르게 인코딩합니다.
+"""
+import json
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 동작합니다.
+    orjson = None
+
+# ─── JSON Codec ─────────────────────────────────────────────────────────────
+if orjson is not None:
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(data: bytes) -> Any:
+        return orjson.loads(data)
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        return _encoder.encode(obj).encode("utf-8")
+
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+# ─── Pre-serialized Responses ───────────────────────────────────────────────
+_PREFIX = b'{"jsonrpc":"2.0","id":'
+
+
+def encode_id(request_id: Optional[Any]) -> bytes:
+    """요청 id를 JSON 바이트로 변환합니다. 흔한 정수/문자열 id는 빠르게 처리합니다."""
+    if request_id is None:
+        return b"null"
+    if type(request_id) is int:
+        return str(request_id).encode("ascii")
+    return dumps(request_id)
+
+
+def prebuild_result(result: Dict[str, Any]) -> bytes:
+    """변하지 않는 result 객체를 한 번만 직렬화해 둡니다."""
+    return dumps(result)
+
+
+def encode_result(request_id: Optional[Any], result_bytes: bytes) -> bytes:
+    """미리 직렬화한 result에 id만 끼워 넣어 응답 바이트를 만듭니다."""
+    return b"".join((_PREFIX, encode_id(request_id), b',"result":', result_bytes, b"}"))
+
+
+def encode_response(response: Dict[str, Any]) -> bytes:
+    """동적으로 만든 응답 dict를 직렬화합니다."""
+    return dumps(response)
+
+
+def error_response(request_id: Optional[Any], code: int, message: str) -> Dict[str, Any]:
+    """JSON-RPC 2.0 오류 응답 dict를 만듭니다."""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": code,
+            "message": message
+        }
+    }
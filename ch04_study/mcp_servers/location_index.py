@@ -0,0 +1,181 @@
+"""
+날씨 MCP 서버용 위치 인덱스
+서버 시작 시 한 번 데이터 파일을 읽어 아래 두 가지 인덱스를 만듭니다.
+
+1. 정확 일치 별칭 맵: 정규화된 별칭 → 장소 (다국어 별칭 포함, 예: "서울" → seoul)
+2. 문자 3-gram 인덱스: 오타나 변형된 표기를 위한 퍼지 매칭
+
+질의 안에서 별칭을 찾은 경우("weather in new york")에는 나머지 단어가 모두 "weather", "날씨" 같은
+채움말이거나 그 장소의 한정어(데이터의 "qualifiers", 예: "Seoul, Korea")일 때만 그 장소로 봅니다.
+("London Ontario"는 런던이 아닙니다.)
+퍼지 매칭은 3-gram으로 후보를 고른 뒤, 편집 유사도와 길이 비율이 충분히 가까울 때만 인정합니다.
+("Newark", "york", "new"는 new york이 아닙니다.) 확신할 수 없으면 None(알 수 없는 위치)을 반환합니다.
+
+조회 비용은 질의 길이에만 비례하고 등록된 장소 수와는 무관합니다.
+(퍼지 매칭에서는 너무 흔한 3-gram의 포스팅 리스트를 건너뛰어 비용 상한을 유지합니다.)
+"""
+import json
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DEFAULT_DATA_PATH = Path(__file__).resolve().parent / "data" / "locations.jsonl"
+
+# 한국어 질의에서 지명 뒤에 붙는 흔한 조사 ("서울의 날씨", "런던에서")
+KOREAN_PARTICLES = ("에서", "의", "은", "는", "이", "가", "에")
+
+# 지명과 함께 써도 다른 장소를 뜻하지 않는 단어
+FILLER_WORDS = frozenset({
+    "weather", "forecast", "temperature", "in", "at", "for", "of", "the", "today", "now", "current",
+    "currently", "what", "s", "is", "how", "like", "city",
+    "날씨", "기온", "오늘", "지금", "현재", "어때", "어때요", "알려줘", "시",
+})
+
+# 퍼지 매칭에 쓰는 최소 질의 길이 (너무 짧은 질의는 여러 지명에 우연히 겹침)
+MIN_FUZZY_LENGTH = 4
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """유니코드 정규화, 소문자화, 문장부호 제거, 공백 정리를 수행합니다."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def strip_particle(token: str) -> str:
+    """토큰 끝의 한국어 조사를 제거합니다."""
+    for particle in KOREAN_PARTICLES:
+        if len(token) > len(particle) and token.endswith(particle):
+            return token[: -len(particle)]
+    return token
+
+
+def trigrams(text: str) -> List[str]:
+    """경계 표시를 붙인 문자 3-gram 목록을 반환합니다."""
+    padded = f" {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+@dataclass(frozen=True)
+class Place:
+    key: str
+    name: str
+    weather: str
+    qualifiers: FrozenSet[str] = field(default=frozenset(), compare=False)
+
+
+class LocationIndex:
+    """별칭 맵 + 3-gram 인덱스로 위치 문자열을 장소로 해석합니다."""
+
+    def __init__(self, fuzzy_threshold: float = 0.8, candidate_threshold: float = 0.3, max_posting: int = 2000):
+        # fuzzy_threshold: 편집 유사도(SequenceMatcher ratio) 하한, candidate_threshold: 3-gram Dice 후보 하한
+        self.fuzzy_threshold = fuzzy_threshold
+        self.candidate_threshold = candidate_threshold
+        self.max_posting = max_posting
+        self.places: Dict[str, Place] = {}
+        self.aliases: Dict[str, Place] = {}
+        self.max_alias_words = 1
+        self._alias_list: List[Tuple[str, Place, int]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    # ─── Build ──────────────────────────────────────────────────────────────
+    def add(self, place: Place, aliases: Iterable[str]) -> None:
+        self.places[place.key] = place
+        for alias in {normalize(place.name), *(normalize(a) for a in aliases)}:
+            if not alias or alias in self.aliases:
+                continue
+            self.aliases[alias] = place
+            self.max_alias_words = max(self.max_alias_words, alias.count(" ") + 1)
+
+            grams = set(trigrams(alias))
+            alias_id = len(self._alias_list)
+            self._alias_list.append((alias, place, len(grams)))
+            for gram in grams:
+                self._postings[gram].append(alias_id)
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_DATA_PATH, **kwargs) -> "LocationIndex":
+        """JSON Lines 파일에서 인덱스를 만듭니다. 한 줄에 장소 하나씩 기록합니다.
+
+        {"key": "seoul", "name": "Seoul", "aliases": ["서울"], "qualifiers": ["korea"], "weather": "..."}
+        """
+        index = cls(**kwargs)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                qualifiers = frozenset(word for q in record.get("qualifiers", []) for word in normalize(q).split(" ") if word)
+                place = Place(record["key"], record.get("name", record["key"]), record["weather"], qualifiers)
+                index.add(place, record.get("aliases", []))
+        return index
+
+    # ─── Lookup ─────────────────────────────────────────────────────────────
+    def resolve(self, location: str) -> Optional[Place]:
+        """위치 문자열을 장소로 해석합니다. 찾지 못하면 None을 반환합니다."""
+        query = normalize(location)
+        if not query:
+            return None
+
+        place = self.aliases.get(query)
+        if place is not None:
+            return place
+
+        tokens = [strip_particle(token) for token in query.split(" ")]
+        place = self._match_spans(tokens)
+        if place is not None:
+            return place
+
+        # 채움말을 뺀 나머지 전체가 한 지명의 오타일 때만 퍼지 매칭합니다.
+        remainder = " ".join(token for token in tokens if token not in FILLER_WORDS)
+        return self._match_fuzzy(remainder)
+
+    def _match_spans(self, tokens: List[str]) -> Optional[Place]:
+        """
+        질의 안의 연속된 단어 구간을 긴 것부터 별칭 맵에서 찾습니다. ("weather in new york" → new york)
+        구간 밖의 단어가 채움말이나 그 장소의 한정어가 아니면 다른 장소일 수 있으므로 None을 반환합니다.
+        """
+        for width in range(min(self.max_alias_words, len(tokens)), 0, -1):
+            for start in range(len(tokens) - width + 1):
+                place = self.aliases.get(" ".join(tokens[start:start + width]))
+                if place is None:
+                    continue
+                rest = tokens[:start] + tokens[start + width:]
+                if all(token in FILLER_WORDS or token in place.qualifiers for token in rest):
+                    return place
+                return None
+        return None
+
+    def _match_fuzzy(self, query: str) -> Optional[Place]:
+        """3-gram Dice 계수로 후보를 고르고, 편집 유사도가 fuzzy_threshold 이상인 가장 가까운 별칭을 찾습니다."""
+        if len(query.replace(" ", "")) < MIN_FUZZY_LENGTH:
+            return None
+        grams = set(trigrams(query))
+        counts: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting or len(posting) > self.max_posting:
+                continue
+            for alias_id in posting:
+                counts[alias_id] += 1
+
+        best_place, best_score = None, self.fuzzy_threshold
+        for alias_id, shared in counts.items():
+            alias, place, size = self._alias_list[alias_id]
+            if 2 * shared / (len(grams) + size) < self.candidate_threshold:
+                continue
+            # 오타는 길이를 크게 바꾸지 않으므로 길이가 많이 다른 별칭("york" / "new york")은 제외합니다.
+            if not 0.75 <= len(query) / len(alias) <= 1.34:
+                continue
+            score = SequenceMatcher(None, query, alias).ratio()
+            if score >= best_score:
+                best_place, best_score = place, score
+        return best_place
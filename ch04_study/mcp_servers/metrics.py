@@ -0,0 +1,200 @@
+"""
+MCP 서버 공용 요청 지표(metrics) 수집기
+JSON-RPC 메서드/도구별 요청 수, 오류 수, 지연 시간 히스토그램을 기록합니다.
+- render_prometheus(): Prometheus 텍스트 형식 (HTTP 서버의 /metrics)
+- snapshot(): dict 형식 (stdio 서버의 stats 메서드, 주기적 덤프)
+
+지표는 프로세스별로 집계됩니다. 여러 워커로 실행하면 워커마다 따로 노출됩니다.
+레이블 값은 클라이언트가 보낸 문자열이므로, 등록된 메서드/도구 이름이 아니면 "other"/"unknown"으로 묶어
+시계열 수가 무한히 늘어나지 않게 합니다.
+"""
+import functools
+import inspect
+import threading
+import time
+from typing import AbstractSet, Any, Callable, Dict, Iterable, Optional, Tuple
+
+# 초 단위 지연 시간 버킷 (0.1ms ~ 10s)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[str, str]  # (method, tool)
+
+OTHER_METHOD = "other"
+UNKNOWN_TOOL = "unknown"
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    def __init__(
+        self,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        methods: Optional[Iterable[str]] = None,
+        tools: Optional[Iterable[str]] = None,
+    ):
+        """methods/tools: 레이블로 그대로 남길 이름들. None이면 제한하지 않습니다."""
+        self.buckets = tuple(sorted(buckets))
+        self.methods = frozenset(methods) if methods is not None else None
+        self.tools = frozenset(tools) if tools is not None else None
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._histograms: Dict[LabelKey, _Histogram] = {}
+
+    def observe(self, method: str, tool: Optional[str], status: str, duration: float) -> None:
+        """요청 1건의 결과(status: ok/error)와 처리 시간(초)을 기록합니다."""
+        labels = bounded_labels(method, tool, self.methods, self.tools)
+        with self._lock:
+            counter_key = labels + (status,)
+            self._requests[counter_key] = self._requests.get(counter_key, 0) + 1
+
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                histogram = self._histograms[labels] = _Histogram(len(self.buckets))
+            histogram.total += duration
+            histogram.count += 1
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    histogram.counts[i] += 1
+                    break
+
+    # ─── Export ─────────────────────────────────────────────────────────────
+    def snapshot(self) -> Dict[str, Any]:
+        """메서드/도구별 요청 수, 오류 수, 평균 및 백분위 지연 시간(ms)을 반환합니다."""
+        with self._lock:
+            rows = []
+            for (method, tool), histogram in sorted(self._histograms.items()):
+                errors = self._requests.get((method, tool, "error"), 0)
+                rows.append({
+                    "method": method,
+                    "tool": tool or None,
+                    "count": histogram.count,
+                    "errors": errors,
+                    "mean_ms": histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+                    "p50_ms": self._quantile(histogram, 0.50) * 1000,
+                    "p99_ms": self._quantile(histogram, 0.99) * 1000,
+                })
+        return {"uptime_seconds": time.time() - self.started_at, "requests": rows}
+
+    def _quantile(self, histogram: _Histogram, q: float) -> float:
+        """버킷 경계값으로 근사한 백분위 값을 반환합니다."""
+        target = q * histogram.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, histogram.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+    def render_prometheus(self, prefix: str = "mcp") -> str:
+        lines = [
+            f"# HELP {prefix}_requests_total JSON-RPC requests by method, tool and status.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        with self._lock:
+            for (method, tool, status), value in sorted(self._requests.items()):
+                lines.append(f"{prefix}_requests_total{_labels(method=method, tool=tool, status=status)} {value}")
+
+            name = f"{prefix}_request_duration_seconds"
+            lines += [
+                f"# HELP {name} JSON-RPC request latency by method and tool.",
+                f"# TYPE {name} histogram",
+            ]
+            for (method, tool), histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(method=method, tool=tool, le=repr(bound))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(method=method, tool=tool, le='+Inf')} {histogram.count}")
+                lines.append(f"{name}_sum{_labels(method=method, tool=tool)} {histogram.total}")
+                lines.append(f"{name}_count{_labels(method=method, tool=tool)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def render_gauges(prefix: str, values: Dict[str, Any]) -> str:
+    """숫자 값만 골라 Prometheus gauge 형식으로 변환합니다. (캐시 통계 등)"""
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f"{prefix}_{key} {value}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def bounded_labels(
+    method: Optional[str],
+    tool: Optional[str],
+    methods: Optional[AbstractSet[str]],
+    tools: Optional[AbstractSet[str]],
+) -> LabelKey:
+    """등록되지 않은 메서드/도구 이름을 OTHER_METHOD/UNKNOWN_TOOL로 바꿉니다."""
+    method = method or ""
+    if methods is not None and method not in methods:
+        method = OTHER_METHOD
+    tool = tool or ""
+    if tool and tools is not None and tool not in tools:
+        tool = UNKNOWN_TOOL
+    return method, tool
+
+
+def request_labels(request: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """요청에서 (메서드, 도구 이름)을 꺼냅니다. 도구 이름은 tools/call에만 있습니다."""
+    method = request.get("method") or ""
+    tool = None
+    if method == "tools/call":
+        params = request.get("params") or {}
+        tool = params.get("name") if isinstance(params, dict) else None
+    if not isinstance(method, str):
+        method = OTHER_METHOD
+    if tool is not None and not isinstance(tool, str):
+        tool = UNKNOWN_TOOL
+    return method, tool
+
+
+def response_status(response: Optional[Dict[str, Any]]) -> str:
+    return "error" if response is not None and "error" in response else "ok"
+
+
+def instrument(registry: MetricsRegistry) -> Callable:
+    """handle_jsonrpc_request(request) -> dict 형태의 핸들러(동기/비동기)를 감싸 지표를 기록합니다."""
+    def decorator(handler: Callable) -> Callable:
+        if inspect.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def async_wrapper(request: Dict[str, Any]):
+                start = time.perf_counter()
+                status = "error"
+                try:
+                    response = await handler(request)
+                    status = response_status(response)
+                    return response
+                finally:
+                    registry.observe(*request_labels(request), status, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(handler)
+        def wrapper(request: Dict[str, Any]):
+            start = time.perf_counter()
+            status = "error"
+            try:
+                response = handler(request)
+                status = response_status(response)
+                return response
+            finally:
+                registry.observe(*request_labels(request), status, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,214 @@
+"""
+크기 제한이 있는 비동기 TTL 캐시 (stale-while-revalidate 지원)
+- TTL 이내: 캐시된 값을 그대로 반환합니다.
+- TTL이 지났지만 stale 허용 구간 이내: 오래된 값을 즉시 반환하고 백그라운드에서 갱신합니다.
+- 그 외: 로더를 기다려 새 값을 저장합니다.
+항목 수가 maxsize를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다(LRU).
+
+같은 키로 동시에 들어온 미스는 로더를 한 번만 실행하고 나머지는 그 결과를 함께 기다립니다. (캐시 쇄도 방지)
+백그라운드 갱신 태스크는 끝날 때까지 참조를 보관해서 도중에 가비지 컬렉션되지 않게 합니다.
+
+TTLCache는 프로세스 안에서만 공유됩니다. 여러 워커 프로세스로 서버를 띄울 때는
+RedisTTLCache를 사용하면 모든 워커가 같은 캐시를 봅니다.
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+
+class _LoadCoordinator:
+    """진행 중인 로드(키별 하나)와 백그라운드 태스크를 관리합니다. 두 캐시 구현이 함께 씁니다."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+        self.coalesced = 0
+
+    def spawn(self, coro: Awaitable[Any]) -> "asyncio.Task[Any]":
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def load_once(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """key의 로드가 이미 진행 중이면 그 결과를 기다리고, 아니면 새로 시작합니다."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self.spawn(load())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # 기다리던 호출 하나가 취소되어도 다른 호출자를 위해 로드는 계속합니다.
+        return await asyncio.shield(task)
+
+
+class TTLCache:
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        stale_ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: Set[Hashable] = set()
+        self._loads = _LoadCoordinator()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refresh_errors = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """key에 해당하는 값을 반환합니다. 없거나 만료되었으면 loader로 가져옵니다."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = self.clock() - stored_at
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    self._loads.spawn(self._refresh(key, loader))
+                return value
+
+        self.misses += 1
+        return await self._loads.load_once(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def aclose(self) -> None:
+        self._entries.clear()
+
+    async def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            self.set(key, await loader())
+        except Exception:
+            # 갱신에 실패하면 기존 값을 stale 구간이 끝날 때까지 계속 사용합니다.
+            self.refresh_errors += 1
+        finally:
+            self._refreshing.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self._loads.coalesced,
+            "evictions": self.evictions,
+            "refresh_errors": self.refresh_errors,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+
+class RedisTTLCache:
+    """Redis를 백엔드로 하는 TTL 캐시. TTLCache와 같은 인터페이스를 제공합니다.
+
+    값과 저장 시각을 함께 기록하고 Redis 키 만료를 ttl + stale_ttl로 설정합니다.
+    크기 제한과 제거는 Redis의 maxmemory 정책에 맡깁니다.
+    stale 갱신은 SET NX 락으로 워커 하나만 수행합니다.
+    적중/미스 카운터는 워커 프로세스별 값입니다.
+    """
+
+    def __init__(self, url: str, ttl: float = 300.0, stale_ttl: float = 60.0, prefix: str = "weather:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.prefix = prefix
+        self._loads = _LoadCoordinator()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        redis_key = f"{self.prefix}{key}"
+        raw = await self._redis.get(redis_key)
+        if raw is not None:
+            stored_at, value = json.loads(raw)
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self.hits += 1
+                return value
+            self.stale_hits += 1
+            if await self._redis.set(f"{redis_key}:refresh", 1, nx=True, ex=max(int(self.stale_ttl), 1)):
+                self._loads.spawn(self._refresh(redis_key, loader))
+            return value
+
+        self.misses += 1
+        # 같은 워커 안의 동시 미스만 합칩니다. (워커 간 쇄도는 TTL + stale 구간으로 완화)
+        return await self._loads.load_once(redis_key, lambda: self._load(redis_key, loader))
+
+    async def _load(self, redis_key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        await self._store(redis_key, value)
+        return value
+
+    async def _store(self, redis_key: str, value: Any) -> None:
+        payload = json.dumps([time.time(), value], ensure_ascii=False)
+        await self._redis.set(redis_key, payload, ex=max(int(self.ttl + self.stale_ttl), 1))
+
+    async def _refresh(self, redis_key: str, loader: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await self._store(redis_key, await loader())
+        except Exception:
+            self.refresh_errors += 1
+        finally:
+            await self._redis.delete(f"{redis_key}:refresh")
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self._loads.coalesced,
+            "refresh_errors": self.refresh_errors,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+
+def create_cache(url: Optional[str] = None, maxsize: int = 1024, ttl: float = 300.0, stale_ttl: float = 60.0):
+    """redis:// URL이 주어지면 워커 간 공유 캐시를, 아니면 프로세스 내 캐시를 만듭니다."""
+    if url:
+        return RedisTTLCache(url, ttl=ttl, stale_ttl=stale_ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
@@ -0,0 +1,88 @@
+"""
+날씨 MCP 서버의 업스트림 날씨 제공자(provider)
+- StaticWeatherProvider: 위치 인덱스의 더미 데이터를 반환합니다. (기본값)
+- HTTPWeatherProvider: 외부 날씨 API를 비동기로 호출합니다.
+  연결 풀을 공유하는 httpx.AsyncClient를 사용합니다.
+  같은 위치에 대한 동시 요청은 한 단계 위의 날씨 캐시(ttl_cache.py)가 하나로 합칩니다.
+
+async 핸들러 안에서 동기 requests 호출을 하면 이벤트 루프 전체가 멈추므로,
+업스트림 호출은 반드시 이 인터페이스(await provider.fetch(...))를 거치도록 합니다.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+try:
+    from .location_index import LocationIndex
+except ImportError:  # 스크립트로 직접 실행하는 경우
+    from location_index import LocationIndex
+
+
+class WeatherProvider(ABC):
+    @abstractmethod
+    async def fetch(self, location: str) -> str:
+        """위치에 대한 날씨 설명 문자열을 반환합니다."""
+
+    async def aclose(self) -> None:
+        """보유한 연결 등 리소스를 정리합니다."""
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class StaticWeatherProvider(WeatherProvider):
+    """위치 인덱스에 저장된 더미 날씨 데이터를 반환합니다."""
+
+    def __init__(self, index: LocationIndex):
+        self.index = index
+
+    async def fetch(self, location: str) -> str:
+        place = self.index.resolve(location)
+        if place is not None:
+            return place.weather
+        return f"{location}의 날씨 정보를 찾을 수 없습니다. 대략 화씨 65도 (섭씨 18도)입니다."
+
+
+class HTTPWeatherProvider(WeatherProvider):
+    """`GET {base_url}/weather?location=...` 형태의 날씨 API를 호출합니다.
+
+    응답 JSON의 "summary" 필드를 날씨 설명으로 사용합니다.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 5.0,
+        connect_timeout: float = 2.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+    ):
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+        )
+        self.requests = 0
+
+    async def fetch(self, location: str) -> str:
+        self.requests += 1
+        response = await self._client.get("/weather", params={"location": location})
+        response.raise_for_status()
+        return response.json()["summary"]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests}
+
+
+def create_provider(index: LocationIndex, base_url: Optional[str] = None, timeout: float = 5.0) -> WeatherProvider:
+    """base_url이 주어지면 HTTP 제공자를, 아니면 더미 데이터 제공자를 만듭니다."""
+    if base_url:
+        return HTTPWeatherProvider(base_url, timeout=timeout)
+    return StaticWeatherProvider(index)
@@ -0,0 +1,225 @@
+"""
+MCP 세션 관리자
+설정된 MCP 서버마다 오래 유지되는 세션을 하나씩 열어 두고 재사용합니다.
+도구 호출마다 stdio 서브프로세스를 띄우거나 HTTP 세션 핸드셰이크를 반복하지 않습니다.
+
+- "transport": "in_process" 연결은 서브프로세스 없이 같은 프로세스의 핸들러로 전달합니다. (mcp_in_process.py)
+- 세션은 서버별 백그라운드 태스크가 소유합니다. (anyio 컨텍스트를 같은 태스크에서 열고 닫기 위함)
+- 일정 시간 사용하지 않은 세션은 사용 전에 ping으로 상태를 확인하고, 실패하면 다시 연결합니다.
+- 발견한 도구는 이름 → 도구 dict로 보관하며, TTL이 지나거나 서버가
+  notifications/tools/list_changed를 보내면 다음 조회 때 다시 불러옵니다.
+- coalesce_tools에 지정한 (부작용 없는) 도구는 같은 인자로 동시에 들어온 호출을 한 번만 실행합니다.
+"""
+import asyncio
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import anyio
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import ClientSession, types
+from mcp.shared.exceptions import McpError
+
+from mcp_in_process import in_process_session
+
+# 저장소 루트의 공통 모듈(common/)을 가져올 수 있도록 경로를 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.singleflight import AsyncSingleFlight  # noqa: E402
+from common.tracing import get_tracer  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """세션이 끊어져서 발생한 오류인지 확인합니다. (도구 자체의 오류는 재연결 대상이 아님)"""
+    if isinstance(error, (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, OSError)):
+        return True
+    return isinstance(error, McpError) and error.error.code == types.CONNECTION_CLOSED
+
+
+class ToolUnavailableError(LookupError):
+    """연결된 서버 어디에도 해당 이름의 도구가 없습니다. (다시 연결한 뒤 도구 목록에서 빠진 경우 포함)"""
+
+    def __init__(self, name: str):
+        super().__init__(f"MCP 도구 '{name}'을(를) 사용할 수 없습니다.")
+        self.name = name
+
+
+@dataclass
+class _ServerState:
+    name: str
+    connection: Dict[str, Any]
+    session: Optional[ClientSession] = None
+    runner: Optional[asyncio.Task] = None
+    closed: asyncio.Event = field(default_factory=asyncio.Event)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_ok: float = 0.0
+    tools: Dict[str, BaseTool] = field(default_factory=dict)
+    tools_loaded_at: float = 0.0
+    tools_dirty: bool = True
+
+
+class MCPSessionManager:
+    def __init__(
+        self,
+        connections: Dict[str, Dict[str, Any]],
+        tools_ttl: float = 300.0,
+        health_check_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        coalesce_tools: Iterable[str] = (),
+    ):
+        self.connections = connections
+        self.tools_ttl = tools_ttl
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self._servers: Dict[str, _ServerState] = {}
+        self._tool_servers: Dict[str, str] = {}
+        self.reconnects = 0
+        self.coalesce_tools = frozenset(coalesce_tools)
+        self.tool_flights = AsyncSingleFlight()
+
+    # ─── Sessions ───────────────────────────────────────────────────────────
+    def _state(self, server: str) -> _ServerState:
+        state = self._servers.get(server)
+        if state is None:
+            state = self._servers[server] = _ServerState(server, self.connections[server])
+        return state
+
+    async def session(self, server: str) -> ClientSession:
+        """서버의 세션을 반환합니다. 필요하면 연결하거나 상태 확인 후 다시 연결합니다."""
+        state = self._state(server)
+        async with state.lock:
+            if state.session is not None and time.monotonic() - state.last_ok > self.health_check_interval:
+                try:
+                    await asyncio.wait_for(state.session.send_ping(), self.ping_timeout)
+                    state.last_ok = time.monotonic()
+                except Exception as e:
+                    logger.warning("MCP 서버 '%s' 상태 확인 실패, 다시 연결합니다: %s", server, e)
+                    await self._disconnect(state)
+                    self.reconnects += 1
+
+            if state.session is None:
+                await self._connect(state)
+            return state.session
+
+    async def _connect(self, state: _ServerState) -> None:
+        state.closed = asyncio.Event()
+        ready = asyncio.get_running_loop().create_future()
+        state.runner = asyncio.create_task(self._run_session(state, ready), name=f"mcp-session-{state.name}")
+        await ready
+        state.last_ok = time.monotonic()
+        state.tools_dirty = True
+
+    async def _run_session(self, state: _ServerState, ready: asyncio.Future) -> None:
+        connection = dict(state.connection)
+        session_kwargs = dict(connection.get("session_kwargs") or {})
+        session_kwargs.setdefault("message_handler", self._message_handler(state))
+        connection["session_kwargs"] = session_kwargs
+        if connection.get("transport") == "in_process":
+            open_session = in_process_session(connection)
+        else:
+            open_session = create_session(connection)
+        try:
+            async with open_session as session:
+                await session.initialize()
+                state.session = session
+                ready.set_result(session)
+                await state.closed.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCP 서버 '%s' 세션이 종료되었습니다: %s", state.name, e)
+        finally:
+            state.session = None
+
+    def _message_handler(self, state: _ServerState):
+        async def handle(message: Any) -> None:
+            if isinstance(message, types.ServerNotification) and isinstance(
+                message.root, types.ToolListChangedNotification
+            ):
+                state.tools_dirty = True
+        return handle
+
+    async def _disconnect(self, state: _ServerState) -> None:
+        state.closed.set()
+        if state.runner is not None:
+            await asyncio.gather(state.runner, return_exceptions=True)
+            state.runner = None
+        state.session = None
+
+    async def reconnect(self, server: str) -> None:
+        state = self._state(server)
+        async with state.lock:
+            await self._disconnect(state)
+            self.reconnects += 1
+
+    async def close(self) -> None:
+        """모든 세션을 닫습니다."""
+        for state in self._servers.values():
+            await self._disconnect(state)
+
+    # ─── Tools ──────────────────────────────────────────────────────────────
+    async def _server_tools(self, server: str) -> Dict[str, BaseTool]:
+        state = self._state(server)
+        session = await self.session(server)
+        if state.tools_dirty or time.monotonic() - state.tools_loaded_at > self.tools_ttl:
+            tools = await load_mcp_tools(session)
+            state.tools = {tool.name: tool for tool in tools}
+            state.tools_loaded_at = time.monotonic()
+            state.tools_dirty = False
+            for name in state.tools:
+                self._tool_servers[name] = server
+        return state.tools
+
+    async def get_tools(self) -> Dict[str, BaseTool]:
+        """모든 서버의 도구를 이름 → 도구 dict로 반환합니다."""
+        tools: Dict[str, BaseTool] = {}
+        for server in self.connections:
+            try:
+                tools.update(await self._server_tools(server))
+            except Exception as e:
+                # 한 서버가 내려가 있어도 나머지 서버의 도구는 사용할 수 있어야 합니다.
+                logger.warning("MCP 서버 '%s'의 도구 목록을 가져오지 못했습니다: %s", server, e)
+        return tools
+
+    async def get_tool(self, name: str) -> Optional[BaseTool]:
+        server = self._tool_servers.get(name)
+        if server is None:
+            return (await self.get_tools()).get(name)
+        return (await self._server_tools(server)).get(name)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """도구를 호출합니다. 연결 오류가 나면 한 번 다시 연결한 뒤 재시도합니다."""
+        with get_tracer().span(f"tool:{name}", kind="tool", tool=name, server=self._tool_servers.get(name)):
+            if name in self.coalesce_tools:
+                key = (name, json.dumps(arguments, ensure_ascii=False, sort_keys=True, default=str))
+                return await self.tool_flights.do(key, self._call_tool, name, arguments)
+            return await self._call_tool(name, arguments)
+
+    async def _require_tool(self, name: str) -> BaseTool:
+        tool = await self.get_tool(name)
+        if tool is None:
+            raise ToolUnavailableError(name)
+        return tool
+
+    async def _call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        tool = await self._require_tool(name)
+        try:
+            result = await tool.ainvoke(arguments)
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            server = self._tool_servers[name]
+            logger.warning("MCP 도구 '%s' 호출 실패, 서버 '%s'에 다시 연결합니다: %s", name, server, e)
+            await self.reconnect(server)
+            tool = await self._require_tool(name)
+            result = await tool.ainvoke(arguments)
+        self._state(self._tool_servers[name]).last_ok = time.monotonic()
+        return result
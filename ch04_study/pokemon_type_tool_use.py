@@ -1,7 +1,14 @@
+import sys
+from functools import lru_cache
+from pathlib import Path
 from langchain_core.tools import tool
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, ToolMessage
 import requests
-from langchain_groq import ChatGroq  # 이 줄을 꼭 추가해야 합니다!
+
+# 저장소 루트의 공통 모듈(common/)을 가져올 수 있도록 경로를 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.resilience import http_client  # noqa: E402
+from common.tool_cache import cache_policy, default_executor  # noqa: E402
 
 # 환경변수 확인
 import os
@@ -17,42 +24,64 @@ except ImportError:
 #         "환경변수 또는 .env 파일에서 설정해주세요."
 #     )
 
+# 포켓몬 타입은 거의 바뀌지 않으므로 하루 동안 캐시하고, 같은 이름의 동시 호출은 한 번만 보냅니다.
+POKEMON_CACHE_TTL = 24 * 3600.0
+
+
+@cache_policy(ttl=POKEMON_CACHE_TTL)
 @tool
 def get_pokemon_type(pokemon: str) -> str:
     """포켓몬의 타입을 가져옵니다."""
     api_url = f"https://pokeapi.co/api/v2/pokemon/{pokemon.lower()}"
     try:
-        response = requests.get(api_url)
-        if response.status_code == 200:
-            data = response.json()
-            types = [t["type"]["name"] for t in data["types"]]
-            return ", ".join(types)
-        else:
-            return f"포켓몬의 타입을 가져오는데 실패했습니다: {pokemon}"
-    except requests.exceptions.RequestException:
-        return f"포켓몬의 타입을 가져오는데 실패했습니다: {pokemon}"
+        # 타임아웃 + 재시도 + 서킷 브레이커, p95보다 늦으면 같은 GET을 한 번 더 보냅니다.
+        response = http_client("pokeapi", hedge=True).get(api_url)
+    except requests.exceptions.RequestException as e:
+        raise ValueError(f"포켓몬의 타입을 가져오는데 실패했습니다: {pokemon} ({e})")
+    if response.status_code == 200:
+        data = response.json()
+        types = [t["type"]["name"] for t in data["types"]]
+        return ", ".join(types)
+    if response.status_code == 404:
+        return f"포켓몬을 찾을 수 없습니다: {pokemon}"
+    # 일시적인 오류(429/5xx 등)는 예외로 알려서 실패 메시지가 캐시되지 않게 합니다.
+    raise ValueError(f"포켓몬의 타입을 가져오는데 실패했습니다: {pokemon} (HTTP {response.status_code})")
 
 
 # LLM 초기화 및 도구 바인딩
-llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0
-    )
-llm_with_tools = llm.bind_tools([get_pokemon_type])
-
-messages = [HumanMessage("피카츄의 타입은 무엇인가요? 영문으로는 pikachu")]
-
-ai_msg = llm_with_tools.invoke(messages)
-messages.append(ai_msg)
-
-for tool_call in ai_msg.tool_calls:
-    tool_msg = get_pokemon_type.invoke(tool_call)
-    
-    print(tool_msg.name)
-    print(tool_call['args'])
-    print(tool_msg.content)
-    messages.append(tool_msg)
-    print()
-
-final_response = llm_with_tools.invoke(messages)
-print(final_response.content)
\ No newline at end of file
+# import 시점이 아니라 처음 필요할 때 한 번만 만들고 재사용합니다.
+@lru_cache(maxsize=None)
+def get_llm_with_tools():
+    # 요청 제한(RPM/TPM, 적응형 동시성)과 응답 캐시가 적용된 공용 채팅 모델을 사용합니다.
+    from common.llm import create_chat_model
+
+    llm = create_chat_model()
+    return llm.bind_tools([get_pokemon_type])
+
+def main():
+    # 도구 호출은 공용 실행기로 실행합니다. (도구별 캐시 정책에 따라 결과 재사용)
+    tool_executor = default_executor()
+    llm_with_tools = get_llm_with_tools()
+
+    messages = [HumanMessage("피카츄의 타입은 무엇인가요? 영문으로는 pikachu")]
+
+    ai_msg = llm_with_tools.invoke(messages)
+    messages.append(ai_msg)
+
+    for tool_call in ai_msg.tool_calls:
+        try:
+            tool_msg = tool_executor.invoke(get_pokemon_type, tool_call)
+        except ValueError as e:
+            tool_msg = ToolMessage(content=str(e), tool_call_id=tool_call["id"], name=get_pokemon_type.name, status="error")
+
+        print(tool_msg.name)
+        print(tool_call['args'])
+        print(tool_msg.content)
+        messages.append(tool_msg)
+        print()
+
+    final_response = llm_with_tools.invoke(messages)
+    print(final_response.content)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
+import sys
+from functools import lru_cache
+from pathlib import Path
 from langchain_core.tools import tool
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage
 import requests
-from langchain_groq import ChatGroq  # 이 줄을 꼭 추가해야 합니다!
-import yfinance as yf
+
+# 저장소 루트의 공통 모듈(common/)을 가져올 수 있도록 경로를 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.tool_cache import cache_policy, default_executor  # noqa: E402
+
 # 환경변수 확인
 import os
 try:
@@ -18,6 +23,8 @@ except ImportError:
 #         "환경변수 또는 .env 파일에서 설정해주세요."
 #     )
 
+# 주가는 계속 바뀌므로 캐시하지 않고, 같은 티커로 동시에 들어온 호출만 한 번으로 합칩니다.
+@cache_policy()
 @tool
 def get_stock_price(ticker: str) -> float:
     """주식 시장 거래소 거래 티커에 대한 주식 가격을 가져옵니다."""
@@ -30,6 +37,9 @@ def get_stock_price(ticker: str) -> float:
     #         return f"주식 가격을 가져오는데 실패했습니다: {ticker}"
     # except requests.exceptions.RequestException:
     #     return f"주식 가격을 가져오는데 실패했습니다: {ticker}"
+    # yfinance(pandas 포함)는 무거우므로 도구를 실제로 호출할 때 불러옵니다.
+    import yfinance as yf
+
     try:
         # 티커 심볼로 주식 정보 객체 생성
         stock = yf.Ticker(ticker)
@@ -48,25 +58,36 @@ def get_stock_price(ticker: str) -> float:
         return f"데이터를 가져오는 중 오류가 발생했습니다: {str(e)}"
 
 # LLM 초기화 및 도구 바인딩
-llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0
-    )
-llm_with_tools = llm.bind_tools([get_stock_price])
+# import 시점이 아니라 처음 필요할 때 한 번만 만들고 재사용합니다.
+@lru_cache(maxsize=None)
+def get_llm_with_tools():
+    # 요청 제한(RPM/TPM, 적응형 동시성)과 응답 캐시가 적용된 공용 채팅 모델을 사용합니다.
+    from common.llm import create_chat_model
+
+    llm = create_chat_model()
+    return llm.bind_tools([get_stock_price])
+
+def main():
+    # 도구 호출은 공용 실행기로 실행합니다. (도구별 캐시 정책에 따라 결과 재사용)
+    tool_executor = default_executor()
+    llm_with_tools = get_llm_with_tools()
+
+    messages = [HumanMessage("삼성전자 주가 알려줘")]
+
+    ai_msg = llm_with_tools.invoke(messages)
+    messages.append(ai_msg)
 
-messages = [HumanMessage("삼성전자 주가 알려줘")]
+    for tool_call in ai_msg.tool_calls:
+        tool_msg = tool_executor.invoke(get_stock_price, tool_call)
 
-ai_msg = llm_with_tools.invoke(messages)
-messages.append(ai_msg)
+        print(tool_msg.name)
+        print(tool_call['args'])
+        print(tool_msg.content)
+        messages.append(tool_msg)
+        print()
 
-for tool_call in ai_msg.tool_calls:
-    tool_msg = get_stock_price.invoke(tool_call)
-    
-    print(tool_msg.name)
-    print(tool_call['args'])
-    print(tool_msg.content)
-    messages.append(tool_msg)
-    print()
+    final_response = llm_with_tools.invoke(messages)
+    print(final_response.content)
 
-final_response = llm_with_tools.invoke(messages)
-print(final_response.content)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
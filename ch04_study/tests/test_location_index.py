@@ -0,0 +1,56 @@
+"""
+위치 인덱스 해석 테스트
+실행: python -m pytest ch04_study/tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# mcp_servers 패키지를 가져올 수 있도록 ch04_study를 경로에 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mcp_servers.location_index import LocationIndex  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def index():
+    return LocationIndex.from_file()
+
+
+def key_of(index, location):
+    place = index.resolve(location)
+    return place.key if place is not None else None
+
+
+@pytest.mark.parametrize("location, expected", [
+    ("New York", "new_york"),
+    ("NYC", "new_york"),
+    ("weather in new york", "new_york"),
+    ("서울의 날씨", "seoul"),
+    ("Seoul, Korea", "seoul"),
+    ("London, UK", "london"),
+    ("샌프란시스코", "san_francisco"),
+])
+def test_known_locations(index, location, expected):
+    assert key_of(index, location) == expected
+
+
+@pytest.mark.parametrize("location, expected", [
+    ("Londn", "london"),
+    ("Seol", "seoul"),
+    ("san fransisco", "san_francisco"),
+])
+def test_typos(index, location, expected):
+    assert key_of(index, location) == expected
+
+
+@pytest.mark.parametrize("location", [
+    "Newark",
+    "new",
+    "york",
+    "London Ontario",
+    "Paris",
+    "",
+])
+def test_unknown_locations(index, location):
+    assert index.resolve(location) is None
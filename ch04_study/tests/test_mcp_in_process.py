@@ -0,0 +1,54 @@
+"""
+프로세스 내 MCP 전송 테스트 (mcp 패키지가 없으면 건너뜁니다)
+실행: python -m pytest ch04_study/tests
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("mcp")
+import anyio  # noqa: E402
+from mcp.shared.exceptions import McpError  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mcp_in_process import in_process_session  # noqa: E402
+
+INITIALIZE_RESULT = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}}, "serverInfo": {"name": "test", "version": "1.0.0"}}
+TOOLS_LIST_RESULT = {"tools": [{"name": "sleep", "inputSchema": {"type": "object"}}]}
+
+
+async def handler(request):
+    method = request["method"]
+    if method == "initialize":
+        return {"jsonrpc": "2.0", "id": request["id"], "result": INITIALIZE_RESULT}
+    if method == "tools/list":
+        return {"jsonrpc": "2.0", "id": request["id"], "result": TOOLS_LIST_RESULT}
+    seconds = request["params"]["arguments"]["seconds"]
+    if seconds < 0:
+        raise RuntimeError("boom")
+    await anyio.sleep(seconds)
+    return {"jsonrpc": "2.0", "id": request["id"], "result": {"content": [{"type": "text", "text": str(seconds)}]}}
+
+
+def test_requests_run_concurrently_and_errors_do_not_end_the_session():
+    async def scenario():
+        async with in_process_session({"handler": handler}) as session:
+            await session.initialize()
+            with pytest.raises(McpError, match="boom"):
+                await session.call_tool("sleep", {"seconds": -1})
+
+            start = time.perf_counter()
+            async with anyio.create_task_group() as tg:
+                for _ in range(10):
+                    tg.start_soon(session.call_tool, "sleep", {"seconds": 0.1})
+            elapsed = time.perf_counter() - start
+
+            result = await session.call_tool("sleep", {"seconds": 0})
+            return elapsed, result.content[0].text
+
+    elapsed, text = anyio.run(scenario)
+    # 순차 처리였다면 1초 이상 걸립니다.
+    assert elapsed < 0.5
+    assert text == "0"
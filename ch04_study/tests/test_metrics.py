@@ -0,0 +1,30 @@
+"""
+요청 지표 레이블 테스트
+실행: python -m pytest ch04_study/tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mcp_servers.metrics import MetricsRegistry, instrument  # noqa: E402
+
+
+def test_unregistered_names_collapse_into_fixed_labels():
+    registry = MetricsRegistry(methods=["ping", "tools/call"], tools=["math"])
+
+    @instrument(registry)
+    def handler(request):
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": {}}
+
+    for method in ("ping", "random-1", "random-2", None, {"not": "a string"}):
+        handler({"jsonrpc": "2.0", "id": 1, "method": method})
+    for tool in ("math", "evil-1", "evil-2", 42):
+        handler({"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": tool}})
+
+    rows = {(row["method"], row["tool"]): row["count"] for row in registry.snapshot()["requests"]}
+    assert rows == {
+        ("other", None): 4,
+        ("ping", None): 1,
+        ("tools/call", "math"): 1,
+        ("tools/call", "unknown"): 3,
+    }
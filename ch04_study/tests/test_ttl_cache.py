@@ -0,0 +1,78 @@
+"""
+TTL 캐시의 동시 미스 병합과 백그라운드 갱신 테스트
+실행: python -m pytest ch04_study/tests
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mcp_servers.ttl_cache import TTLCache  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_concurrent_misses_run_loader_once():
+    async def scenario():
+        cache = TTLCache(ttl=10)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        values = await asyncio.gather(*(cache.get_or_load("seoul", loader) for _ in range(20)))
+        return cache, calls, values
+
+    cache, calls, values = asyncio.run(scenario())
+    assert calls == 1
+    assert values == [1] * 20
+    assert cache.stats()["coalesced"] == 19
+
+
+def test_failed_load_is_shared_and_not_kept_in_flight():
+    async def scenario():
+        cache = TTLCache(ttl=10)
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(*(cache.get_or_load("seoul", loader) for _ in range(3)), return_exceptions=True)
+        return cache, results
+
+    cache, results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not cache._loads._inflight
+    assert len(cache) == 0
+
+
+def test_stale_value_is_returned_and_refreshed_in_background():
+    async def scenario():
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, stale_ttl=5, clock=clock)
+
+        async def fresh():
+            return "new"
+
+        cache.set("seoul", "old")
+        clock.now = 12
+        stale = await cache.get_or_load("seoul", fresh)
+        pending = set(cache._loads._tasks)
+        await asyncio.gather(*pending)
+        return cache, stale, pending
+
+    cache, stale, pending = asyncio.run(scenario())
+    assert stale == "old"
+    assert len(pending) == 1
+    assert not cache._loads._tasks
+    assert cache._entries["seoul"][1] == "new"
+
@@ -1,8 +1,11 @@
-from langchain.chat_models import init_chat_model
-from langchain_community.tools import WikipediaQueryRun
-from langchain_community.utilities import WikipediaAPIWrapper
+import sys
+from functools import lru_cache
+from pathlib import Path
 from langchain_core.messages import HumanMessage
-from langchain_groq import ChatGroq  # 이 줄을 꼭 추가해야 합니다!
+
+# 저장소 루트의 공통 모듈(common/)을 가져올 수 있도록 경로를 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.tool_cache import cache_policy, default_executor  # noqa: E402
 
 # 환경변수 확인
 import os
@@ -18,29 +21,49 @@ except ImportError:
 #         "환경변수 또는 .env 파일에서 설정해주세요."
 #     )
 
-api_wrapper = WikipediaAPIWrapper(top_k_results=1, doc_content_chars_max=300)
-tool = WikipediaQueryRun(api_wrapper=api_wrapper)
+# 위키백과 문서 요약은 천천히 바뀌므로 하루 동안 캐시합니다.
+WIKIPEDIA_CACHE_TTL = 24 * 3600.0
+
+# 위키백과 도구(wikipedia 패키지 포함)도 처음 필요할 때 한 번만 만듭니다.
+@lru_cache(maxsize=None)
+def get_wikipedia_tool():
+    from langchain_community.tools import WikipediaQueryRun
+    from langchain_community.utilities import WikipediaAPIWrapper
+
+    api_wrapper = WikipediaAPIWrapper(top_k_results=1, doc_content_chars_max=300)
+    return cache_policy(ttl=WIKIPEDIA_CACHE_TTL)(WikipediaQueryRun(api_wrapper=api_wrapper))
 
 # LLM 초기화 및 도구 바인딩
-llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0
-    )
-llm_with_tools = llm.bind_tools([tool])
-
-messages = [HumanMessage("Buzz Aldrin의 주요 업적은 무엇인가요?")]
-
-ai_msg = llm_with_tools.invoke(messages)
-messages.append(ai_msg)
-
-for tool_call in ai_msg.tool_calls:
-    tool_msg = tool.invoke(tool_call)
-    
-    print(tool_msg.name)
-    print(tool_call['args'])
-    print(tool_msg.content)
-    messages.append(tool_msg)
-    print()
-
-final_response = llm_with_tools.invoke(messages)
-print(final_response.content)
\ No newline at end of file
+# import 시점이 아니라 처음 필요할 때 한 번만 만들고 재사용합니다.
+@lru_cache(maxsize=None)
+def get_llm_with_tools():
+    # 요청 제한(RPM/TPM, 적응형 동시성)과 응답 캐시가 적용된 공용 채팅 모델을 사용합니다.
+    from common.llm import create_chat_model
+
+    llm = create_chat_model()
+    return llm.bind_tools([get_wikipedia_tool()])
+
+def main():
+    # 도구 호출은 공용 실행기로 실행합니다. (도구별 캐시 정책에 따라 결과 재사용)
+    tool_executor = default_executor()
+    llm_with_tools = get_llm_with_tools()
+
+    messages = [HumanMessage("Buzz Aldrin의 주요 업적은 무엇인가요?")]
+
+    ai_msg = llm_with_tools.invoke(messages)
+    messages.append(ai_msg)
+
+    for tool_call in ai_msg.tool_calls:
+        tool_msg = tool_executor.invoke(get_wikipedia_tool(), tool_call)
+
+        print(tool_msg.name)
+        print(tool_call['args'])
+        print(tool_msg.content)
+        messages.append(tool_msg)
+        print()
+
+    final_response = llm_with_tools.invoke(messages)
+    print(final_response.content)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+LCEL 체인 대량 실행 벤치마크
+같은 프롬프트 N개(기본 1,000개)를 다음 방식으로 실행하고 걸린 시간과 처리량을 비교합니다.
+
+- invoke: 하나씩 순서대로 chain.invoke
+- batch: chain.batch(max_concurrency=...) (스레드 풀)
+- abatch: chain.abatch(max_concurrency=...) (이벤트 루프)
+
+기본값은 고정 지연을 흉내 내는 가짜 모델(--fake-latency)을 사용하므로 API 키 없이 실행됩니다.
+실제 모델로 측정하려면 --real을 지정합니다. (요청 수만큼 API 호출이 발생합니다)
+반복 측정 시 LLM 응답 캐시에 걸리지 않도록 LLM_CACHE=off와 함께 실행합니다.
+
+실행: python ch05_study/benchmarks/lcel_batch_benchmark.py [--prompts 1000] [--max-concurrency 16 64]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lcel_chain import arun_batch, build_chain, run_batch  # noqa: E402
+
+
+class FakeLatencyChatModel(BaseChatModel):
+    """요청마다 latency초를 기다린 뒤 고정 응답을 돌려주는 가짜 모델"""
+
+    latency: float = 0.05
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency"
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"echo: {messages[-1].content}"))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+
+def report(name: str, count: int, elapsed: float, baseline: Optional[float]) -> None:
+    speedup = f"{baseline / elapsed:>7.1f}x" if baseline else f"{'-':>8}"
+    print(f"{name:<22} {count:>7} {elapsed:>10.2f} {count / elapsed:>10.1f} {speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=1000)
+    parser.add_argument("--max-concurrency", nargs="+", type=int, default=[16, 64])
+    parser.add_argument("--fake-latency", type=float, default=0.05, help="가짜 모델의 요청당 지연(초)")
+    parser.add_argument("--real", action="store_true", help="가짜 모델 대신 실제 모델을 호출합니다.")
+    parser.add_argument("--skip-sequential", action="store_true", help="순차 invoke 측정을 건너뜁니다. (실제 모델용)")
+    args = parser.parse_args()
+
+    chain = build_chain(None if args.real else FakeLatencyChatModel(latency=args.fake_latency))
+    texts = [f"{i}번 질문: 숫자 {i}의 제곱은 얼마인가요?" for i in range(args.prompts)]
+
+    print(f"{'mode':<22} {'prompts':>7} {'seconds':>10} {'prompts/s':>10} {'speedup':>8}")
+    baseline = None
+    if not args.skip_sequential:
+        start = time.perf_counter()
+        for text in texts:
+            chain.invoke(text)
+        baseline = time.perf_counter() - start
+        report("invoke (sequential)", len(texts), baseline, None)
+
+    for concurrency in args.max_concurrency:
+        start = time.perf_counter()
+        run_batch(texts, max_concurrency=concurrency, chain=chain)
+        report(f"batch ({concurrency})", len(texts), time.perf_counter() - start, baseline)
+
+        start = time.perf_counter()
+        asyncio.run(arun_batch(texts, max_concurrency=concurrency, chain=chain))
+        report(f"abatch ({concurrency})", len(texts), time.perf_counter() - start, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+지원 요청 분류기 (billing / technical)
+LLM을 호출하기 전에 로컬 단계에서 먼저 분류합니다.
+
+1. 키워드 규칙: 한쪽 레이블의 키워드만 등장하면 바로 결정합니다.
+2. 나이브 베이즈 모델: 레이블된 예제(data/issue_examples.jsonl)로 학습한 문자 n-gram 모델입니다.
+   (한국어도 형태소 분석기 없이 처리할 수 있도록 문자 단위 n-gram을 사용합니다.)
+3. LLM: 앞 단계의 확신도가 임계값보다 낮을 때만 호출합니다.
+
+단계별 처리 건수는 stats()로 확인할 수 있습니다.
+"""
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LABELS = ("billing", "technical")
+DEFAULT_EXAMPLES_PATH = Path(__file__).resolve().parent / "data" / "issue_examples.jsonl"
+
+KEYWORD_RULES = {
+    "billing": (
+        "인보이스", "청구", "결제", "환불", "요금", "영수증", "세금계산서", "구독",
+        "invoice", "refund", "billing", "bill", "payment", "charge", "receipt", "subscription",
+    ),
+    "technical": (
+        "로그인", "비밀번호", "오류", "에러", "느려", "느립", "성능", "접속", "튕겨", "버그", "인증",
+        "login", "log in", "password", "error", "bug", "crash", "slow", "performance", "timeout",
+    ),
+}
+
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class Classification:
+    label: str
+    confidence: float
+    stage: str  # "rule" | "model" | "llm"
+
+
+def char_ngrams(text: str, sizes: Tuple[int, ...] = (2, 3)) -> List[str]:
+    text = f" {_SPACES.sub(' ', text.lower()).strip()} "
+    return [text[i:i + n] for n in sizes for i in range(len(text) - n + 1)]
+
+
+def load_examples(path: Path = DEFAULT_EXAMPLES_PATH) -> List[Tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [(record["text"], record["label"]) for record in map(json.loads, filter(str.strip, f))]
+
+
+class NaiveBayesModel:
+    """문자 n-gram 다항 나이브 베이즈 분류기"""
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.log_priors: Dict[str, float] = {}
+        self.log_likelihoods: Dict[str, Dict[str, float]] = {}
+        self.log_unseen: Dict[str, float] = {}
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "NaiveBayesModel":
+        label_counts: Counter = Counter()
+        feature_counts: Dict[str, Counter] = defaultdict(Counter)
+        for text, label in examples:
+            label_counts[label] += 1
+            feature_counts[label].update(char_ngrams(text))
+
+        vocabulary = set().union(*feature_counts.values())
+        total = sum(label_counts.values())
+        for label, count in label_counts.items():
+            denominator = sum(feature_counts[label].values()) + self.alpha * len(vocabulary)
+            self.log_priors[label] = math.log(count / total)
+            self.log_likelihoods[label] = {
+                feature: math.log((n + self.alpha) / denominator) for feature, n in feature_counts[label].items()
+            }
+            self.log_unseen[label] = math.log(self.alpha / denominator)
+        return self
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        features = char_ngrams(text)
+        scores = {}
+        for label, prior in self.log_priors.items():
+            likelihoods, unseen = self.log_likelihoods[label], self.log_unseen[label]
+            scores[label] = prior + sum(likelihoods.get(feature, unseen) for feature in features)
+        top = max(scores.values())
+        exp_scores = {label: math.exp(score - top) for label, score in scores.items()}
+        norm = sum(exp_scores.values())
+        return {label: value / norm for label, value in exp_scores.items()}
+
+
+class IssueClassifier:
+    def __init__(
+        self,
+        model: Optional[NaiveBayesModel] = None,
+        llm_classify: Optional[Callable[[str], str]] = None,
+        threshold: float = 0.99,
+    ):
+        self.model = model if model is not None else NaiveBayesModel().fit(load_examples())
+        self.llm_classify = llm_classify
+        self.threshold = threshold
+        self.stage_counts: Counter = Counter()
+
+    def classify(self, message: str) -> Classification:
+        result = self._classify_rule(message)
+        if result is None:
+            result = self._classify_model(message)
+        if result is None:
+            result = self._classify_llm(message)
+        self.stage_counts[result.stage] += 1
+        return result
+
+    def _classify_rule(self, message: str) -> Optional[Classification]:
+        text = message.lower()
+        hits = {label: sum(keyword in text for keyword in keywords) for label, keywords in KEYWORD_RULES.items()}
+        matched = [label for label, count in hits.items() if count]
+        if len(matched) == 1:
+            return Classification(matched[0], 1.0, "rule")
+        return None
+
+    def _classify_model(self, message: str) -> Optional[Classification]:
+        probabilities = self.model.predict_proba(message)
+        label = max(probabilities, key=probabilities.get)
+        confidence = probabilities[label]
+        # LLM 폴백이 없으면 확신도가 낮아도 모델 결과를 그대로 사용합니다.
+        if confidence >= self.threshold or self.llm_classify is None:
+            return Classification(label, confidence, "model")
+        return None
+
+    def _classify_llm(self, message: str) -> Classification:
+        return Classification(self.llm_classify(message), 0.0, "llm")
+
+    def stats(self) -> Dict[str, object]:
+        total = sum(self.stage_counts.values())
+        return {
+            "total": total,
+            **{f"{stage}_hits": self.stage_counts[stage] for stage in ("rule", "model", "llm")},
+            **{f"{stage}_rate": self.stage_counts[stage] / total if total else 0.0 for stage in ("rule", "model", "llm")},
+        }
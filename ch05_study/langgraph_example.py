@@ -1,8 +1,21 @@
+import operator
+import sys
+from functools import lru_cache
+from pathlib import Path
 from typing import TypedDict, Annotated, Optional
 from langgraph.graph import StateGraph, START, END
 # from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage
-from langchain_groq import ChatGroq  # 이 줄을 꼭 추가해야 합니다!
+
+from issue_classifier import IssueClassifier
+from response_renderer import ResponseRenderer
+
+# 저장소 루트의 공통 모듈(common/)을 가져올 수 있도록 경로를 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.checkpoint import checkpointer_from_env, invoke_resumable, new_thread_id  # noqa: E402
+from common.llm import create_chat_model, llm_cache_stats  # noqa: E402
+from common.tracing import get_tracer, traced_node  # noqa: E402
+from common.usage import request_scope, usage_tracker  # noqa: E402
 
 # 환경 변수 로드
 try:
@@ -11,132 +24,177 @@ try:
 except ImportError:
     pass
 
-# LLM 초기화
-llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0
-    )
+# LLM 초기화 (같은 요청은 SQLite 응답 캐시에서 바로 반환)
+# 모델, 분류기, 그래프는 import 시점이 아니라 처음 필요할 때 한 번만 만들고 재사용합니다.
+@lru_cache(maxsize=None)
+def get_llm():
+    return create_chat_model()
 
 # State 정의
 class AgentState(TypedDict):
     user_message: str
     user_id: str
+    locale: Optional[str]  # 응답 언어 (기본: "ko")
     issue_type: Optional[str]
-    step_result: Optional[str]
+    # 병렬로 실행된 핸들러들의 결과를 operator.add 리듀서로 합칩니다.
+    step_results: Annotated[list[str], operator.add]
     response: Optional[str]
 
 # 1. 노드 정의
-def categorize_issue(state: AgentState) -> AgentState:
+def llm_categorize(message: str) -> str:
+    """로컬 분류기의 확신도가 낮을 때만 호출되는 LLM 분류 단계입니다."""
     prompt = (
         f"이 지원 요청을 'billing' 또는 'technical'로 분류하세요.\n\n"
-        f"메시지: {state['user_message']}"
+        f"메시지: {message}"
     )
     # invoke 사용 권장
-    response = llm.invoke([HumanMessage(content=prompt)])
+    response = get_llm().invoke([HumanMessage(content=prompt)])
     kind = response.content.strip().lower()
     # 'billing'이나 'technical'이 아닌 경우 기본값 처리
     if "billing" in kind:
-        kind = "billing"
+        return "billing"
     elif "technical" in kind:
-        kind = "technical"
-    else:
-        kind = "technical" # 기본값
-        
-    return {"issue_type": kind}
+        return "technical"
+    return "technical" # 기본값
+
+# 키워드 규칙 → 나이브 베이즈 모델 → (확신도가 낮을 때만) LLM 순서로 분류합니다.
+# 나이브 베이즈 모델 학습은 첫 분류 때 한 번만 합니다.
+@lru_cache(maxsize=None)
+def get_issue_classifier() -> IssueClassifier:
+    return IssueClassifier(llm_classify=llm_categorize)
+
+def categorize_issue(state: AgentState) -> AgentState:
+    result = get_issue_classifier().classify(state["user_message"])
+    return {"issue_type": result.label}
 
 def handle_invoice(state: AgentState) -> AgentState:
     # 인보이스 세부 정보를 조회합니다...
-    return {"step_result": f"Invoice details for {state['user_id']}"}
+    return {"step_results": [f"Invoice details for {state['user_id']}"]}
 
 def handle_refund(state: AgentState) -> AgentState:
     # 환불 워크플로를 시작합니다...
-    return {"step_result": "Refund process initiated"}
+    return {"step_results": ["Refund process initiated"]}
 
 def handle_login(state: AgentState) -> AgentState:
     # 로그인 문제를 트러블슈팅합니다...
-    return {"step_result": "Password reset link sent"}
+    return {"step_results": ["Password reset link sent"]}
 
 def handle_performance(state: AgentState) -> AgentState:
     # 성능 지표를 확인합니다...
-    return {"step_result": "Performance metrics analyzed"}
+    return {"step_results": ["Performance metrics analyzed"]}
+
+def llm_summarize(step_results: list[str], locale: str) -> str:
+    """템플릿이 없는 새로운 step_result가 섞여 있을 때만 호출되는 LLM 응답 생성 단계입니다."""
+    details = ", ".join(step_results)
+    language = "한국어" if locale == "ko" else locale
+    prompt = f"다음 내용을 바탕으로 간결한 고객 응답을 {language}로 작성하세요: {details}"
+    response = get_llm().invoke([HumanMessage(content=prompt)])
+    return response.content.strip()
+
+# 캐시 → 로케일별 템플릿 → (알 수 없는 결과가 있을 때만) LLM 순서로 응답을 만듭니다.
+response_renderer = ResponseRenderer(llm_render=llm_summarize)
 
 def summarize_response(state: AgentState) -> AgentState:
-    # 이전 step_result를 사용자용 메시지로 통합합니다.
-    details = state.get("step_result", "")
-    prompt = f"다음 내용을 바탕으로 간결한 고객 응답을 작성하세요: {details}"
-    response = llm.invoke([HumanMessage(content=prompt)])
-    return {"response": response.content.strip()}
+    # 병렬 핸들러들의 step_results를 사용자용 메시지로 통합합니다.
+    response = response_renderer.render(state.get("step_results") or [], state.get("locale") or "ko")
+    return {"response": response}
 
 # 2. 그래프 구성
-# StateGraph 초기화 시 state_schema 전달 필수
-graph_builder = StateGraph(AgentState)
-
-# 노드 추가
-graph_builder.add_node("categorize_issue", categorize_issue)
-graph_builder.add_node("handle_invoice", handle_invoice)
-graph_builder.add_node("handle_refund", handle_refund)
-graph_builder.add_node("handle_login", handle_login)
-graph_builder.add_node("handle_performance", handle_performance)
-graph_builder.add_node("summarize_response", summarize_response)
-
-# Start → categorize_issue
-graph_builder.add_edge(START, "categorize_issue")
-
-# categorize_issue → billing 또는 technical
-def top_router(state: AgentState):
-    return "billing" if state["issue_type"] == "billing" else "technical"
-
-# 조건부 엣지 추가: categorize_issue -> (billing 라우터)
-# 여기서는 billing/technical이 바로 다음 노드가 아니라 논리적 분기이므로
-# 바로 다음 단계 함수들로 라우팅
-graph_builder.add_conditional_edges(
-    "categorize_issue",
-    top_router,
-    # 라우터의 리턴값과 다음 노드 이름 매핑
-    {"billing": "handle_invoice", "technical": "handle_login"}
-)
-
-# Billing 하위 분기: invoice vs. refund
-# handle_invoice에서 다음 단계로 넘어갈 때 조건부 분기
-def billing_router(state: AgentState):
-    msg = state["user_message"].lower()
-    return "refund" if "refund" in msg else "invoice_end"
-
-# handle_invoice 실행 후 -> 환불이 필요하면 refund로, 아니면 바로 요약으로
-graph_builder.add_conditional_edges(
-    "handle_invoice",
-    billing_router,
-    {"refund": "handle_refund", "invoice_end": "summarize_response"}
-)
-
-# Technical 하위 분기: login vs. performance
-# handle_login 실행 후 -> 성능 문제가 있으면 performance로, 아니면 바로 요약으로
-def tech_router(state: AgentState):
+# categorize_issue → 적용 가능한 모든 핸들러로 동시에 분기 (fan-out)
+# 분류 결과에 해당하는 기본 핸들러와, 메시지 키워드로 필요성이 확인된 핸들러를 모두 실행합니다.
+# 같은 superstep에서 병렬로 실행되므로 여러 문제가 섞인 요청도 가장 느린 핸들러만큼만 걸립니다.
+PRIMARY_HANDLERS = {"billing": "handle_invoice", "technical": "handle_login"}
+HANDLER_KEYWORDS = {
+    "handle_invoice": ("invoice", "인보이스", "청구서"),
+    "handle_refund": ("refund", "환불"),
+    "handle_login": ("login", "log in", "password", "로그인", "비밀번호"),
+    "handle_performance": ("performance", "slow", "성능", "느려", "느립"),
+}
+
+def route_handlers(state: AgentState) -> list[str]:
     msg = state["user_message"].lower()
-    return "performance" if "performance" in msg else "login_end"
+    handlers = [PRIMARY_HANDLERS.get(state["issue_type"], "handle_login")]
+    for handler, keywords in HANDLER_KEYWORDS.items():
+        if handler not in handlers and any(keyword in msg for keyword in keywords):
+            handlers.append(handler)
+    return handlers
+
+def build_graph() -> StateGraph:
+    # StateGraph 초기화 시 state_schema 전달 필수
+    graph_builder = StateGraph(AgentState)
+
+    # 노드 추가
+    graph_builder.add_node("categorize_issue", traced_node("categorize_issue", categorize_issue))
+    graph_builder.add_node("handle_invoice", traced_node("handle_invoice", handle_invoice))
+    graph_builder.add_node("handle_refund", traced_node("handle_refund", handle_refund))
+    graph_builder.add_node("handle_login", traced_node("handle_login", handle_login))
+    graph_builder.add_node("handle_performance", traced_node("handle_performance", handle_performance))
+    graph_builder.add_node("summarize_response", traced_node("summarize_response", summarize_response))
+
+    # Start → categorize_issue
+    graph_builder.add_edge(START, "categorize_issue")
+
+    # categorize_issue → route_handlers가 고른 핸들러들 (fan-out)
+    graph_builder.add_conditional_edges(
+        "categorize_issue",
+        route_handlers,
+        list(HANDLER_KEYWORDS)
+    )
 
-graph_builder.add_conditional_edges(
-    "handle_login",
-    tech_router,
-    {"performance": "handle_performance", "login_end": "summarize_response"}
-)
+    # 모든 핸들러는 요약으로 수렴합니다. summarize_response는 같은 superstep의 핸들러가 모두 끝난 뒤 한 번 실행됩니다.
+    for handler in HANDLER_KEYWORDS:
+        graph_builder.add_edge(handler, "summarize_response")
 
-# handle_refund, handle_performance 실행 후 요약으로 수렴
-graph_builder.add_edge("handle_refund", "summarize_response")
-graph_builder.add_edge("handle_performance", "summarize_response")
+    # 최종 노드에서 그래프 종료
+    graph_builder.add_edge("summarize_response", END)
+    return graph_builder
 
-# 최종 노드에서 그래프 종료
-graph_builder.add_edge("summarize_response", END)
+# checkpointer를 넘기면 노드가 끝날 때마다 상태를 thread_id별로 저장합니다.
+# 중단된 실행은 마지막으로 완료된 노드 다음부터 이어지므로 이미 끝난 LLM 호출을 반복하지 않습니다.
+def compile_graph(checkpointer=None):
+    return build_graph().compile(checkpointer=checkpointer)
 
-graph = graph_builder.compile()
+@lru_cache(maxsize=None)
+def get_graph():
+    return compile_graph()
 
 # 3. 그래프 실행
-if __name__ == "__main__":
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--thread-id", help="체크포인트를 구분하는 thread ID (기본: 실행마다 새로 만듦)")
+    parser.add_argument("--resume", action="store_true", help="--thread-id로 지정한 thread의 중단된 실행을 이어서 합니다.")
+    args = parser.parse_args()
+    if args.resume and not args.thread_id:
+        parser.error("--resume에는 이어서 실행할 --thread-id가 필요합니다.")
+    # 같은 thread를 다시 쓰는 것은 --resume일 때뿐이므로, 지정하지 않으면 새 thread를 씁니다.
+    thread_id = args.thread_id or new_thread_id("ticket-U1234")
+
+    # LANGGRAPH_CHECKPOINT_DB가 설정된 경우에만 체크포인터를 사용합니다.
+    checkpointer = checkpointer_from_env()
+    graph = compile_graph(checkpointer) if checkpointer is not None else get_graph()
+    if checkpointer is not None:
+        print(f"thread ID: {thread_id} (중단되면 --thread-id {thread_id} --resume으로 이어서 실행)")
+
     initial_state = {
         "user_message": "안녕하세요, 인보이스와 (가능하다면) 환불 관련 도움을 받고 싶습니다.",
         "user_id": "U1234"
     }
     
     # invoke 사용
-    result = graph.invoke(initial_state)
+    # TRACE_FILE / TRACE_OTLP_ENDPOINT가 설정되어 있으면 이 요청의 노드/LLM/도구 호출이 하나의 trace로 기록됩니다.
+    # 토큰 사용량은 thread ID별로 집계되고, REQUEST_TOKEN_BUDGET이 있으면 이 요청에 예산이 적용됩니다.
+    with get_tracer().span("support_ticket", kind="request", thread_id=thread_id), request_scope(session=thread_id):
+        if checkpointer is not None:
+            result = invoke_resumable(graph, initial_state, thread_id, resume=args.resume)
+        else:
+            result = graph.invoke(initial_state)
     print(result["response"])
+    print(f"분류 단계별 처리 현황: {get_issue_classifier().stats()}")
+    print(f"응답 생성 단계별 처리 현황: {response_renderer.stats()}")
+    print(f"LLM 응답 캐시: {llm_cache_stats()}")
+    print(usage_tracker.report())
+
+if __name__ == "__main__":
+    main()
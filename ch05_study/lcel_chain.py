@@ -1,8 +1,16 @@
-from langchain_core.runnables import RunnableLambda
-from langchain.chat_models import init_chat_model
+import asyncio
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_core.prompts import PromptTemplate
-import os
-from langchain_groq import ChatGroq  # 이 줄을 꼭 추가해야 합니다!
+
+# 저장소 루트의 공통 모듈(common/)을 가져올 수 있도록 경로를 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.llm import create_chat_model  # noqa: E402
 
 # 환경 변수 로드
 try:
@@ -11,23 +19,86 @@ try:
 except ImportError:
     pass
 
-# 함숫값 또는 모델 호출을 Runnable로 감쌉니다
-# RunnableLambda는 callable을 직접 인자로 받습니다.
-llm_model = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0
-    )
-llm = RunnableLambda(llm_model.invoke)
+# 대량 생성 시 한 번에 보낼 최대 동시 요청 수
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+def create_llm() -> BaseChatModel:
+    # 같은 요청은 SQLite 응답 캐시에서 바로 반환합니다.
+    return create_chat_model()
+
+
+# 입력 텍스트는 템플릿 변수 값으로만 넣고, 템플릿 자체를 키로 컴파일 결과를 캐시합니다.
+# (입력마다 템플릿으로 파싱하면 캐시가 적중하지 않고, '{'가 들어간 질문은 파싱 오류가 납니다)
+QUESTION_TEMPLATE = "{question}"
+
+
+@lru_cache(maxsize=64)
+def compiled_template(template: str = QUESTION_TEMPLATE) -> PromptTemplate:
+    return PromptTemplate.from_template(template)
+
+
+def build_prompt(template: str = QUESTION_TEMPLATE) -> Runnable:
+    """입력 텍스트를 template의 {question} 자리에 넣어 메시지 목록으로 만듭니다."""
+    compiled = compiled_template(template)
+    return RunnableLambda(lambda text: compiled.format_prompt(question=text).to_messages())
+
+
+prompt = build_prompt()
 
-prompt = RunnableLambda(lambda text: 
-    PromptTemplate.from_template(text).format_prompt().to_messages())
 
 # 기존 체인과 동일한 형태:
 # chain = LLMChain(prompt=prompt, llm=llm)
 # 파이프 연산자를 사용하는 LCEL 체인:
-chain = prompt | llm
+# 모델을 RunnableLambda(llm.invoke)로 감싸지 않고 그대로 연결해야
+# 모델 고유의 batch/abatch/astream 구현(토큰 단위 스트리밍 등)을 사용할 수 있습니다.
+def build_chain(llm: Optional[BaseChatModel] = None, template: str = QUESTION_TEMPLATE) -> Runnable:
+    return build_prompt(template) | (llm if llm is not None else create_llm())
+
+
+@lru_cache(maxsize=None)
+def get_chain() -> Runnable:
+    return build_chain()
+
+
+# ─── Entry Points ───────────────────────────────────────────────────────────
+def run_batch(texts: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY, chain: Optional[Runnable] = None) -> list:
+    """여러 입력을 스레드 풀로 동시에 실행합니다. 결과 순서는 입력 순서와 같습니다."""
+    chain = chain or get_chain()
+    return chain.batch(texts, config={"max_concurrency": max_concurrency})
+
+
+async def arun_batch(texts: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY, chain: Optional[Runnable] = None) -> list:
+    """여러 입력을 이벤트 루프에서 동시에 실행합니다. (모델의 비동기 클라이언트 사용)"""
+    chain = chain or get_chain()
+    return await chain.abatch(texts, config={"max_concurrency": max_concurrency})
+
+
+async def astream_answer(text: str, chain: Optional[Runnable] = None) -> AsyncIterator[str]:
+    """응답을 토큰 조각 단위로 흘려보냅니다."""
+    chain = chain or get_chain()
+    async for chunk in chain.astream(text):
+        yield chunk.content
+
+
+async def print_stream(text: str) -> None:
+    async for piece in astream_answer(text):
+        print(piece, end="", flush=True)
+    print()
+
 
 # 체인 실행
-if __name__ == "__main__":
-    result = chain.invoke("프랑스의 수도는 어디인가요?")
+def main():
+    result = get_chain().invoke("프랑스의 수도는 어디인가요?")
     print(result.content)
+
+    # 여러 질문을 한 번에 처리하는 경우
+    for answer in run_batch(["독일의 수도는 어디인가요?", "일본의 수도는 어디인가요?"]):
+        print(answer.content)
+
+    # 응답을 생성되는 대로 출력하는 경우
+    asyncio.run(print_stream("이탈리아의 수도는 어디인가요?"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+고객 응답 렌더러
+summarize_response가 받는 step_result는 대부분 정해진 몇 가지 문자열입니다.
+("Refund process initiated", "Password reset link sent", ...)
+매번 LLM으로 문장을 만들지 않고 다음 순서로 응답을 만듭니다.
+
+1. 캐시: (로케일, step_result 목록)이 같으면 이전에 만든 응답을 그대로 반환합니다.
+2. 템플릿: 모든 step_result가 알려진 결과이면 로케일별 템플릿으로 문장을 만듭니다.
+   여러 결과가 섞인 경우에도 각 템플릿을 이어 붙이므로 LLM이 필요 없습니다.
+3. LLM: 알 수 없는 결과가 하나라도 있을 때만 호출하고, 결과는 캐시에 저장합니다.
+
+캐시 적중률과 절약한 LLM 호출 수는 stats()로 확인할 수 있습니다.
+"""
+import re
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+DEFAULT_LOCALE = "ko"
+
+# (패턴, 로케일 → 템플릿) 목록. 패턴의 이름 있는 그룹은 템플릿의 같은 이름 자리에 채워집니다.
+RESPONSE_TEMPLATES: List[Tuple[Pattern, Dict[str, str]]] = [
+    (
+        re.compile(r"Invoice details for (?P<user_id>\S+)"),
+        {
+            "ko": "{user_id} 고객님의 인보이스 내역을 등록된 이메일로 보내 드렸습니다.",
+            "en": "We have sent the invoice details for account {user_id} to your registered email.",
+        },
+    ),
+    (
+        re.compile(r"Refund process initiated"),
+        {
+            "ko": "환불 절차를 시작했습니다. 영업일 기준 3~5일 안에 처리됩니다.",
+            "en": "We have started your refund. It will be processed within 3-5 business days.",
+        },
+    ),
+    (
+        re.compile(r"Password reset link sent"),
+        {
+            "ko": "비밀번호 재설정 링크를 보내 드렸습니다. 메일함을 확인해 주세요.",
+            "en": "We have sent you a password reset link. Please check your inbox.",
+        },
+    ),
+    (
+        re.compile(r"Performance metrics analyzed"),
+        {
+            "ko": "서비스 성능 지표를 점검했습니다. 계속 느리다면 사용 환경과 함께 다시 알려 주세요.",
+            "en": "We have checked the service performance metrics. If it is still slow, please let us know your setup.",
+        },
+    ),
+]
+
+GREETINGS = {"ko": "문의해 주셔서 감사합니다.", "en": "Thank you for contacting us."}
+
+
+class ResponseRenderer:
+    def __init__(
+        self,
+        llm_render: Optional[Callable[[List[str], str], str]] = None,
+        templates: List[Tuple[Pattern, Dict[str, str]]] = RESPONSE_TEMPLATES,
+        max_entries: int = 1024,
+    ):
+        self.llm_render = llm_render
+        self.templates = templates
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, Tuple[str, ...]], str]" = OrderedDict()
+        self.stage_counts: Counter = Counter()
+
+    def render(self, step_results: Iterable[str], locale: str = DEFAULT_LOCALE) -> str:
+        # 병렬 핸들러의 결과 순서는 실행마다 달라질 수 있으므로 정렬한 값을 키로 사용합니다.
+        results = tuple(sorted(step_results))
+        key = (locale, results)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stage_counts["cache"] += 1
+            return cached
+
+        response = self._render_template(results, locale)
+        if response is not None:
+            self.stage_counts["template"] += 1
+        else:
+            response = self._render_llm(list(results), locale)
+            self.stage_counts["llm"] += 1
+
+        self._cache[key] = response
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return response
+
+    def _render_template(self, results: Tuple[str, ...], locale: str) -> Optional[str]:
+        sentences = []
+        for result in results:
+            sentence = self._match(result, locale)
+            if sentence is None:
+                return None
+            sentences.append(sentence)
+        greeting = GREETINGS.get(locale, GREETINGS[DEFAULT_LOCALE])
+        return " ".join([greeting, *sentences])
+
+    def _match(self, result: str, locale: str) -> Optional[str]:
+        for pattern, by_locale in self.templates:
+            match = pattern.fullmatch(result.strip())
+            if match is not None:
+                template = by_locale.get(locale) or by_locale[DEFAULT_LOCALE]
+                return template.format(**match.groupdict())
+        return None
+
+    def _render_llm(self, results: List[str], locale: str) -> str:
+        if self.llm_render is None:
+            # LLM이 없으면 원래 결과를 그대로 나열합니다.
+            return ", ".join(results)
+        return self.llm_render(results, locale)
+
+    def stats(self) -> Dict[str, object]:
+        total = sum(self.stage_counts.values())
+        return {
+            "total": total,
+            **{f"{stage}_hits": self.stage_counts[stage] for stage in ("cache", "template", "llm")},
+            "cache_hit_rate": self.stage_counts["cache"] / total if total else 0.0,
+            "saved_llm_calls": total - self.stage_counts["llm"],
+            "cache_size": len(self._cache),
+        }
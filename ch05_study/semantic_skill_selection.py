@@ -1,14 +1,15 @@
 import os
-import requests
 import logging
-from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from functools import lru_cache
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from langchain_community.vectorstores import FAISS
-import faiss
-import numpy as np
-from langchain_huggingface import HuggingFaceEmbeddings # 무료 임베딩
-from langchain_groq import ChatGroq  # 이 줄을 꼭 추가해야 합니다!
+import sys
+from pathlib import Path
+
+# 저장소 루트의 공통 모듈(common/)을 가져올 수 있도록 경로를 추가합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.llm import create_chat_model  # noqa: E402
+from common.tool_cache import default_executor  # noqa: E402
+from common.tools import default_registry  # noqa: E402
 
 # 환경변수 확인
 try:
@@ -23,75 +24,51 @@ except ImportError:
 #         "환경변수 또는 .env 파일에서 설정해주세요."
 #     )
 
-@tool 
-def query_wolfram_alpha(expression: str) -> str: 
-    """
-    Wolfram Alpha에 질의를 보내 식을 계산하거나 정보를 조회합니다.
-    Args: expression (str): 계산하거나 평가할 수식 또는 질의입니다.
-    Returns: str: 계산 결과 또는 조회된 정보입니다.
-        """
-
-    api_url = f'''https://api.wolframalpha.com/v1/result?i={requests.utils.quote(expression)}&appid={os.getenv("WOLFRAM_ALPHA_APP_ID")}'''  
-
-    try:
-        response = requests.get(api_url)
-        if response.status_code == 200: 
-            return response.text 
-        else: raise ValueError(f'''Wolfram Alpha API 오류: 
-            {response.status_code} - {response.text}''') 
-    except requests.exceptions.RequestException as e: 
-        raise ValueError(f"Wolfram Alpha 질의에 실패했습니다: {e}")
-
-@tool 
-def trigger_zapier_webhook(zap_id: str, payload: dict) -> str: 
-    """Zapier 웹훅 트리거"""
-    return f"Zap ID {zap_id} 실행됨"
-
-@tool 
-def send_slack_message(channel: str, message: str) -> str: 
-    """Slack 메시지 전송"""
-    return f"Slack {channel}에 메시지 전송됨"
+# 도구(Wolfram Alpha, Zapier, Slack)는 공용 레지스트리에 한 번만 정의되어 있습니다. (common/tools/)
+registry = default_registry()
+
 # # OpenAI 임베딩 및 LLM 초기화
+# from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 # embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
 # llm = ChatOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # 2. 임베딩 및 LLM 초기화 (Groq 환경)
-# OpenAIEmbeddings 대신 무료 모델 사용 (API 키 필요 없음)
-embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-llm = ChatGroq(api_key=os.getenv("GROQ_API_KEY"), model_name="llama-3.3-70b-versatile")
-# 도구 설명
-tool_descriptions = {
-    "query_wolfram_alpha": "Wolfram Alpha에 질의를 보내 식을 계산하거나 정보를 조회합니다.",
-    "trigger_zapier_webhook": "미리 정의된 Zap을 실행하기 위해 Zapier 웹훅을 트리거합니다.",
-    "send_slack_message": "지정한 Slack 채널에 메시지를 보냅니다."
-}
-
-# 각 도구 설명에 대한 임베딩 생성
-tool_embeddings = []
-tool_names = []
-
-for tool_name, description in tool_descriptions.items():
-    embedding = embeddings.embed_query(description)
-    tool_embeddings.append(embedding)
-    tool_names.append(tool_name)
-
-# FAISS 벡터 저장소 초기화
-dimension = len(tool_embeddings[0])  # 모든 임베딩의 차원이 동일하다고 가정
-index = faiss.IndexFlatL2(dimension)
-
-# 코사인 유사도를 위한 임베딩 정규화
-faiss.normalize_L2(np.array(tool_embeddings).astype('float32'))
-
-# 리스트를 FAISS 호환 형식으로 변환
-tool_embeddings_np = np.array(tool_embeddings).astype('float32')
-index.add(tool_embeddings_np)
-
-# 인덱스를 도구 함수에 매핑
-index_to_tool = {
-    0: "query_wolfram_alpha",
-    1: "trigger_zapier_webhook",
-    2: "send_slack_message"
-}
+# 임베딩 모델 로드와 FAISS 인덱스 구성은 무거우므로 import 시점이 아니라
+# 처음 도구를 고를 때 한 번만 하고 이후 호출에서 재사용합니다. (faiss/numpy/torch도 그때 불러옴)
+@lru_cache(maxsize=None)
+def get_embeddings():
+    # OpenAIEmbeddings 대신 무료 모델 사용 (API 키 필요 없음)
+    from langchain_huggingface import HuggingFaceEmbeddings # 무료 임베딩
+
+    return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+
+@lru_cache(maxsize=None)
+def get_llm():
+    # 같은 요청은 SQLite 응답 캐시에서 바로 반환합니다.
+    # 비슷한 질의까지 재사용하려면 install_llm_cache(embeddings=get_embeddings())로 의미 유사도 단계를 켭니다.
+    return create_chat_model(api_key=os.getenv("GROQ_API_KEY"))
+
+# 인덱스 위치 → 도구 이름 (레지스트리 등록 순서)
+index_to_tool = dict(enumerate(registry.names()))
+
+@lru_cache(maxsize=None)
+def get_tool_index():
+    """도구 설명 임베딩으로 FAISS 인덱스를 만듭니다."""
+    import faiss
+    import numpy as np
+
+    # 각 도구 설명의 임베딩은 레지스트리가 임베딩 모델별로 한 번만 계산해 둡니다.
+    tool_embeddings = registry.embeddings_for(get_embeddings(), index_to_tool.values())
+
+    # 리스트를 FAISS 호환 형식으로 변환하고, 코사인 유사도를 위해 정규화
+    tool_embeddings_np = np.array(list(tool_embeddings.values())).astype('float32')
+    faiss.normalize_L2(tool_embeddings_np)
+
+    # FAISS 벡터 저장소 초기화
+    dimension = tool_embeddings_np.shape[1]  # 모든 임베딩의 차원이 동일하다고 가정
+    index = faiss.IndexFlatL2(dimension)
+    index.add(tool_embeddings_np)
+    return index
 
 def select_tool(query: str, top_k: int = 1) -> list:
     """
@@ -104,9 +81,13 @@ def select_tool(query: str, top_k: int = 1) -> list:
     Returns:
         list: 선택된 도구 함수 이름의 리스트.
     """
-    query_embedding = np.array(embeddings.embed_query(query)).astype('float32')
-    faiss.normalize_L2(query_embedding.reshape(1, -1))
-    D, I = index.search(query_embedding.reshape(1, -1), top_k)
+    import faiss
+    import numpy as np
+
+    index = get_tool_index()
+    query_embedding = np.array(get_embeddings().embed_query(query)).astype('float32').reshape(1, -1)
+    faiss.normalize_L2(query_embedding)
+    D, I = index.search(query_embedding, top_k)
     selected_tools = [index_to_tool[idx] for idx in I[0] if idx in index_to_tool]
     return selected_tools
 
@@ -126,7 +107,7 @@ def determine_parameters(query: str, tool_name: str) -> dict:
     ]
     
     # LLM을 호출하여 파라미터 추출
-    response = llm.invoke(messages)
+    response = get_llm().invoke(messages)
     
     # LLM 응답을 파싱하는 예제 로직
     parameters = {}
@@ -147,31 +128,37 @@ def determine_parameters(query: str, tool_name: str) -> dict:
     
     return parameters
 
-# 예제 사용자 질의
-user_query = "2x + 3 = 7"
-
-# 상위 도구 선택
-selected_tools = select_tool(user_query, top_k=1)
-tool_name = selected_tools[0] if selected_tools else None
-
-if tool_name:
-    # 질의와 선택된 도구를 기반으로 LLM을 사용하여 파라미터 결정
-    args = determine_parameters(user_query, tool_name)
-
-    # 선택된 도구 호출
-    try:
-        # 주의: 실제 도구 함수(query_wolfram_alpha 등)가 globals()에 정의되어 있어야 합니다.
-        # 이 파일에는 도구 구현체가 포함되어 있지 않으므로 실행 시 에러가 발생할 수 있습니다.
-        if tool_name in globals():
-            tool_result = globals()[tool_name].invoke(args)
-            print(f"도구 '{tool_name}' 결과: {tool_result}")
-        else:
-            print(f"도구 '{tool_name}'가 정의되지 않았습니다. (실제 실행을 위해서는 도구 함수 구현이 필요합니다)")
-            # 디버깅용 출력
-            print(f"선택된 도구: {tool_name}")
-            print(f"파라미터: {args}")
-
-    except ValueError as e:
-        print(f"도구 '{tool_name}' 호출 중 오류 발생: {e}")
-else:
-    print("선택된 도구가 없습니다.")
+def main():
+    # 도구 호출은 공용 실행기로 실행합니다. (도구별 캐시 정책에 따라 결과 재사용)
+    tool_executor = default_executor()
+
+    # 예제 사용자 질의
+    user_query = "2x + 3 = 7"
+
+    # 상위 도구 선택
+    selected_tools = select_tool(user_query, top_k=1)
+    tool_name = selected_tools[0] if selected_tools else None
+
+    if tool_name:
+        # 질의와 선택된 도구를 기반으로 LLM을 사용하여 파라미터 결정
+        args = determine_parameters(user_query, tool_name)
+
+        # 선택된 도구 호출
+        try:
+            # 선택된 이름으로 레지스트리에서 도구를 찾습니다.
+            if tool_name in registry:
+                tool_result = tool_executor.invoke(registry.get(tool_name), args)
+                print(f"도구 '{tool_name}' 결과: {tool_result}")
+            else:
+                print(f"도구 '{tool_name}'가 정의되지 않았습니다. (실제 실행을 위해서는 도구 함수 구현이 필요합니다)")
+                # 디버깅용 출력
+                print(f"선택된 도구: {tool_name}")
+                print(f"파라미터: {args}")
+
+        except ValueError as e:
+            print(f"도구 '{tool_name}' 호출 중 오류 발생: {e}")
+    else:
+        print("선택된 도구가 없습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+지원 요청 분류기 테스트
+실행: python -m pytest ch05_study/tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from issue_classifier import IssueClassifier, NaiveBayesModel, char_ngrams, load_examples  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def model():
+    return NaiveBayesModel().fit(load_examples())
+
+
+def test_keyword_rule_decides_without_model(model):
+    classifier = IssueClassifier(model=model, llm_classify=lambda message: pytest.fail("LLM 호출"))
+    assert classifier.classify("지난달 인보이스를 다시 보내 주세요").label == "billing"
+    result = classifier.classify("I can't log in, the password is rejected")
+    assert (result.label, result.stage, result.confidence) == ("technical", "rule", 1.0)
+
+
+def test_conflicting_keywords_fall_through_to_model(model):
+    classifier = IssueClassifier(model=model, threshold=0.0)
+    # 두 레이블의 키워드가 모두 있으면 규칙으로 정하지 않습니다.
+    result = classifier.classify("결제 페이지에서 오류가 납니다")
+    assert result.stage == "model"
+    assert result.label in ("billing", "technical")
+
+
+def test_low_confidence_uses_llm_once(model):
+    calls = []
+
+    def llm_classify(message):
+        calls.append(message)
+        return "technical"
+
+    classifier = IssueClassifier(model=model, llm_classify=llm_classify, threshold=1.01)
+    result = classifier.classify("안녕하세요, 문의드립니다")
+    assert (result.label, result.stage) == ("technical", "llm")
+    assert calls == ["안녕하세요, 문의드립니다"]
+
+
+def test_model_result_used_without_llm_fallback(model):
+    classifier = IssueClassifier(model=model, threshold=1.01)
+    assert classifier.classify("안녕하세요, 문의드립니다").stage == "model"
+
+
+def test_model_learns_from_examples():
+    model = NaiveBayesModel().fit([("돈을 돌려받고 싶어요", "billing"), ("앱이 자꾸 멈춰요", "technical")] * 3)
+    probabilities = model.predict_proba("돈을 돌려받을 수 있나요")
+    assert probabilities["billing"] > probabilities["technical"]
+    assert sum(probabilities.values()) == pytest.approx(1.0)
+
+
+def test_char_ngrams_normalize_whitespace_and_case():
+    assert char_ngrams("A  b", sizes=(2,)) == [" a", "a ", " b", "b "]
+
+
+def test_stats_report_stage_rates(model):
+    classifier = IssueClassifier(model=model, llm_classify=lambda message: "billing", threshold=1.01)
+    classifier.classify("환불해 주세요")
+    classifier.classify("안녕하세요")
+    stats = classifier.stats()
+    assert stats["total"] == 2
+    assert (stats["rule_hits"], stats["model_hits"], stats["llm_hits"]) == (1, 0, 1)
+    assert stats["rule_rate"] == 0.5
@@ -0,0 +1,52 @@
+"""
+지원 요청 그래프의 핸들러 분기(fan-out) 테스트 (langgraph가 없으면 건너뜁니다)
+실행: python -m pytest ch05_study/tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("langgraph.checkpoint.sqlite")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import langgraph_example  # noqa: E402
+from issue_classifier import Classification  # noqa: E402
+from langgraph_example import route_handlers  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "issue_type, message, expected",
+    [
+        ("billing", "인보이스를 다시 보내 주세요", ["handle_invoice"]),
+        ("billing", "청구서 확인하고 환불해 주세요", ["handle_invoice", "handle_refund"]),
+        ("technical", "로그인이 느려요", ["handle_login", "handle_performance"]),
+        (None, "도와주세요", ["handle_login"]),
+    ],
+)
+def test_route_handlers_fans_out_to_every_matching_handler(issue_type, message, expected):
+    assert route_handlers({"user_message": message, "issue_type": issue_type}) == expected
+
+
+class BillingClassifier:
+    def classify(self, message):
+        return Classification("billing", 1.0, "rule")
+
+
+def test_graph_merges_parallel_step_results(monkeypatch):
+    # 분류는 billing으로 고정하고, 응답은 템플릿으로 만들어지므로 LLM을 호출하지 않습니다.
+    monkeypatch.setattr(langgraph_example, "get_issue_classifier", BillingClassifier)
+    graph = langgraph_example.compile_graph()
+    result = graph.invoke({
+        "user_message": "환불해 주세요. 그리고 앱이 너무 느려요",
+        "user_id": "U1234",
+        "locale": "en",
+        "step_results": [],
+    })
+    # 같은 superstep에서 실행된 세 핸들러의 결과가 operator.add 리듀서로 모두 합쳐집니다.
+    assert sorted(result["step_results"]) == [
+        "Invoice details for U1234",
+        "Performance metrics analyzed",
+        "Refund process initiated",
+    ]
+    assert "refund" in result["response"] and "performance" in result["response"]
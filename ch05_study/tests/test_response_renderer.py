@@ -0,0 +1,74 @@
+"""
+고객 응답 렌더러 테스트
+실행: python -m pytest ch05_study/tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from response_renderer import GREETINGS, ResponseRenderer  # noqa: E402
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, results, locale):
+        self.calls.append((tuple(results), locale))
+        return f"[{locale}] " + " / ".join(results)
+
+
+def test_known_results_use_templates_without_llm():
+    renderer = ResponseRenderer(llm_render=lambda results, locale: pytest.fail("LLM 호출"))
+    response = renderer.render(["Invoice details for U1234", "Refund process initiated"])
+    assert response.startswith(GREETINGS["ko"])
+    assert "U1234 고객님의 인보이스" in response and "환불 절차" in response
+    assert renderer.render(["Password reset link sent"], locale="en").startswith(GREETINGS["en"])
+
+
+def test_unknown_locale_falls_back_to_default():
+    renderer = ResponseRenderer()
+    assert renderer.render(["Refund process initiated"], locale="fr").startswith(GREETINGS["ko"])
+
+
+def test_unknown_result_calls_llm_once_and_caches():
+    llm = FakeLLM()
+    renderer = ResponseRenderer(llm_render=llm)
+    first = renderer.render(["Refund process initiated", "Shipment rerouted"])
+    # 병렬 핸들러의 결과 순서가 달라도 같은 캐시 항목을 씁니다.
+    second = renderer.render(["Shipment rerouted", "Refund process initiated"])
+    assert first == second
+    assert llm.calls == [(("Refund process initiated", "Shipment rerouted"), "ko")]
+    assert renderer.render(["Shipment rerouted", "Refund process initiated"], locale="en") != first
+    assert len(llm.calls) == 2
+
+
+def test_without_llm_lists_raw_results():
+    renderer = ResponseRenderer()
+    assert renderer.render(["B", "A"]) == "A, B"
+
+
+def test_cache_is_bounded_lru():
+    llm = FakeLLM()
+    renderer = ResponseRenderer(llm_render=llm, max_entries=2)
+    renderer.render(["a"])
+    renderer.render(["b"])
+    renderer.render(["a"])  # a를 최근 항목으로
+    renderer.render(["c"])  # b가 밀려남
+    renderer.render(["a"])
+    renderer.render(["b"])
+    assert [call[0] for call in llm.calls] == [("a",), ("b",), ("c",), ("b",)]
+
+
+def test_stats_count_saved_llm_calls():
+    renderer = ResponseRenderer(llm_render=FakeLLM())
+    renderer.render(["Refund process initiated"])
+    renderer.render(["Refund process initiated"])
+    renderer.render(["Something new"])
+    stats = renderer.stats()
+    assert (stats["cache_hits"], stats["template_hits"], stats["llm_hits"]) == (1, 1, 1)
+    assert stats["saved_llm_calls"] == 2
+    assert stats["cache_hit_rate"] == pytest.approx(1 / 3)
+    assert stats["cache_size"] == 2
@@ -0,0 +1,4 @@
+"""
+여러 챕터 예제가 함께 사용하는 공통 모듈
+챕터 디렉터리에서 스크립트를 실행할 때는 저장소 루트를 sys.path에 추가한 뒤 `from common... import ...`로 가져옵니다.
+"""
@@ -0,0 +1,171 @@
+"""
+LangGraph SQLite 체크포인터
+그래프를 체크포인터와 함께 컴파일하면 노드가 끝날 때마다 상태가 thread_id별로 저장됩니다.
+실행이 중간에 실패해도 같은 thread_id로 `graph.invoke(None, config)`를 호출하면
+마지막으로 완료된 노드 다음부터 이어서 실행하므로, 이미 끝난 LLM 호출을 다시 하지 않습니다.
+thread를 다시 쓰는 것은 이어서 실행할 때(resume)뿐입니다. 새 실행은 new_thread_id()로 새 thread를 씁니다.
+(예제 그래프는 operator.add 리듀서를 쓰므로 같은 thread에 새 입력을 넣으면 이전 결과 위에 쌓임)
+
+- WAL 모드 + synchronous=NORMAL: 커밋마다 fsync 하지 않고 WAL 체크포인트 시점에 모아서 디스크에 반영합니다.
+- prune_checkpoints(): thread별 최근 keep_last개만 남기고, max_age보다 오래된 thread는 통째로 지웁니다.
+
+환경 변수
+- LANGGRAPH_CHECKPOINT_DB: 설정하면 예제 그래프가 이 경로의 SQLite 체크포인터를 사용합니다. (기본: 사용 안 함)
+- LANGGRAPH_CHECKPOINT_KEEP_LAST / LANGGRAPH_CHECKPOINT_MAX_AGE: 열 때 적용할 정리 정책 (개수 / 초)
+"""
+import os
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CHECKPOINT_DB = REPO_ROOT / ".cache" / "checkpoints.sqlite"
+
+# UUID v6 타임스탬프(1582-10-15 기준 100ns 단위)를 유닉스 시간으로 바꾸기 위한 오프셋
+_GREGORIAN_OFFSET = 12219292800
+
+
+def checkpoint_time(checkpoint_id: str) -> float:
+    """체크포인트 ID(UUID v6)에 들어 있는 생성 시각을 유닉스 시간(초)으로 반환합니다."""
+    digits = checkpoint_id.replace("-", "")
+    # time_high(32) + time_mid(16) + version(4) + time_low(12)
+    ticks = int(digits[:12] + digits[13:16], 16)
+    return ticks / 10_000_000 - _GREGORIAN_OFFSET
+
+
+def connect(path: Union[str, Path] = DEFAULT_CHECKPOINT_DB) -> sqlite3.Connection:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 그래프는 노드를 워커 스레드에서 실행할 수 있으므로 스레드 검사를 끕니다. (SqliteSaver가 자체 락 사용)
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.create_function("checkpoint_time", 1, checkpoint_time, deterministic=True)
+    return conn
+
+
+def open_checkpointer(
+    path: Union[str, Path] = DEFAULT_CHECKPOINT_DB,
+    keep_last: Optional[int] = None,
+    max_age: Optional[float] = None,
+) -> SqliteSaver:
+    """SQLite 체크포인터를 엽니다. 정리 정책이 주어지면 열 때 한 번 적용합니다."""
+    saver = SqliteSaver(connect(path))
+    saver.setup()
+    if keep_last is not None or max_age is not None:
+        prune_checkpoints(saver, keep_last=keep_last, max_age=max_age)
+    return saver
+
+
+def checkpointer_from_env() -> Optional[SqliteSaver]:
+    """LANGGRAPH_CHECKPOINT_DB가 설정되어 있을 때만 체크포인터를 엽니다."""
+    path = os.getenv("LANGGRAPH_CHECKPOINT_DB")
+    if not path:
+        return None
+    keep_last = os.getenv("LANGGRAPH_CHECKPOINT_KEEP_LAST")
+    max_age = os.getenv("LANGGRAPH_CHECKPOINT_MAX_AGE")
+    return open_checkpointer(
+        path,
+        keep_last=int(keep_last) if keep_last else 20,
+        max_age=float(max_age) if max_age else 7 * 24 * 3600,
+    )
+
+
+def prune_checkpoints(
+    saver: SqliteSaver,
+    keep_last: Optional[int] = 20,
+    max_age: Optional[float] = None,
+) -> Dict[str, int]:
+    """
+    오래된 체크포인트를 지우고 삭제한 행 수를 반환합니다.
+    - keep_last: thread/네임스페이스별로 최근 체크포인트 N개만 남깁니다. (재개에는 마지막 하나만 필요)
+    - max_age: 마지막 체크포인트가 max_age초보다 오래된 thread는 모두 지웁니다.
+    """
+    conn = saver.conn
+    deleted = {"threads": 0, "checkpoints": 0, "writes": 0}
+    with saver.lock:
+        if max_age is not None:
+            cutoff = time.time() - max_age
+            stale = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+                    "HAVING checkpoint_time(MAX(checkpoint_id)) < ?",
+                    (cutoff,),
+                )
+            ]
+            for thread_id in stale:
+                deleted["checkpoints"] += conn.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                ).rowcount
+                deleted["writes"] += conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,)).rowcount
+            deleted["threads"] = len(stale)
+
+        if keep_last is not None:
+            # checkpoint_id는 시간순으로 정렬되는 UUID v6이므로 문자열 정렬로 최신순을 구합니다.
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS _expired AS "
+                "SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints WHERE 0"
+            )
+            conn.execute("DELETE FROM _expired")
+            conn.execute(
+                "INSERT INTO _expired SELECT thread_id, checkpoint_ns, checkpoint_id FROM ("
+                "  SELECT thread_id, checkpoint_ns, checkpoint_id, ROW_NUMBER() OVER ("
+                "    PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS rank"
+                "  FROM checkpoints) WHERE rank > ?",
+                (keep_last,),
+            )
+            for table in ("checkpoints", "writes"):
+                deleted[table] += conn.execute(
+                    f"DELETE FROM {table} WHERE (thread_id, checkpoint_ns, checkpoint_id) IN "
+                    "(SELECT thread_id, checkpoint_ns, checkpoint_id FROM _expired)"
+                ).rowcount
+            conn.execute("DELETE FROM _expired")
+        conn.commit()
+    return deleted
+
+
+def thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+class ThreadExistsError(RuntimeError):
+    """새 실행에 이미 상태가 저장된 thread_id를 지정했습니다."""
+
+    def __init__(self, thread_id: str):
+        super().__init__(
+            f"thread '{thread_id}'에 이미 저장된 상태가 있습니다. "
+            "이어서 실행하려면 --resume을, 새로 실행하려면 다른 thread ID를 지정하세요."
+        )
+        self.thread_id = thread_id
+
+
+def new_thread_id(prefix: str) -> str:
+    """새 실행에 쓸 thread ID입니다. (예: "order-B73973-3f2a9c1e")"""
+    return f"{prefix}-{uuid.uuid4().hex[:8]}"
+
+
+def invoke_resumable(graph, inputs: Dict[str, Any], thread_id: str, resume: bool = False) -> Dict[str, Any]:
+    """
+    thread_id로 그래프를 실행합니다. 이미 상태가 있는 thread는 resume=True일 때만 다시 씁니다.
+    - resume=True: 끝나지 않은 실행이 있으면 입력 없이 마지막 체크포인트부터 이어서 실행하고,
+      이미 끝난 실행이면 저장된 최종 상태를 그대로 반환합니다.
+    - resume=False: 이 thread에 저장된 상태가 있으면 ThreadExistsError를 냅니다.
+    """
+    config = thread_config(thread_id)
+    if graph.checkpointer is None:
+        return graph.invoke(inputs, config)
+    state = graph.get_state(config)
+    if resume:
+        if state.next:
+            return graph.invoke(None, config)
+        if state.values:
+            return state.values
+    elif state.values:
+        raise ThreadExistsError(thread_id)
+    return graph.invoke(inputs, config)
@@ -0,0 +1,135 @@
+"""
+import 시간 벤치마크
+예제 모듈마다 새 인터프리터에서 `python -X importtime -c "import 모듈"`을 실행해 import에 걸린 시간과
+그 모듈이 직접 불러오는 import 중 가장 무거운 것들을 보여 줍니다.
+
+모듈 import는 가벼워야 합니다. 모델 생성, 임베딩 로드, 인덱스 구성, LLM/HTTP 호출은
+main()이나 lru_cache로 감싼 get_*() 함수 안에서 처음 필요할 때 한 번만 합니다.
+(워커 콜드 스타트와 다른 모듈에서의 import가 이 비용을 내지 않도록)
+
+실행: python -m common.import_time [--budget-ms 1500] [--runs 3] [--top 5] [ch05_study/lcel_chain.py ...]
+
+- 모듈마다 --runs번 측정해서 가장 짧은 값을 사용합니다. (디스크 캐시 등으로 인한 잡음 제거)
+- 예산을 넘거나 import에 실패한 모듈이 있으면 종료 코드 1을 반환합니다.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 1500.0
+
+# 측정 대상 (저장소 루트 기준 경로)
+DEFAULT_MODULES = [
+    "ch02_study/simple_customer_support_agent.py",
+    "ch02_study/customer_support_agent_evaluation.py",
+    "ch04_study/calculator_tool_use.py",
+    "ch04_study/pokemon_type_tool_use.py",
+    "ch04_study/stock_price_tool_use.py",
+    "ch04_study/wikipedia_tool_use.py",
+    "ch04_study/langgraph_mcp_client.py",
+    "ch05_study/basic_skill_selection.py",
+    "ch05_study/hierarchical_skill_selection.py",
+    "ch05_study/semantic_skill_selection.py",
+    "ch05_study/langgraph_example.py",
+    "ch05_study/lcel_chain.py",
+]
+
+# "import time:  self [us] | cumulative | imported package" 형식의 한 줄
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+@dataclass
+class ImportResult:
+    module: str
+    cumulative_ms: Optional[float] = None
+    heaviest: List[Tuple[str, float]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def module_location(path: Path) -> Tuple[Path, str]:
+    """스크립트 경로를 (import할 때의 작업 디렉터리, 모듈 이름)으로 바꿉니다. 패키지 안의 모듈은 점 표기로 만듭니다."""
+    path = path.resolve()
+    parts = [path.stem]
+    directory = path.parent
+    while (directory / "__init__.py").exists():
+        parts.insert(0, directory.name)
+        directory = directory.parent
+    return directory, ".".join(parts)
+
+
+def parse_importtime(stderr: str, module: str, top: int) -> Tuple[Optional[float], List[Tuple[str, float]]]:
+    """-X importtime 출력에서 대상 모듈의 누적 시간(ms)과, 대상이 직접 불러온 import 중 무거운 순서 top개를 찾습니다."""
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append((len(match.group(3)) // 2, match.group(4), int(match.group(2)) / 1000))
+
+    # 자식 import가 부모보다 먼저 출력되므로, 대상 모듈 줄 바로 앞의 한 단계 깊은 줄들이 직접 import입니다.
+    for index, (depth, name, cumulative) in enumerate(entries):
+        if name == module:
+            children = []
+            for child_depth, child_name, child_cumulative in reversed(entries[:index]):
+                if child_depth <= depth:
+                    break
+                if child_depth == depth + 1:
+                    children.append((child_name, child_cumulative))
+            children.sort(key=lambda item: item[1], reverse=True)
+            return cumulative, children[:top]
+    return None, []
+
+
+def measure(path: Path, runs: int, top: int) -> ImportResult:
+    cwd, module = module_location(path)
+    result = ImportResult(module=str(path))
+    # 예제가 .env나 캐시 설정을 읽더라도 측정 결과가 달라지지 않도록 트레이싱은 끕니다.
+    env = {k: v for k, v in os.environ.items() if k not in ("TRACE_FILE", "TRACE_OTLP_ENDPOINT")}
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=cwd, env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            messages = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+            result.error = messages[-1] if messages else f"종료 코드 {completed.returncode}"
+            return result
+        cumulative, heaviest = parse_importtime(completed.stderr, module, top)
+        if cumulative is not None and (result.cumulative_ms is None or cumulative < result.cumulative_ms):
+            result.cumulative_ms, result.heaviest = cumulative, heaviest
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="측정할 스크립트 경로 (저장소 루트 기준)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="모듈별 import 시간 예산 (ms)")
+    parser.add_argument("--runs", type=int, default=3, help="모듈별 측정 횟수 (가장 짧은 값 사용)")
+    parser.add_argument("--top", type=int, default=5, help="모듈별로 보여 줄 무거운 import 수")
+    args = parser.parse_args()
+
+    failed = 0
+    print(f"{'module':<52} {'import ms':>10}  결과")
+    for module in args.modules:
+        result = measure(REPO_ROOT / module, args.runs, args.top)
+        if result.error is not None:
+            failed += 1
+            print(f"{module:<52} {'-':>10}  실패: {result.error}")
+            continue
+        over = result.cumulative_ms > args.budget_ms
+        failed += over
+        print(f"{module:<52} {result.cumulative_ms:>10.1f}  {'예산 초과' if over else 'OK'}")
+        for name, cumulative in result.heaviest:
+            print(f"    {name:<48} {cumulative:>10.1f}")
+
+    print(f"\n예산 {args.budget_ms:.0f} ms, 모듈 {len(args.modules)}개 중 실패 {failed}개")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
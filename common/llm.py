@@ -0,0 +1,105 @@
+"""
+채팅 모델 생성 헬퍼
+예제마다 흩어져 있던 ChatGroq / init_chat_model 생성을 한곳으로 모읍니다.
+처음 모델을 만들 때 LLM 응답 캐시(common/llm_cache.py)를 LangChain 전역 캐시로 설치하고,
+실제 모델을 ManagedChatModel(common/managed_model.py)로 감싸서 동시 호출 합치기 등을 적용합니다.
+모델(제공자:모델 이름)마다 공용 RateLimiter(common/rate_limit.py)를 연결하고,
+429 재시도는 RateLimiter가 맡으므로 실제 모델 클라이언트의 자체 재시도(max_retries)는 끕니다.
+성공 응답의 x-ratelimit-* 헤더도 RateLimiter에 전달합니다. OpenAI 계열은 include_response_headers로
+메시지에 싣고, 이 옵션이 없는 ChatGroq는 groq 클라이언트의 HTTP 응답 훅에서 바로 넘깁니다.
+
+환경 변수
+- LLM_CACHE: "off"이면 캐시를 설치하지 않습니다. (기본: 사용)
+- LLM_CACHE_DB: 캐시 SQLite 파일 경로 (기본: .cache/llm_cache.sqlite)
+- LLM_CACHE_TTL: 항목 유효 시간(초, 기본: 무제한) / LLM_CACHE_MAX_ENTRIES: 최대 항목 수 (기본: 10000)
+- LLM_RATE_LIMIT, LLM_RPM, LLM_TPM, LLM_MAX_CONCURRENCY, LLM_RATE_LIMIT_RETRIES: 요청 제한 (common/rate_limit.py)
+"""
+import os
+from typing import Any, Dict, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.language_models import BaseChatModel
+
+from common.llm_cache import DEFAULT_LLM_CACHE_DB, SQLiteLLMCache
+from common.managed_model import ManagedChatModel
+from common.rate_limit import RateLimiter, get_rate_limiter
+from common.tracing import TracingCallbackHandler, get_tracer
+
+DEFAULT_PROVIDER = "groq"
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+# 응답 헤더를 response_metadata["headers"]에 실어 주는 (include_response_headers 옵션이 있는) 제공자입니다.
+RESPONSE_HEADER_PROVIDERS = ("openai", "azure_openai")
+
+
+def install_llm_cache(embeddings: Optional[Embeddings] = None, **kwargs: Any) -> Optional[SQLiteLLMCache]:
+    """
+    SQLite LLM 캐시를 전역 캐시로 설치합니다. 이미 설치되어 있으면 그대로 반환합니다.
+    embeddings를 넘기면 의미 유사도 단계도 사용합니다. (이미 설치된 캐시에도 적용)
+    """
+    cache = get_llm_cache()
+    if isinstance(cache, SQLiteLLMCache):
+        if embeddings is not None:
+            cache.embeddings = embeddings
+        return cache
+    if os.getenv("LLM_CACHE", "on").lower() in ("off", "0", "false"):
+        return None
+
+    ttl = os.getenv("LLM_CACHE_TTL")
+    kwargs.setdefault("path", os.getenv("LLM_CACHE_DB") or DEFAULT_LLM_CACHE_DB)
+    kwargs.setdefault("ttl", float(ttl) if ttl else None)
+    kwargs.setdefault("max_entries", int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")))
+    cache = SQLiteLLMCache(embeddings=embeddings, **kwargs)
+    set_llm_cache(cache)
+    return cache
+
+
+def llm_cache_stats() -> Dict[str, object]:
+    cache = get_llm_cache()
+    return cache.stats() if isinstance(cache, SQLiteLLMCache) else {}
+
+
+def groq_http_clients(limiter: RateLimiter) -> Dict[str, Any]:
+    """응답을 받을 때마다 헤더를 limiter에 넘기는 groq 기본 HTTP 클라이언트(동기/비동기)입니다."""
+    from groq import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+    def on_response(response) -> None:
+        limiter.sync_headers(response.headers)
+
+    async def aon_response(response) -> None:
+        limiter.sync_headers(response.headers)
+
+    return {
+        "http_client": DefaultHttpxClient(event_hooks={"response": [on_response]}),
+        "http_async_client": DefaultAsyncHttpxClient(event_hooks={"response": [aon_response]}),
+    }
+
+
+def create_chat_model(
+    model: str = DEFAULT_MODEL,
+    provider: str = DEFAULT_PROVIDER,
+    temperature: float = 0,
+    coalesce: bool = True,
+    **kwargs: Any,
+) -> BaseChatModel:
+    install_llm_cache()
+    # 응답 캐시는 래퍼에서 한 번만 적용되도록 실제 모델은 캐시 없이 만듭니다.
+    kwargs.setdefault("cache", False)
+    limiter = get_rate_limiter(f"{provider}:{model}")
+    if limiter is not None:
+        kwargs.setdefault("max_retries", 0)
+        if provider in RESPONSE_HEADER_PROVIDERS:
+            kwargs.setdefault("include_response_headers", True)
+        elif provider == "groq" and "http_client" not in kwargs and "http_async_client" not in kwargs:
+            kwargs.update(groq_http_clients(limiter))
+    if provider == "groq":
+        from langchain_groq import ChatGroq
+
+        inner = ChatGroq(model=model, temperature=temperature, **kwargs)
+    else:
+        from langchain.chat_models import init_chat_model
+
+        inner = init_chat_model(model=model, model_provider=provider, temperature=temperature, **kwargs)
+    # 트레이싱이 켜져 있으면 LLM 호출마다 모델 이름/토큰 수/캐시 적중 여부를 span으로 기록합니다.
+    callbacks = [TracingCallbackHandler()] if get_tracer().enabled else None
+    return ManagedChatModel(inner=inner, coalesce=coalesce, limiter=limiter, callbacks=callbacks)
@@ -0,0 +1,240 @@
+"""
+LLM 응답 캐시 (SQLite)
+LangChain 전역 캐시(set_llm_cache)로 설치하면 cache 옵션을 따로 지정하지 않은 모든 채팅 모델 호출에 적용됩니다.
+예제의 모델은 모두 temperature=0이므로 같은 요청이면 응답도 사실상 같습니다.
+
+- 정확 일치: 정규화한 메시지 목록 + llm_string(모델 이름, 파라미터, bind_tools로 묶은 도구 포함)의 해시로 찾습니다.
+  메시지 ID, response_metadata/usage_metadata, 공백 차이처럼 호출마다 달라지는 값은 키에서 제외합니다.
+- 의미 유사도(선택): embeddings를 넘기면 정확 일치에 실패했을 때 같은 llm_string의 항목 중
+  코사인 유사도가 threshold 이상인 응답을 재사용합니다.
+- 저장소: SQLite(WAL). max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 지우고(LRU), ttl이 지난 항목은 무시합니다.
+
+캐시에서 나온 응답은 message.response_metadata["cache_hit"]가 True이며, 적중/미스 수는 stats()로 확인합니다.
+미스 뒤 LLM 호출이 실패하면 update가 오지 않으므로, 호출한 쪽(ManagedChatModel)이 discard_pending으로
+lookup에서 보관한 임베딩을 지웁니다. 그 밖의 경로로 남는 항목은 max_pending개를 넘으면 오래된 것부터 버립니다.
+"""
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.embeddings import Embeddings
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import ChatGeneration
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_LLM_CACHE_DB = REPO_ROOT / ".cache" / "llm_cache.sqlite"
+
+# 호출마다 달라져서 캐시 키에 넣으면 안 되는 메시지 필드
+VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        kwargs = value.get("kwargs")
+        if value.get("lc") and isinstance(kwargs, dict):
+            value = {**value, "kwargs": {k: v for k, v in kwargs.items() if k not in VOLATILE_MESSAGE_FIELDS}}
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def normalize_prompt(prompt: str) -> Any:
+    """LangChain이 직렬화한 메시지 목록(JSON)을 키 생성용으로 정규화합니다."""
+    try:
+        return _normalize(json.loads(prompt))
+    except ValueError:
+        return " ".join(prompt.split())
+
+
+def prompt_text(normalized: Any) -> str:
+    """임베딩에 사용할 텍스트(메시지 content만 이어 붙인 값)를 만듭니다."""
+    if isinstance(normalized, str):
+        return normalized
+    parts = []
+    for message in normalized if isinstance(normalized, list) else [normalized]:
+        content = message.get("kwargs", {}).get("content") if isinstance(message, dict) else message
+        parts.append(content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, sort_keys=True))
+    return "\n".join(parts)
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class SQLiteLLMCache(BaseCache):
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_LLM_CACHE_DB,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = None,
+        embeddings: Optional[Embeddings] = None,
+        similarity_threshold: float = 0.97,
+        max_candidates: int = 500,
+        max_pending: int = 1024,
+    ):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.max_candidates = max_candidates
+        self.max_pending = max_pending
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        # lookup에서 계산한 임베딩을 update에서 다시 계산하지 않도록 잠시 보관합니다.
+        self._pending_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                llm_key TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                response TEXT NOT NULL,
+                embedding TEXT
+            );
+            CREATE INDEX IF NOT EXISTS llm_cache_llm_key ON llm_cache (llm_key, accessed_at);
+            CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at);
+            """
+        )
+
+    # ─── BaseCache ──────────────────────────────────────────────────────────
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        normalized, llm_key, key = self._keys(prompt, llm_string)
+        now = time.time()
+        min_created = now - self.ttl if self.ttl is not None else 0.0
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND created_at >= ?", (key, min_created)
+            ).fetchone()
+            if row is not None:
+                self._touch(key, now)
+                self.counts["exact_hits"] += 1
+                return self._load(row[0])
+
+        if self.embeddings is not None:
+            vector = self.embeddings.embed_query(prompt_text(normalized))
+            with self._lock:
+                self._pending_embeddings[key] = vector
+                while len(self._pending_embeddings) > self.max_pending:
+                    self._pending_embeddings.popitem(last=False)
+                best_key, best_score, best_response = None, 0.0, None
+                for candidate_key, response, embedding in self._conn.execute(
+                    "SELECT key, response, embedding FROM llm_cache "
+                    "WHERE llm_key = ? AND embedding IS NOT NULL AND created_at >= ? "
+                    "ORDER BY accessed_at DESC LIMIT ?",
+                    (llm_key, min_created, self.max_candidates),
+                ):
+                    score = _cosine(vector, json.loads(embedding))
+                    if score > best_score:
+                        best_key, best_score, best_response = candidate_key, score, response
+                if best_key is not None and best_score >= self.similarity_threshold:
+                    self._pending_embeddings.pop(key, None)
+                    self._touch(best_key, now)
+                    self.counts["semantic_hits"] += 1
+                    return self._load(best_response)
+
+        with self._lock:
+            self.counts["misses"] += 1
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        normalized, llm_key, key = self._keys(prompt, llm_string)
+        response = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+
+        with self._lock:
+            vector = self._pending_embeddings.pop(key, None)
+        if vector is None and self.embeddings is not None:
+            vector = self.embeddings.embed_query(prompt_text(normalized))
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, llm_key, created_at, accessed_at, response, embedding) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, llm_key, now, now, response, json.dumps(vector) if vector is not None else None),
+            )
+            self.counts["writes"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._pending_embeddings.clear()
+
+    def discard_pending(self, prompt: str, llm_string: str) -> None:
+        """미스 뒤 LLM 호출이 실패해서 update가 오지 않을 때 보관해 둔 임베딩을 지웁니다."""
+        if self.embeddings is None:
+            return
+        _, _, key = self._keys(prompt, llm_string)
+        with self._lock:
+            self._pending_embeddings.pop(key, None)
+
+    # ─── Internals ──────────────────────────────────────────────────────────
+    @staticmethod
+    def _keys(prompt: str, llm_string: str) -> Tuple[Any, str, str]:
+        """(정규화한 프롬프트, llm_string 해시, 캐시 키)"""
+        normalized = normalize_prompt(prompt)
+        llm_key = _hash(llm_string)
+        return normalized, llm_key, _hash(llm_key, json.dumps(normalized, ensure_ascii=False, sort_keys=True))
+
+    def _touch(self, key: str, now: float) -> None:
+        self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        if self.ttl is not None:
+            expired = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            self.counts["evictions"] += expired.rowcount
+        excess = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            evicted = self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,),
+            )
+            self.counts["evictions"] += evicted.rowcount
+
+    def _load(self, response: str) -> RETURN_VAL_TYPE:
+        generations = [loads(item) for item in json.loads(response)]
+        for generation in generations:
+            if isinstance(generation, ChatGeneration):
+                generation.message.response_metadata = {**generation.message.response_metadata, "cache_hit": True}
+        return generations
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counts = dict(self.counts)
+            size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            pending = len(self._pending_embeddings)
+        hits = counts.get("exact_hits", 0) + counts.get("semantic_hits", 0)
+        lookups = hits + counts.get("misses", 0)
+        return {
+            **{name: counts.get(name, 0) for name in ("exact_hits", "semantic_hits", "misses", "writes", "evictions")},
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "size": size,
+            "pending_embeddings": pending,
+        }
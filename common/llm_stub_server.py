@@ -0,0 +1,223 @@
+"""
+요청 제한을 흉내 내는 로컬 OpenAI 호환 스텁 서버
+실제 제공자를 호출하지 않고 RateLimiter(common/rate_limit.py)의 동작과 처리량을 확인합니다.
+
+- POST .../chat/completions: 고정 응답과 usage(글자 수 기반 토큰 추정)를 돌려줍니다.
+  Groq 클라이언트의 /openai/v1/chat/completions 경로도 받으므로 GROQ_API_BASE로 가리킬 수 있습니다.
+- 최근 60초 동안의 요청 수/토큰 수가 --rpm/--tpm을 넘거나 동시 요청이 --max-concurrency를 넘으면
+  429와 Retry-After, x-ratelimit-* 헤더(Groq 형식)를 반환합니다. 성공 응답에도 같은 헤더를 붙입니다.
+
+실행
+    # 서버만 띄우기 (다른 터미널에서 GROQ_API_BASE=http://127.0.0.1:8099 GROQ_API_KEY=stub 로 예제 실행)
+    python -m common.llm_stub_server --port 8099 --rpm 60 --tpm 20000
+
+    # 서버를 띄우고 RateLimiter를 거친 요청과 거치지 않은 요청의 처리량/429 수를 비교
+    python -m common.llm_stub_server --bench --requests 120 --workers 32 --rpm 60 --tpm 6000 --window 6
+"""
+import argparse
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Optional, Tuple
+
+from common.rate_limit import RateLimiter, request_tokens
+
+
+class ProviderLimits:
+    """슬라이딩 윈도우로 분당 요청/토큰 한도와 동시 요청 한도를 검사합니다."""
+
+    def __init__(self, rpm: int, tpm: int, max_concurrency: int, window: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.window = window
+        self.in_flight = 0
+        self.throttled = 0
+        self._requests: Deque[float] = deque()
+        self._tokens: Deque[Tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._requests and now - self._requests[0] >= self.window:
+            self._requests.popleft()
+        while self._tokens and now - self._tokens[0][0] >= self.window:
+            self._tokens.popleft()
+
+    def _headers(self, now: float) -> Dict[str, str]:
+        used_tokens = sum(amount for _, amount in self._tokens)
+        reset_requests = self.window - (now - self._requests[0]) if self._requests else 0.0
+        reset_tokens = self.window - (now - self._tokens[0][0]) if self._tokens else 0.0
+        return {
+            "x-ratelimit-limit-requests": str(self.rpm),
+            "x-ratelimit-limit-tokens": str(self.tpm),
+            "x-ratelimit-remaining-requests": str(max(self.rpm - len(self._requests), 0)),
+            "x-ratelimit-remaining-tokens": str(max(self.tpm - used_tokens, 0)),
+            "x-ratelimit-reset-requests": f"{reset_requests:.2f}s",
+            "x-ratelimit-reset-tokens": f"{reset_tokens:.2f}s",
+        }
+
+    def admit(self, tokens: int) -> Tuple[bool, Dict[str, str]]:
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            used_tokens = sum(amount for _, amount in self._tokens)
+            over_requests = len(self._requests) + 1 > self.rpm
+            over_tokens = used_tokens + tokens > self.tpm
+            if over_requests or over_tokens or self.in_flight >= self.max_concurrency:
+                self.throttled += 1
+                headers = self._headers(now)
+                if over_requests:
+                    retry_after = self.window - (now - self._requests[0])
+                elif over_tokens and self._tokens:
+                    retry_after = self.window - (now - self._tokens[0][0])
+                else:
+                    retry_after = 1.0
+                headers["retry-after"] = str(max(math.ceil(retry_after), 1))
+                return False, headers
+            self._requests.append(now)
+            self._tokens.append((now, tokens))
+            self.in_flight += 1
+            return True, self._headers(now)
+
+    def done(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+
+def _estimate(text: str) -> int:
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def make_handler(limits: ProviderLimits, latency: float, completion_tokens: int):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict, headers: Dict[str, str]) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}}, {})
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            prompt_tokens = sum(_estimate(str(m.get("content") or "")) + 4 for m in request.get("messages", []))
+            output_tokens = min(request.get("max_tokens") or completion_tokens, completion_tokens)
+            admitted, headers = limits.admit(prompt_tokens + output_tokens)
+            if not admitted:
+                self._send_json(429, {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}}, headers)
+                return
+            try:
+                time.sleep(latency)
+                self._send_json(200, {
+                    "id": f"chatcmpl-stub-{time.monotonic_ns()}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": "stub response"}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": output_tokens, "total_tokens": prompt_tokens + output_tokens},
+                }, headers)
+            finally:
+                limits.done()
+
+    return Handler
+
+
+class StubServer(ThreadingHTTPServer):
+    # 기본 listen 대기열(5)로는 동시 연결이 많을 때 연결이 끊기므로 늘립니다.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def start_server(port: int, limits: ProviderLimits, latency: float, completion_tokens: int) -> StubServer:
+    server = StubServer(("127.0.0.1", port), make_handler(limits, latency, completion_tokens))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ─── Bench ──────────────────────────────────────────────────────────────────
+def _post(url: str, body: dict) -> Tuple[Dict[str, str], dict]:
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return dict(response.headers), json.loads(response.read())
+
+
+def _usage(result: Tuple[Dict[str, str], dict]) -> Tuple[Dict[str, str], Optional[int]]:
+    headers, body = result
+    return headers, body["usage"]["total_tokens"]
+
+
+def run_bench(url: str, requests: int, workers: int, limiter: Optional[RateLimiter], prompt: str) -> Dict[str, object]:
+    body = {"model": "stub", "messages": [{"role": "user", "content": prompt}], "max_tokens": 64}
+    tokens = request_tokens(_estimate(prompt) + 4, 64)
+
+    def one(_) -> bool:
+        try:
+            if limiter is None:
+                _post(url, body)
+            else:
+                limiter.call(lambda: _post(url, body), tokens, usage=_usage)
+            return True
+        except urllib.error.HTTPError:
+            return False
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = list(pool.map(one, range(requests))).count(False)
+    elapsed = time.monotonic() - start
+    return {"elapsed_s": round(elapsed, 2), "ok": requests - errors, "failed": errors, "ok_per_s": round((requests - errors) / elapsed, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099, help="서버 포트 (--bench에서 0이면 빈 포트 사용)")
+    parser.add_argument("--rpm", type=int, default=30, help="분당 요청 한도")
+    parser.add_argument("--tpm", type=int, default=12000, help="분당 토큰 한도")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="동시 요청 한도")
+    parser.add_argument("--window", type=float, default=60.0, help="한도를 세는 윈도우 길이(초, 빠른 실험용)")
+    parser.add_argument("--latency", type=float, default=0.2, help="응답 지연(초)")
+    parser.add_argument("--completion-tokens", type=int, default=64, help="응답 토큰 수")
+    parser.add_argument("--bench", action="store_true", help="서버를 띄우고 RateLimiter 유무에 따른 처리량 비교")
+    parser.add_argument("--requests", type=int, default=120, help="벤치마크 요청 수")
+    parser.add_argument("--workers", type=int, default=32, help="벤치마크 동시 호출 스레드 수")
+    args = parser.parse_args()
+
+    def new_limits() -> ProviderLimits:
+        return ProviderLimits(args.rpm, args.tpm, args.max_concurrency, window=args.window)
+
+    if not args.bench:
+        limits = new_limits()
+        server = StubServer(("127.0.0.1", args.port), make_handler(limits, args.latency, args.completion_tokens))
+        print(f"스텁 서버: http://127.0.0.1:{args.port} (rpm={args.rpm}, tpm={args.tpm}, 동시 {args.max_concurrency})")
+        server.serve_forever()
+        return
+
+    # 윈도우를 줄여서 실험하면 RateLimiter의 버킷도 같은 주기로 채웁니다.
+    prompt = "요청 제한 벤치마크 " * 20
+    for label, limiter in (
+        ("제한 없음", None),
+        ("RateLimiter", RateLimiter("bench", rpm=args.rpm, tpm=args.tpm, max_concurrency=args.workers, backoff_max=args.window, period=args.window)),
+    ):
+        limits = new_limits()
+        server = start_server(0, limits, args.latency, args.completion_tokens)
+        url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+        result = run_bench(url, args.requests, args.workers, limiter, prompt)
+        server.shutdown()
+        print(f"{label:<12} {result} 서버 429 {limits.throttled}회" + (f" {limiter.stats()}" if limiter else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+관리형 채팅 모델
+실제 채팅 모델(inner)을 감싸서, 모든 예제의 LLM 호출이 같은 경로를 지나가게 합니다.
+
+- 동시 호출 합치기: 같은 모델/파라미터/도구/메시지로 동시에 들어온 호출은 한 번만 실행합니다. (common/singleflight.py)
+- LLM 응답 캐시는 이 래퍼 단계에서 적용됩니다. (inner는 cache=False로 만들어 이중 저장을 피함)
+  호출이 실패하면 캐시가 lookup에서 보관한 임베딩을 지웁니다. (update가 오지 않으므로)
+- 토큰 사용량 기록과 요청별 토큰 예산 적용(잘라내기/중단)도 여기서 합니다. (common/usage.py)
+  예산은 캐시 조회 전에 적용하므로, 잘라낸 프롬프트의 응답은 잘라낸 프롬프트의 키로만 저장됩니다.
+- limiter가 있으면 실제 호출을 RPM/TPM 토큰 버킷과 적응형 동시성 한도 안에서 보내고, 429는 Retry-After만큼 기다렸다 다시 보냅니다. (common/rate_limit.py)
+  합쳐진 호출과 캐시 적중은 실제 요청이 아니므로 제한을 거치지 않습니다.
+- bind_tools는 inner의 도구 변환 결과를 그대로 이 래퍼에 묶으므로, 도구를 바인딩해도 위 기능이 유지됩니다.
+"""
+import hashlib
+import json
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.callbacks import (
+    AsyncCallbackManager,
+    AsyncCallbackManagerForLLMRun,
+    BaseCallbackManager,
+    CallbackManager,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.globals import get_llm_cache
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from common.llm_cache import SQLiteLLMCache, normalize_prompt
+from common.rate_limit import RateLimiter, message_usage, request_tokens
+from common.singleflight import AsyncSingleFlight, SingleFlight
+from common.usage import enforce_budget, estimate_message_tokens, usage_tracker
+
+# 모든 ManagedChatModel 인스턴스가 공유합니다. (키에 모델 식별 정보가 들어가므로 섞이지 않음)
+LLM_FLIGHTS = SingleFlight()
+LLM_ASYNC_FLIGHTS = AsyncSingleFlight()
+
+
+def child_callbacks(run_manager) -> Optional[BaseCallbackManager]:
+    """
+    inner 호출을 이 모델 실행의 하위 실행으로 묶는 콜백 관리자를 만듭니다.
+    LLM 실행 관리자에는 get_child()가 없으므로 ParentRunManager.get_child와 같은 방식으로 만듭니다.
+    """
+    if run_manager is None:
+        return None
+    manager_cls = AsyncCallbackManager if isinstance(run_manager, AsyncCallbackManagerForLLMRun) else CallbackManager
+    manager = manager_cls(handlers=[], parent_run_id=run_manager.run_id)
+    manager.set_handlers(run_manager.inheritable_handlers)
+    manager.add_tags(run_manager.inheritable_tags)
+    manager.add_metadata(run_manager.inheritable_metadata)
+    return manager
+
+
+class ManagedChatModel(BaseChatModel):
+    inner: BaseChatModel
+    coalesce: bool = True
+    limiter: Optional[RateLimiter] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return f"managed-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"inner_type": self.inner._llm_type, **self.inner._identifying_params}
+
+    @property
+    def model_name(self) -> Optional[str]:
+        params = self.inner._identifying_params
+        return params.get("model_name") or params.get("model")
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        # 도구 스키마 변환은 inner 구현을 그대로 쓰고, 결과 인자만 이 모델에 묶습니다.
+        bound = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**getattr(bound, "kwargs", {}))
+
+    def _flight_key(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> str:
+        params = {**self._identifying_params, "stop": stop, **kwargs}
+        payload = json.dumps(
+            [normalize_prompt(dumps(messages)), params], ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _max_tokens(self, kwargs: Dict[str, Any]) -> Optional[int]:
+        return kwargs.get("max_tokens") or getattr(self.inner, "max_tokens", None)
+
+    def _request_tokens(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> int:
+        return request_tokens(estimate_message_tokens(messages), self._max_tokens(kwargs))
+
+    @staticmethod
+    def _result(message: BaseMessage) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    # ─── Cache ──────────────────────────────────────────────────────────────
+    # BaseChatModel은 캐시 lookup → 생성(_generate 또는 _stream) → update 순서로 호출합니다.
+    # 토큰 예산은 lookup 전에 적용해서, 캐시 키와 실제로 보낸 메시지가 같게 합니다.
+    # (생성 단계에서 잘라내면 잘린 프롬프트의 응답이 원래 프롬프트의 키로 저장됨)
+    # 생성이 실패하면 update가 오지 않으므로, lookup이 보관한 임베딩을 여기서 지웁니다.
+    def _discard_pending_cache(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> None:
+        if self.cache is False:
+            return
+        cache = self.cache if isinstance(self.cache, BaseCache) else get_llm_cache()
+        if isinstance(cache, SQLiteLLMCache):
+            cache.discard_pending(dumps(messages), self._get_llm_string(stop=stop, **kwargs))
+
+    def _generate_with_cache(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        messages = enforce_budget(messages, self._max_tokens(kwargs))
+        try:
+            return super()._generate_with_cache(messages, stop=stop, run_manager=run_manager, **kwargs)
+        except BaseException:
+            self._discard_pending_cache(messages, stop, kwargs)
+            raise
+
+    async def _agenerate_with_cache(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        messages = enforce_budget(messages, self._max_tokens(kwargs))
+        try:
+            return await super()._agenerate_with_cache(messages, stop=stop, run_manager=run_manager, **kwargs)
+        except BaseException:
+            self._discard_pending_cache(messages, stop, kwargs)
+            raise
+
+    # ─── Sync ───────────────────────────────────────────────────────────────
+    def _call_inner(self, messages: List[BaseMessage], stop: Optional[List[str]], run_manager, **kwargs: Any) -> AIMessage:
+        config = {"callbacks": child_callbacks(run_manager)} if run_manager else None
+
+        def invoke() -> AIMessage:
+            return self.inner.invoke(messages, config=config, stop=stop, **kwargs)
+
+        if self.limiter is None:
+            response = invoke()
+        else:
+            response = self.limiter.call(invoke, self._request_tokens(messages, kwargs))
+        usage_tracker.record_llm(self.model_name, messages, response)
+        return response
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # 토큰 예산은 _generate_with_cache에서 이미 적용했습니다.
+        if not self.coalesce:
+            return self._result(self._call_inner(messages, stop, run_manager, **kwargs))
+        key = self._flight_key(messages, stop, kwargs)
+        return self._result(LLM_FLIGHTS.do(key, self._call_inner, messages, stop, run_manager, **kwargs))
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        # 스트리밍은 호출자마다 조각을 받아야 하므로 합치지 않습니다.
+        # 이미 일부 조각을 내보냈을 수 있으므로 429를 받아도 다시 보내지 않고 제한 상태만 반영합니다.
+        # stream()은 캐시를 거치지 않으므로 예산을 여기서 적용합니다. (이미 잘라낸 메시지면 그대로 통과)
+        messages = enforce_budget(messages, self._max_tokens(kwargs))
+        tokens = self._request_tokens(messages, kwargs)
+        full = None
+        with self.limiter.slot(tokens) if self.limiter else nullcontext():
+            try:
+                for chunk in self.inner.stream(messages, stop=stop, **kwargs):
+                    full = chunk if full is None else full + chunk
+                    if run_manager:
+                        run_manager.on_llm_new_token(chunk.content, chunk=chunk)
+                    yield ChatGenerationChunk(message=chunk)
+            except Exception as e:
+                if self.limiter:
+                    self.limiter.on_error(e)
+                raise
+        if full is not None:
+            usage_tracker.record_llm(self.model_name, messages, full)
+            if self.limiter:
+                self.limiter.on_success(tokens, *message_usage(full))
+
+    # ─── Async ──────────────────────────────────────────────────────────────
+    async def _acall_inner(self, messages: List[BaseMessage], stop: Optional[List[str]], run_manager, **kwargs: Any) -> AIMessage:
+        config = {"callbacks": child_callbacks(run_manager)} if run_manager else None
+
+        async def ainvoke() -> AIMessage:
+            return await self.inner.ainvoke(messages, config=config, stop=stop, **kwargs)
+
+        if self.limiter is None:
+            response = await ainvoke()
+        else:
+            response = await self.limiter.acall(ainvoke, self._request_tokens(messages, kwargs))
+        usage_tracker.record_llm(self.model_name, messages, response)
+        return response
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # 토큰 예산은 _generate_with_cache에서 이미 적용했습니다.
+        if not self.coalesce:
+            return self._result(await self._acall_inner(messages, stop, run_manager, **kwargs))
+        key = self._flight_key(messages, stop, kwargs)
+        return self._result(await LLM_ASYNC_FLIGHTS.do(key, self._acall_inner, messages, stop, run_manager, **kwargs))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        messages = enforce_budget(messages, self._max_tokens(kwargs))
+        tokens = self._request_tokens(messages, kwargs)
+        full = None
+        async with self.limiter.aslot(tokens) if self.limiter else nullcontext():
+            try:
+                async for chunk in self.inner.astream(messages, stop=stop, **kwargs):
+                    full = chunk if full is None else full + chunk
+                    if run_manager:
+                        await run_manager.on_llm_new_token(chunk.content, chunk=chunk)
+                    yield ChatGenerationChunk(message=chunk)
+            except Exception as e:
+                if self.limiter:
+                    self.limiter.on_error(e)
+                raise
+        if full is not None:
+            usage_tracker.record_llm(self.model_name, messages, full)
+            if self.limiter:
+                self.limiter.on_success(tokens, *message_usage(full))
+
+
+def coalescing_stats() -> Dict[str, Dict[str, int]]:
+    return {"sync": LLM_FLIGHTS.stats(), "async": LLM_ASYNC_FLIGHTS.stats()}
@@ -0,0 +1,424 @@
+"""
+클라이언트 측 LLM 요청 제한 (RPM/TPM 토큰 버킷 + 적응형 동시성)
+제공자(Groq 등)의 429를 맞고 나서야 무작정 물러나는 대신, 요청을 보내기 전에 속도를 맞춥니다.
+
+- 토큰 버킷: 분당 요청 수(RPM)와 분당 토큰 수(TPM) 버킷에서 미리 예약합니다.
+  토큰은 (프롬프트 추정치 + 최대 응답 토큰)을 먼저 빼고, 응답의 실제 사용량으로 차이를 보정합니다.
+- 응답 헤더: x-ratelimit-remaining-* / x-ratelimit-reset-*를 읽어 버킷을 제공자의 남은 양에 맞춥니다.
+  남은 요청/토큰이 0이면 reset 시간까지 새 요청을 보내지 않습니다.
+- 429: Retry-After(없으면 jitter를 넣은 지수 백오프) 동안 모든 요청을 멈추고 max_retries번까지 다시 보냅니다.
+- 적응형 동시성(AIMD): 성공할 때마다 동시 실행 한도를 1/limit씩 늘리고, 429를 받으면 절반으로 줄입니다.
+  (cooldown 안에 연달아 받은 429는 한 번만 반영) 지속 가능한 최대 병렬도를 스스로 찾아갑니다.
+
+create_chat_model()이 모델(제공자:모델 이름)마다 하나의 RateLimiter를 ManagedChatModel에 연결합니다.
+로컬 테스트는 common/llm_stub_server.py의 제한을 흉내 내는 스텁 서버로 합니다.
+
+환경 변수
+- LLM_RATE_LIMIT: "off"이면 사용하지 않습니다. (기본: 사용)
+- LLM_RPM / LLM_TPM: 분당 요청 / 토큰 한도 (0이면 제한 없음)
+  설정하지 않으면 DEFAULT_LIMITS에서 제공자:모델별 기본값을 찾고, 표에 없는 모델은 버킷 없이
+  응답 헤더 동기화, 429 처리, 적응형 동시성만 적용합니다.
+- LLM_MAX_CONCURRENCY: 동시 실행 한도의 최댓값 (기본: 16, 시작값은 4)
+- LLM_RATE_LIMIT_RETRIES: 429를 받았을 때 다시 보내는 횟수 (기본: 5)
+"""
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, Mapping, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# 제공자:모델별 기본 (RPM, TPM) 한도입니다. (Groq 무료 등급 기준, 등급이 다르면 LLM_RPM / LLM_TPM으로 덮어씀)
+DEFAULT_LIMITS: Dict[str, Tuple[Optional[float], Optional[float]]] = {
+    "groq:llama-3.3-70b-versatile": (30, 12000),
+    "groq:llama-3.1-8b-instant": (30, 6000),
+}
+DEFAULT_COMPLETION_TOKENS = 256
+_DURATION_PART = re.compile(r"([\d.]+)(ms|h|m|s)")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """'7.66s', '2m59.56s', '120ms', '3' 형식의 시간을 초로 바꿉니다. 해석할 수 없으면 None입니다."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+def _lower_headers(headers: Optional[Mapping[str, str]]) -> Dict[str, str]:
+    return {str(k).lower(): v for k, v in dict(headers or {}).items()}
+
+
+def throttle_info(exc: BaseException) -> Optional[Tuple[Optional[float], Dict[str, str]]]:
+    """
+    예외가 429(요청 제한)이면 (Retry-After 초 또는 None, 헤더)를 반환합니다. 아니면 None입니다.
+    groq/openai 클라이언트 예외(status_code, response.headers)와 urllib HTTPError(code, headers)를 모두 다룹니다.
+    """
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return None
+    headers = _lower_headers(getattr(response, "headers", None) or getattr(exc, "headers", None))
+    retry_after = parse_duration(headers.get("retry-after"))
+    if retry_after is None:
+        resets = [parse_duration(headers.get(name)) for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")]
+        retry_after = max((reset for reset in resets if reset is not None), default=None)
+    return retry_after, headers
+
+
+def message_usage(message: Any) -> Tuple[Dict[str, str], Optional[int]]:
+    """AIMessage에서 (응답 헤더, 실제 총 토큰 수)를 꺼냅니다. (헤더는 include_response_headers를 켠 제공자만)"""
+    metadata = getattr(message, "response_metadata", None) or {}
+    usage = getattr(message, "usage_metadata", None) or {}
+    return _lower_headers(metadata.get("headers")), usage.get("total_tokens")
+
+
+# ─── Token Bucket ───────────────────────────────────────────────────────────
+class TokenBucket:
+    """period초(기본 60초)마다 limit만큼 채워지는 버킷입니다. 예약은 즉시 빼고, 잔량이 음수면 채워질 때까지 기다릴 시간을 돌려줍니다."""
+
+    def __init__(self, limit: float, period: float = 60.0):
+        self.capacity = float(limit)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            # 한 번에 버킷보다 큰 요청도 언젠가는 보낼 수 있도록 capacity로 자릅니다.
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """예약량과 실제 사용량의 차이를 반영합니다. (delta > 0이면 더 뺌)"""
+        with self._lock:
+            self._refill()
+            self.tokens = max(self.tokens - delta, -self.capacity)
+
+    def sync(self, remaining: float) -> None:
+        """제공자가 알려 준 남은 양이 더 적으면 거기에 맞춥니다."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, remaining)
+
+
+# ─── Adaptive Concurrency ───────────────────────────────────────────────────
+class AdaptiveConcurrency:
+    """
+    AIMD 동시 실행 한도입니다. 스레드(acquire)와 코루틴(aacquire)이 같은 한도를 공유하며,
+    빈자리는 기다린 순서대로 넘겨줍니다.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16, decrease_factor: float = 0.5, cooldown: float = 1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._waiters: Deque[Any] = deque()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _try_take(self) -> bool:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def _wake(self) -> None:
+        # 락 안에서 호출합니다. 빈자리만큼 대기자에게 자리를 미리 잡아 주고 깨웁니다.
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            self.in_flight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future: "asyncio.Future[None]") -> None:
+        # 자리를 잡아 준 사이에 대기가 취소됐으면 자리를 돌려놓습니다.
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._try_take():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_take():
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+
+    def on_throttled(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                self._last_decrease = now
+
+
+# ─── Rate Limiter ───────────────────────────────────────────────────────────
+class RateLimiter:
+    def __init__(
+        self,
+        name: str,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 16,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        period: float = 60.0,
+    ):
+        self.name = name
+        self.requests = TokenBucket(rpm, period) if rpm else None
+        self.tokens = TokenBucket(tpm, period) if tpm else None
+        self.concurrency = AdaptiveConcurrency(initial=min(initial_concurrency, max_concurrency), maximum=max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.blocked_until = 0.0
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counts[name] += amount
+
+    def _reserve(self, tokens: int) -> float:
+        """버킷에서 예약하고 보내기 전에 기다려야 할 시간(초)을 돌려줍니다."""
+        waits = [self.blocked_until - time.monotonic()]
+        if self.requests is not None:
+            waits.append(self.requests.reserve(1))
+        if self.tokens is not None:
+            waits.append(self.tokens.reserve(tokens))
+        wait = max(0.0, *waits)
+        if wait > 0:
+            self._count("delayed")
+            self._count("wait_seconds", wait)
+        return wait
+
+    def _blocked_for(self) -> float:
+        return self.blocked_until - time.monotonic()
+
+    @contextmanager
+    def slot(self, tokens: int, reserve: bool = True) -> Iterator[None]:
+        """
+        토큰 버킷 예약 → (429 차단이 풀릴 때까지) 대기 → 동시 실행 자리 확보 순서로 실행 권한을 얻습니다.
+        429 재시도는 처음 예약한 양을 그대로 쓰므로 reserve=False로 다시 예약하지 않습니다.
+        """
+        if reserve:
+            time.sleep(self._reserve(tokens))
+        while self._blocked_for() > 0:
+            time.sleep(self._blocked_for())
+        self.concurrency.acquire()
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    @asynccontextmanager
+    async def aslot(self, tokens: int, reserve: bool = True) -> AsyncIterator[None]:
+        if reserve:
+            await asyncio.sleep(self._reserve(tokens))
+        while self._blocked_for() > 0:
+            await asyncio.sleep(self._blocked_for())
+        await self.concurrency.aacquire()
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    # ─── Feedback ───────────────────────────────────────────────────────────
+    def on_success(self, estimated: int, headers: Optional[Mapping[str, str]] = None, actual_tokens: Optional[int] = None) -> None:
+        self._count("requests")
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated)
+        self.sync_headers(headers)
+        self.concurrency.on_success()
+
+    def on_error(self, exc: BaseException, attempt: int = 0) -> Optional[float]:
+        """429이면 모든 요청을 잠시 멈추고 동시성을 줄인 뒤 기다릴 시간을 반환합니다. 429가 아니면 None입니다."""
+        info = throttle_info(exc)
+        if info is None:
+            return None
+        retry_after, headers = info
+        if retry_after is None:
+            retry_after = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        self._count("throttled")
+        self._sync_headers(headers)
+        self._block(retry_after)
+        self.concurrency.on_throttled()
+        return retry_after
+
+    def _block(self, seconds: float) -> None:
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def sync_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """x-ratelimit-* 헤더로 버킷을 맞춥니다. 헤더를 메시지에 싣지 않는 제공자는 HTTP 응답 훅에서 직접 부릅니다."""
+        self._sync_headers(_lower_headers(headers))
+
+    def _sync_headers(self, headers: Dict[str, str]) -> None:
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+            if bucket is not None:
+                bucket.sync(remaining)
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining <= 0 and reset:
+                self._block(reset)
+
+    # ─── Calls ──────────────────────────────────────────────────────────────
+    def call(
+        self,
+        fn: Callable[[], T],
+        tokens: int,
+        usage: Callable[[T], Tuple[Dict[str, str], Optional[int]]] = message_usage,
+    ) -> T:
+        """
+        fn을 제한 안에서 실행합니다. 429면 차단 시간만큼 기다렸다가 max_retries번까지 다시 실행합니다.
+        버킷은 첫 시도에서만 예약합니다. (요청 하나가 재시도마다 예약을 쌓아 다른 호출자를 늦추지 않도록)
+        """
+        for attempt in range(self.max_retries + 1):
+            with self.slot(tokens, reserve=attempt == 0):
+                try:
+                    response = fn()
+                except Exception as e:
+                    if self.on_error(e, attempt) is None or attempt == self.max_retries:
+                        raise
+                    self._count("retries")
+                    continue
+            self.on_success(tokens, *usage(response))
+            return response
+        raise AssertionError("unreachable")
+
+    async def acall(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        tokens: int,
+        usage: Callable[[T], Tuple[Dict[str, str], Optional[int]]] = message_usage,
+    ) -> T:
+        for attempt in range(self.max_retries + 1):
+            async with self.aslot(tokens, reserve=attempt == 0):
+                try:
+                    response = await fn()
+                except Exception as e:
+                    if self.on_error(e, attempt) is None or attempt == self.max_retries:
+                        raise
+                    self._count("retries")
+                    continue
+            self.on_success(tokens, *usage(response))
+            return response
+        raise AssertionError("unreachable")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            "requests": counts.get("requests", 0),
+            "throttled": counts.get("throttled", 0),
+            "retries": counts.get("retries", 0),
+            "delayed": counts.get("delayed", 0),
+            "wait_seconds": round(counts.get("wait_seconds", 0.0), 2),
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+        }
+
+
+def request_tokens(prompt_tokens: int, max_tokens: Optional[int]) -> int:
+    """버킷에서 미리 예약할 토큰 수입니다. (프롬프트 추정치 + 최대 응답 토큰)"""
+    return prompt_tokens + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _env_limit(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def get_rate_limiter(name: str) -> Optional[RateLimiter]:
+    """
+    이름(제공자:모델)별 프로세스 공용 RateLimiter입니다. LLM_RATE_LIMIT=off이면 None입니다.
+    RPM/TPM은 LLM_RPM / LLM_TPM → DEFAULT_LIMITS 순서로 정하고, 둘 다 없으면 버킷을 만들지 않습니다.
+    """
+    if os.getenv("LLM_RATE_LIMIT", "on").lower() in ("off", "0", "false"):
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            rpm, tpm = DEFAULT_LIMITS.get(name, (None, None))
+            limiter = _limiters[name] = RateLimiter(
+                name,
+                rpm=_env_limit("LLM_RPM", rpm),
+                tpm=_env_limit("LLM_TPM", tpm),
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+                max_retries=int(os.getenv("LLM_RATE_LIMIT_RETRIES", "5")),
+            )
+        return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, object]]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
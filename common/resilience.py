@@ -0,0 +1,269 @@
+"""
+외부 HTTP 도구 호출 복원력 (타임아웃 / 재시도 / 서킷 브레이커 / 헤지 요청)
+도구마다 이름을 붙인 클라이언트를 하나씩 두고, requests 호출을 그 클라이언트로 보냅니다.
+
+    response = http_client("wolfram_alpha", hedge=True).get(url, params=params)
+
+- 타임아웃: 모든 요청에 (connect, read) 타임아웃을 붙입니다. 멈춘 업스트림이 워커를 붙잡지 못하게 합니다.
+- 재시도: 멱등 요청(기본: GET)만 연결 오류, 타임아웃, 429/5xx 응답에 대해 지수 백오프 + full jitter로 재시도합니다.
+  Retry-After 헤더가 있으면 그 시간 이상 기다립니다. (최대 backoff_max)
+- 서킷 브레이커: 연속 실패가 failure_threshold번이면 회로를 열고 reset_timeout 동안 바로 CircuitOpenError를 발생시킵니다.
+  그 뒤 요청 하나만 시험 삼아 보내서(half-open) 성공하면 닫고, 실패하면 다시 엽니다. 4xx 응답은 실패로 세지 않습니다.
+- 헤지 요청: hedge=True인 멱등 GET은 첫 요청이 지금까지의 p95 지연 시간 안에 끝나지 않으면 같은 요청을 하나 더 보내고
+  먼저 끝난 응답을 사용합니다. (지연 표본이 min_samples개 모이기 전에는 보내지 않음)
+
+최종 오류는 requests 예외 그대로(CircuitOpenError도 requests.RequestException의 하위 클래스) 전달되므로
+도구의 기존 `except requests.exceptions.RequestException` 처리가 그대로 동작합니다.
+클라이언트별 재시도/헤지/회로 상태는 resilience_stats()로 확인합니다.
+"""
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import requests
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    pass
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    connect_timeout: float = 3.05
+    read_timeout: float = 10.0
+    retries: int = 2
+    backoff_base: float = 0.2
+    backoff_max: float = 5.0
+    # None이면 HTTP 메서드로 판단합니다. (GET 등은 멱등, POST는 비멱등)
+    idempotent: Optional[bool] = None
+    hedge: bool = False
+    hedge_min_delay: float = 0.05
+    min_samples: int = 20
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return self.connect_timeout, self.read_timeout
+
+
+# ─── Circuit Breaker ────────────────────────────────────────────────────────
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            # 회로가 열린 뒤 reset_timeout이 지나면 시험 요청 하나만 통과시킵니다.
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(f"'{self.name}' 회로가 열려 있습니다. (연속 실패 {self.failures}회, {max(remaining, 0):.1f}초 후 재시도)")
+            self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """결과 없이 끝난 시험 요청(취소 등)의 자리를 풀어서 다음 요청이 다시 시험할 수 있게 합니다."""
+        with self._lock:
+            self._probing = False
+
+
+# ─── Latency ────────────────────────────────────────────────────────────────
+class LatencyWindow:
+    """최근 성공 요청의 지연 시간(초)을 보관하고 백분위수를 계산합니다."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(int(round(pct / 100 * (len(samples) - 1))), len(samples) - 1)]
+
+
+# ─── Client ─────────────────────────────────────────────────────────────────
+class ResilientClient:
+    # 헤지 요청을 보내는 스레드 풀은 모든 클라이언트가 함께 씁니다.
+    _hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+    def __init__(self, name: str, policy: Optional[ResiliencePolicy] = None, session: Optional[requests.Session] = None):
+        self.name = name
+        self.policy = policy or ResiliencePolicy()
+        self.session = session or requests.Session()
+        self.breaker = CircuitBreaker(name, self.policy.failure_threshold, self.policy.reset_timeout)
+        self.latency = LatencyWindow()
+        self.counts: Counter = Counter()
+        self._counts_lock = threading.Lock()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        method = method.upper()
+        policy = self.policy
+        idempotent = policy.idempotent if policy.idempotent is not None else method in IDEMPOTENT_METHODS
+        kwargs.setdefault("timeout", policy.timeout)
+        attempts = 1 + (policy.retries if idempotent else 0)
+
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            self._count("requests")
+            try:
+                if policy.hedge and idempotent and method == "GET":
+                    response = self._hedged(method, url, kwargs)
+                else:
+                    response = self._send(method, url, kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.breaker.record_failure()
+                self._count("errors")
+                if attempt + 1 >= attempts:
+                    raise
+                self._sleep_before_retry(attempt, None)
+                continue
+            except Exception:
+                # 그 밖의 오류(잘못된 URL, 너무 많은 리디렉션 등)는 재시도하지 않지만 실패로 기록합니다.
+                # 기록하지 않으면 half-open 시험 요청이 끝나지 않은 것으로 남아 회로가 계속 열려 있습니다.
+                self.breaker.record_failure()
+                self._count("errors")
+                raise
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+
+            if response.status_code in RETRY_STATUSES:
+                # 429는 업스트림이 살아 있다는 뜻이므로 회로 실패로 세지 않습니다.
+                if response.status_code == 429:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                self._count("retryable_responses")
+                if attempt + 1 < attempts:
+                    self._sleep_before_retry(attempt, response.headers.get("Retry-After"))
+                    continue
+            else:
+                self.breaker.record_success()
+            return response
+        raise AssertionError("unreachable")
+
+    def _send(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        start = time.monotonic()
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code < 500:
+            self.latency.add(time.monotonic() - start)
+        return response
+
+    def _hedged(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        p95 = self.latency.percentile(95) if len(self.latency) >= self.policy.min_samples else None
+        if p95 is None:
+            return self._send(method, url, kwargs)
+
+        primary = self._hedge_pool.submit(self._send, method, url, kwargs)
+        done, _ = wait([primary], timeout=max(p95, self.policy.hedge_min_delay))
+        if done:
+            return primary.result()
+
+        # p95 안에 끝나지 않았으면 같은 요청을 하나 더 보내고 먼저 성공한 응답을 씁니다.
+        self._count("hedged")
+        hedge = self._hedge_pool.submit(self._send, method, url, kwargs)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _sleep_before_retry(self, attempt: int, retry_after: Optional[str]) -> None:
+        self._count("retries")
+        delay = random.uniform(0, min(self.policy.backoff_max, self.policy.backoff_base * 2 ** attempt))
+        if retry_after and retry_after.strip().isdigit():
+            delay = max(delay, min(float(retry_after), self.policy.backoff_max))
+        time.sleep(delay)
+
+    def _count(self, name: str) -> None:
+        with self._counts_lock:
+            self.counts[name] += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._counts_lock:
+            counts = dict(self.counts)
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        return {
+            **{name: counts.get(name, 0) for name in ("requests", "errors", "retries", "retryable_responses", "hedged", "hedge_wins")},
+            "circuit": self.breaker.state,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+_clients: Dict[str, ResilientClient] = {}
+_clients_lock = threading.Lock()
+
+
+def http_client(name: str, **policy: Any) -> ResilientClient:
+    """
+    이름별 공용 클라이언트를 반환합니다. (연결 풀, 서킷 브레이커, 지연 통계를 도구별로 공유)
+    정책은 처음 만들 때만 적용됩니다.
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = ResilientClient(name, ResiliencePolicy(**policy))
+    return client
+
+
+def resilience_stats() -> Dict[str, Dict[str, object]]:
+    with _clients_lock:
+        clients = dict(_clients)
+    return {name: client.stats() for name, client in clients.items()}
@@ -0,0 +1,90 @@
+"""
+Singleflight: 같은 키의 동시 호출 합치기
+같은 키로 이미 실행 중인 호출이 있으면 새로 실행하지 않고 그 결과를 함께 기다립니다.
+(예: 여러 세션이 동시에 같은 프롬프트로 LLM을 호출하거나 같은 인자로 도구를 호출하는 경우)
+실행이 끝나면 키를 바로 비우므로 결과를 보관하는 캐시와는 다릅니다.
+
+- SingleFlight: 스레드에서 호출하는 동기 함수용
+- AsyncSingleFlight: 이벤트 루프에서 호출하는 코루틴용
+첫 호출(leader)에서 예외가 나면 기다리던 모든 호출에 같은 예외가 전달됩니다.
+합쳐진 호출 수는 stats()의 collapsed로 확인합니다.
+"""
+import asyncio
+import threading
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.counts: Counter = Counter()
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.counts["collapsed"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.counts["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"executions": self.counts["executions"], "collapsed": self.counts["collapsed"], "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        self._calls: Dict[Tuple[int, Hashable], "asyncio.Task[Any]"] = {}
+        self.counts: Counter = Counter()
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        # 태스크는 이벤트 루프에 묶이므로 루프마다 따로 관리합니다.
+        flight_key = (id(asyncio.get_running_loop()), key)
+        task = self._calls.get(flight_key)
+        if task is not None:
+            self.counts["collapsed"] += 1
+        else:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._calls[flight_key] = task
+            self.counts["executions"] += 1
+            task.add_done_callback(lambda _: self._calls.pop(flight_key, None))
+        # 한 호출자가 취소되어도 다른 호출자가 기다리는 실행은 계속되도록 shield로 감쌉니다.
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {"executions": self.counts["executions"], "collapsed": self.counts["collapsed"], "in_flight": len(self._calls)}
@@ -0,0 +1,134 @@
+"""
+SQLite 체크포인터 정리 정책과 재개 실행 테스트 (langgraph-checkpoint-sqlite가 없으면 건너뜁니다)
+실행: python -m pytest common/tests
+"""
+import operator
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Annotated, List, TypedDict
+
+import pytest
+
+pytest.importorskip("langgraph.checkpoint.sqlite")
+from langgraph.graph import END, StateGraph  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.checkpoint import (  # noqa: E402
+    ThreadExistsError,
+    checkpoint_time,
+    invoke_resumable,
+    new_thread_id,
+    open_checkpointer,
+    prune_checkpoints,
+    thread_config,
+)
+
+
+class State(TypedDict):
+    steps: Annotated[List[str], operator.add]
+
+
+def build_graph(checkpointer, calls, fail_second):
+    def first(state):
+        calls.append("first")
+        return {"steps": ["first"]}
+
+    def second(state):
+        calls.append("second")
+        if fail_second:
+            fail_second.pop()
+            raise RuntimeError("일시적인 실패")
+        return {"steps": ["second"]}
+
+    g = StateGraph(State)
+    g.add_node("first", first)
+    g.add_node("second", second)
+    g.set_entry_point("first")
+    g.add_edge("first", "second")
+    g.add_edge("second", END)
+    return g.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture
+def saver(tmp_path):
+    saver = open_checkpointer(tmp_path / "checkpoints.sqlite")
+    yield saver
+    saver.conn.close()
+
+
+def count_rows(saver, thread_id):
+    return saver.conn.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+
+
+def uuid6_at(timestamp: float) -> str:
+    """주어진 시각의 UUID v6 문자열을 만듭니다. (체크포인트 ID와 같은 형식)"""
+    ticks = int((timestamp + 12219292800) * 10_000_000)
+    digits = f"{ticks >> 12:012x}6{ticks & 0xFFF:03x}8{uuid.uuid4().hex[:15]}"
+    return str(uuid.UUID(digits))
+
+
+def test_checkpoint_time_reads_uuid6_timestamp():
+    from langgraph.checkpoint.base.id import uuid6
+
+    assert abs(checkpoint_time(str(uuid6())) - time.time()) < 5
+    assert checkpoint_time(uuid6_at(1_700_000_000)) == pytest.approx(1_700_000_000, abs=1e-6)
+
+
+def test_resume_continues_after_failed_node(saver):
+    calls, fail = [], [True]
+    graph = build_graph(saver, calls, fail)
+    thread_id = new_thread_id("test")
+    with pytest.raises(RuntimeError):
+        invoke_resumable(graph, {"steps": []}, thread_id)
+
+    result = invoke_resumable(graph, {"steps": []}, thread_id, resume=True)
+    assert result["steps"] == ["first", "second"]
+    # 완료된 first 노드는 다시 실행하지 않습니다.
+    assert calls == ["first", "second", "second"]
+
+    # 이미 끝난 thread를 다시 이어서 실행하면 저장된 최종 상태를 그대로 돌려줍니다.
+    assert invoke_resumable(graph, {"steps": []}, thread_id, resume=True)["steps"] == ["first", "second"]
+    assert calls == ["first", "second", "second"]
+
+
+def test_new_run_refuses_existing_thread(saver):
+    calls = []
+    graph = build_graph(saver, calls, [])
+    thread_id = new_thread_id("test")
+    invoke_resumable(graph, {"steps": []}, thread_id)
+    with pytest.raises(ThreadExistsError):
+        invoke_resumable(graph, {"steps": []}, thread_id)
+    # 새 thread ID는 실행마다 다르므로 이전 상태 위에 쌓이지 않습니다.
+    assert new_thread_id("test") != thread_id
+    assert invoke_resumable(graph, {"steps": []}, new_thread_id("test"))["steps"] == ["first", "second"]
+
+
+def test_prune_keeps_last_checkpoints_per_thread(saver):
+    graph = build_graph(saver, [], [])
+    for thread_id in ("a", "b"):
+        graph.invoke({"steps": []}, thread_config(thread_id))
+    assert count_rows(saver, "a") > 2
+
+    deleted = prune_checkpoints(saver, keep_last=2)
+    assert count_rows(saver, "a") == count_rows(saver, "b") == 2
+    assert deleted["checkpoints"] > 0
+    # 남은 마지막 체크포인트로 최종 상태를 그대로 읽을 수 있습니다.
+    assert graph.get_state(thread_config("a")).values["steps"] == ["first", "second"]
+
+
+def test_prune_drops_threads_older_than_max_age(saver):
+    graph = build_graph(saver, [], [])
+    graph.invoke({"steps": []}, thread_config("fresh"))
+    graph.invoke({"steps": []}, thread_config("stale"))
+    # 체크포인트 ID에 생성 시각이 들어 있으므로, 오래된 thread는 하루 전 ID로 바꿔서 흉내 냅니다.
+    prune_checkpoints(saver, keep_last=1)
+    saver.conn.execute(
+        "UPDATE checkpoints SET checkpoint_id = ? WHERE thread_id = 'stale'", (uuid6_at(time.time() - 86400),)
+    )
+
+    deleted = prune_checkpoints(saver, keep_last=None, max_age=3600)
+    assert deleted["threads"] == 1
+    assert count_rows(saver, "stale") == 0
+    assert count_rows(saver, "fresh") == 1
@@ -0,0 +1,95 @@
+"""
+SQLite LLM 응답 캐시 테스트 (langchain-core가 없으면 건너뜁니다)
+실행: python -m pytest common/tests
+"""
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.embeddings import Embeddings  # noqa: E402
+from langchain_core.load import dumps  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.llm_cache import SQLiteLLMCache  # noqa: E402
+
+LLM = "model=test temperature=0"
+
+
+class KeywordEmbeddings(Embeddings):
+    """정해 둔 단어가 들어 있는지로 만든 벡터입니다. (numpy 없이 유사도 단계를 확인하기 위함)"""
+
+    WORDS = ("weather", "seoul", "tokyo", "refund")
+
+    def embed_query(self, text: str) -> List[float]:
+        text = text.lower()
+        return [float(word in text) for word in self.WORDS]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+def prompt(text: str, **kwargs) -> str:
+    return dumps([HumanMessage(content=text, **kwargs)])
+
+
+def answer(text: str):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+def test_exact_hit_ignores_message_ids_and_whitespace(tmp_path):
+    cache = SQLiteLLMCache(tmp_path / "cache.sqlite")
+    cache.update(prompt("hello  world", id="first"), LLM, answer("hi"))
+
+    hit = cache.lookup(prompt("hello world", id="second"), LLM)
+    assert hit[0].message.content == "hi"
+    assert hit[0].message.response_metadata["cache_hit"] is True
+    # 모델/파라미터가 다르면 다른 항목입니다.
+    assert cache.lookup(prompt("hello world"), "model=other") is None
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = SQLiteLLMCache(tmp_path / "cache.sqlite", max_entries=2)
+    cache.update(prompt("a"), LLM, answer("a"))
+    time.sleep(0.01)
+    cache.update(prompt("b"), LLM, answer("b"))
+    time.sleep(0.01)
+    assert cache.lookup(prompt("a"), LLM) is not None
+    time.sleep(0.01)
+    cache.update(prompt("c"), LLM, answer("c"))
+
+    assert cache.lookup(prompt("b"), LLM) is None
+    assert cache.lookup(prompt("a"), LLM) is not None
+    assert cache.stats()["size"] == 2
+
+
+def test_expired_entries_are_ignored(tmp_path):
+    cache = SQLiteLLMCache(tmp_path / "cache.sqlite", ttl=0.05)
+    cache.update(prompt("a"), LLM, answer("a"))
+    time.sleep(0.06)
+    assert cache.lookup(prompt("a"), LLM) is None
+
+
+def test_semantic_hit_and_pending_embeddings(tmp_path):
+    cache = SQLiteLLMCache(tmp_path / "cache.sqlite", embeddings=KeywordEmbeddings(), similarity_threshold=0.99, max_pending=2)
+    assert cache.lookup(prompt("Weather in Seoul?"), LLM) is None
+    assert cache.stats()["pending_embeddings"] == 1
+    cache.update(prompt("Weather in Seoul?"), LLM, answer("sunny"))
+    assert cache.stats()["pending_embeddings"] == 0
+
+    assert cache.lookup(prompt("what's the weather like in seoul"), LLM)[0].message.content == "sunny"
+    assert cache.lookup(prompt("weather in tokyo"), LLM) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+    # 실패한 호출의 임베딩은 지우고, 그 밖에 남는 항목도 max_pending개를 넘지 않습니다.
+    cache.discard_pending(prompt("weather in tokyo"), LLM)
+    assert cache.stats()["pending_embeddings"] == 0
+    for text in ("refund one", "refund two", "refund three"):
+        cache.lookup(prompt(text), "model=other")
+    assert cache.stats()["pending_embeddings"] == 2
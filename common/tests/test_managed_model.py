@@ -0,0 +1,56 @@
+"""
+관리형 채팅 모델 테스트 (langchain-core가 없으면 건너뜁니다)
+실행: python -m pytest common/tests
+"""
+import sys
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.caches import InMemoryCache  # noqa: E402
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.managed_model import ManagedChatModel  # noqa: E402
+from common.usage import request_scope  # noqa: E402
+
+
+class CountingChatModel(BaseChatModel):
+    """받은 메시지 수를 그대로 답하는 모델입니다."""
+
+    calls: List[int] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls.append(len(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"{len(messages)} messages"))])
+
+
+def conversation() -> List[BaseMessage]:
+    return [HumanMessage(content=f"질문 {i} " + "긴 내용 " * 50) for i in range(6)]
+
+
+def test_truncated_prompt_is_not_cached_under_the_full_prompt_key():
+    inner = CountingChatModel(calls=[], cache=False)
+    model = ManagedChatModel(inner=inner, coalesce=False, cache=InMemoryCache())
+
+    with request_scope(budget=600, mode="truncate"):
+        truncated = model.invoke(conversation())
+    full = model.invoke(conversation())
+
+    assert inner.calls[0] < 6
+    assert truncated.content == f"{inner.calls[0]} messages"
+    # 예산 없이 보낸 같은 대화는 잘린 답을 재사용하지 않고 전체 대화로 다시 호출합니다.
+    assert inner.calls[1:] == [6]
+    assert full.content == "6 messages"
+    # 같은 예산으로 다시 보내면 잘라낸 프롬프트의 키로 캐시에서 바로 돌려받습니다.
+    with request_scope(budget=600, mode="truncate"):
+        assert model.invoke(conversation()).content == truncated.content
+    assert len(inner.calls) == 2
@@ -0,0 +1,68 @@
+"""
+로컬 수학 엔진 테스트 (langchain-core가 없으면 건너뜁니다. SymPy가 필요한 경우는 따로 건너뜀)
+실행: python -m pytest common/tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# common.tools 패키지가 레지스트리(langchain-core)를 함께 불러옵니다.
+pytest.importorskip("langchain_core")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.tools.math_engine import math_engine_stats, normalize_query, solve_locally  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("solve 2x + 3 = 7", "x = 2"),
+        ("What is 2^10?", "1024"),
+        ("calculate 1/3 + 1/6", "1/2 (≈ 0.5)"),
+        ("expand (x + 1)^2", "x**2 + 2*x + 1"),
+        ("x^2 - 5x + 6 = 0", "x = 2, x = 3"),
+        ("x^2 = 2", "x = -sqrt(2), x = sqrt(2)"),
+        ("x^2 + 1 = 0", "x = -I, x = I"),
+        ("x + 1 = x + 1", "모든 값이 해입니다."),
+        ("x + 1 = x", "해가 없습니다."),
+    ],
+)
+def test_builtin_solver(query, expected):
+    answer = solve_locally(query)
+    assert answer is not None and answer.engine == "builtin"
+    assert answer.text == expected
+
+
+@pytest.mark.parametrize("query", ["what is e", "what is a", "What is x?", "solve (y)"])
+def test_bare_variable_is_forwarded(query):
+    before = math_engine_stats()["unhandled"]
+    assert solve_locally(query) is None
+    assert math_engine_stats()["unhandled"] == before + 1
+
+
+@pytest.mark.parametrize("query", ["", "who won the 2018 world cup", "population of France", "__import__('os')"])
+def test_unsupported_queries_are_forwarded(query):
+    assert solve_locally(query) is None
+
+
+def test_normalize_query_handles_prefixes_and_implicit_multiplication():
+    assert normalize_query("solve 2x + 3 = 7?") == "2*x + 3 = 7"
+    assert normalize_query("계산 (x + 1)(x - 1)") == "(x + 1)*(x - 1)"
+    assert normalize_query("compute 1e3 + 2") == "1e3 + 2"
+
+
+def test_sympy_handles_functions_and_higher_degree():
+    pytest.importorskip("sympy")
+    assert solve_locally("what is pi").text.startswith("pi (≈ 3.14159")
+    answer = solve_locally("x^3 - 6x^2 + 11x - 6 = 0")
+    assert answer.engine == "sympy"
+    assert answer.text == "x = 1, x = 2, x = 3"
+
+
+def test_sympy_rejects_power_towers():
+    pytest.importorskip("sympy")
+    # 내장 풀이기가 지수 한도로 거절한 식을 SymPy가 끝까지 계산하지 않아야 합니다.
+    for query in ("9^9^9", "2^(10^6)", "x^(9^9) = 1", "2^2000000"):
+        assert solve_locally(query) is None
+    assert solve_locally("2^x = 8").text == "x = 3"
@@ -0,0 +1,112 @@
+"""
+클라이언트 측 LLM 요청 제한 테스트
+실행: python -m pytest common/tests
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.rate_limit import RateLimiter, TokenBucket, get_rate_limiter, parse_duration  # noqa: E402
+
+
+class Throttled(Exception):
+    status_code = 429
+
+    def __init__(self):
+        super().__init__("429")
+        self.headers = {"retry-after": "0"}
+
+
+def no_usage(response):
+    return {}, None
+
+
+def flaky(failures: int):
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if len(attempts) <= failures:
+            raise Throttled()
+        return "ok"
+
+    return fn, attempts
+
+
+def test_parse_duration_formats():
+    assert parse_duration("7.66s") == pytest.approx(7.66)
+    assert parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_duration("120ms") == pytest.approx(0.12)
+    assert parse_duration("3") == 3.0
+    assert parse_duration("soon") is None
+
+
+def test_token_bucket_reserve_waits_for_refill_and_sync_only_lowers():
+    bucket = TokenBucket(60, period=60.0)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+    bucket = TokenBucket(100)
+    bucket.sync(10)
+    assert bucket.tokens == pytest.approx(10, abs=0.1)
+    bucket.sync(50)
+    assert bucket.tokens == pytest.approx(10, abs=0.1)
+
+
+def test_throttled_retries_reserve_the_buckets_once():
+    limiter = RateLimiter("test", rpm=10, tpm=1000, max_retries=5)
+    fn, attempts = flaky(failures=3)
+
+    assert limiter.call(fn, 100, usage=no_usage) == "ok"
+    assert len(attempts) == 4
+    assert limiter.requests.tokens == pytest.approx(9, abs=0.1)
+    assert limiter.tokens.tokens == pytest.approx(900, abs=1)
+    assert limiter.stats()["retries"] == 3
+
+
+def test_async_throttled_retries_reserve_the_buckets_once():
+    limiter = RateLimiter("test", rpm=10, tpm=1000, max_retries=5)
+    fn, attempts = flaky(failures=2)
+
+    async def afn():
+        return fn()
+
+    assert asyncio.run(limiter.acall(afn, 100, usage=no_usage)) == "ok"
+    assert len(attempts) == 3
+    assert limiter.requests.tokens == pytest.approx(9, abs=0.1)
+    assert limiter.tokens.tokens == pytest.approx(900, abs=1)
+
+
+def test_gives_up_after_max_retries_and_halves_concurrency():
+    limiter = RateLimiter("test", initial_concurrency=8, max_retries=1)
+    fn, attempts = flaky(failures=5)
+
+    with pytest.raises(Throttled):
+        limiter.call(fn, 10, usage=no_usage)
+    assert len(attempts) == 2
+    # cooldown 안에 연달아 받은 429는 한 번만 반영합니다.
+    assert limiter.concurrency.limit == 4
+
+
+def test_exhausted_headers_block_until_reset():
+    limiter = RateLimiter("test", rpm=30, tpm=None)
+    limiter.sync_headers({"X-RateLimit-Remaining-Requests": "0", "X-RateLimit-Reset-Requests": "2s"})
+    assert limiter.requests.tokens == 0
+    assert limiter._blocked_for() == pytest.approx(2.0, abs=0.1)
+
+
+def test_default_limits_are_keyed_by_provider_and_model(monkeypatch):
+    monkeypatch.delenv("LLM_RPM", raising=False)
+    monkeypatch.delenv("LLM_TPM", raising=False)
+    monkeypatch.delenv("LLM_RATE_LIMIT", raising=False)
+
+    groq = get_rate_limiter("groq:llama-3.3-70b-versatile")
+    assert (groq.requests.capacity, groq.tokens.capacity) == (30, 12000)
+    unknown = get_rate_limiter("test:unlisted-model")
+    assert unknown.requests is None and unknown.tokens is None
+
+    monkeypatch.setenv("LLM_RPM", "5")
+    assert get_rate_limiter("test:configured-model").requests.capacity == 5
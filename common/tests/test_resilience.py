@@ -0,0 +1,137 @@
+"""
+HTTP 도구 복원력 계층 테스트 (requests가 없으면 건너뜁니다)
+실행: python -m pytest common/tests
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.resilience import CircuitBreaker, CircuitOpenError, ResilientClient, ResiliencePolicy  # noqa: E402
+
+
+def make_response(status: int, headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return response
+
+
+class FakeSession:
+    """미리 정한 결과(응답, 예외, 또는 그것을 돌려주는 함수)를 차례로 돌려주는 세션입니다."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.calls.append((method, url))
+            outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if callable(outcome):
+            outcome = outcome()
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def client(session, **policy) -> ResilientClient:
+    policy.setdefault("backoff_base", 0.0)
+    return ResilientClient("test", ResiliencePolicy(**policy), session=session)
+
+
+def test_breaker_opens_and_lets_one_half_open_probe_through():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # 시험 요청
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # 시험 요청이 끝나기 전에는 다른 요청을 막습니다.
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_retries_idempotent_get_on_retryable_status():
+    session = FakeSession(make_response(503), make_response(429, {"Retry-After": "0"}), make_response(200))
+    http = client(session, retries=2)
+    assert http.get("http://upstream/").status_code == 200
+    assert len(session.calls) == 3
+    assert http.stats()["retries"] == 2
+    assert http.breaker.failures == 0
+
+
+def test_post_is_not_retried():
+    session = FakeSession(requests.exceptions.ConnectionError("down"), make_response(200))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client(session, retries=2).post("http://upstream/")
+    assert len(session.calls) == 1
+
+
+def test_probe_that_fails_with_a_non_retryable_error_does_not_stick():
+    session = FakeSession(requests.exceptions.ConnectionError("down"))
+    http = client(session, retries=0, failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        http.get("http://upstream/")
+
+    time.sleep(0.06)
+    session.outcomes = [requests.exceptions.InvalidURL("bad"), make_response(200)]
+    with pytest.raises(requests.exceptions.InvalidURL):
+        http.get("http://upstream/")
+    # 실패한 시험 요청은 회로를 다시 열고, reset_timeout 뒤 다음 요청이 다시 시험합니다.
+    assert http.breaker.state == "open"
+    time.sleep(0.06)
+    assert http.get("http://upstream/").status_code == 200
+    assert http.breaker.state == "closed"
+
+
+def test_interrupted_probe_is_released():
+    session = FakeSession(requests.exceptions.ConnectionError("down"))
+    http = client(session, retries=0, failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        http.get("http://upstream/")
+
+    time.sleep(0.06)
+    session.outcomes = [KeyboardInterrupt(), make_response(200)]
+    with pytest.raises(KeyboardInterrupt):
+        http.get("http://upstream/")
+    assert http.get("http://upstream/").status_code == 200
+
+
+def test_slow_get_is_hedged_after_enough_samples():
+    def slow():
+        time.sleep(0.5)
+        return make_response(200, {"X-Which": "primary"})
+
+    session = FakeSession(make_response(200))
+    http = client(session, hedge=True, min_samples=3, hedge_min_delay=0.01)
+    for _ in range(3):
+        http.get("http://upstream/")
+
+    session.outcomes = [slow, make_response(200, {"X-Which": "hedge"})]
+    started = time.monotonic()
+    response = http.get("http://upstream/")
+    assert response.headers["X-Which"] == "hedge"
+    assert time.monotonic() - started < 0.4
+    assert http.stats()["hedge_wins"] == 1
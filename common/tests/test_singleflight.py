@@ -0,0 +1,100 @@
+"""
+동시 호출 합치기(singleflight) 테스트
+실행: python -m pytest common/tests
+"""
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.singleflight import AsyncSingleFlight, SingleFlight  # noqa: E402
+
+
+def run_concurrently(flight: SingleFlight, fn, callers: int = 8):
+    started = threading.Barrier(callers)
+
+    def call(_):
+        started.wait()
+        try:
+            return flight.do("key", fn)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(callers) as pool:
+        return list(pool.map(call, range(callers)))
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    assert run_concurrently(flight, fn) == ["value"] * 8
+    assert len(calls) == 1
+    assert flight.stats() == {"executions": 1, "collapsed": 7, "in_flight": 0}
+
+
+def test_leader_exception_fans_out_and_is_not_kept():
+    flight = SingleFlight()
+    error = ValueError("boom")
+
+    def fail():
+        time.sleep(0.1)
+        raise error
+
+    assert all(result is error for result in run_concurrently(flight, fail))
+    # 실패한 실행은 남지 않으므로 다음 호출은 새로 실행합니다.
+    assert flight.do("key", lambda: "retry") == "retry"
+
+
+def test_async_calls_share_one_execution_and_survive_a_cancelled_caller():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        others = [asyncio.ensure_future(flight.do("key", fn)) for _ in range(3)]
+        await asyncio.sleep(0)
+        first.cancel()
+        return await asyncio.gather(*others)
+
+    assert asyncio.run(main()) == ["value"] * 3
+    assert len(calls) == 1
+    assert flight.stats()["collapsed"] == 3
+
+
+def test_async_leader_exception_fans_out():
+    flight = AsyncSingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(4)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats() == {"executions": 1, "collapsed": 3, "in_flight": 0}
+
+
+def test_different_keys_do_not_collapse():
+    flight = SingleFlight()
+    assert [flight.do(key, lambda key=key: key * 2) for key in (1, 2)] == [2, 4]
+    with pytest.raises(KeyError):
+        flight.do("missing", lambda: {}["missing"])
@@ -0,0 +1,122 @@
+"""
+도구 결과 메모이제이션 테스트 (langchain-core가 없으면 건너뜁니다)
+실행: python -m pytest common/tests
+"""
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.messages import ToolMessage  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.tool_cache import ToolExecutor, cache_policy  # noqa: E402
+
+
+def counting_tool(policy=None, delay: float = 0.0):
+    calls = []
+
+    @tool
+    def lookup(query: str) -> str:
+        """검색합니다."""
+        calls.append(query)
+        time.sleep(delay)
+        return f"result for {query} #{len(calls)}"
+
+    return (policy(lookup) if policy else lookup), calls
+
+
+def test_pure_tool_is_cached_by_normalized_args():
+    lookup, calls = counting_tool(cache_policy(pure=True))
+    executor = ToolExecutor()
+
+    first = executor.invoke(lookup, {"query": "a"})
+    assert executor.invoke(lookup, {"query": "a"}) == first
+    executor.invoke(lookup, {"query": "b"})
+    assert calls == ["a", "b"]
+    assert executor.stats()["memory_hits"] == 1
+
+
+def test_tool_call_input_returns_message_with_the_current_call_id():
+    lookup, calls = counting_tool(cache_policy(pure=True))
+    executor = ToolExecutor()
+
+    first = executor.invoke(lookup, {"name": "lookup", "args": {"query": "a"}, "id": "call-1", "type": "tool_call"})
+    second = executor.invoke(lookup, {"name": "lookup", "args": {"query": "a"}, "id": "call-2", "type": "tool_call"})
+    assert isinstance(second, ToolMessage)
+    assert (first.tool_call_id, second.tool_call_id) == ("call-1", "call-2")
+    assert second.content == first.content
+    assert len(calls) == 1
+
+
+def test_ttl_entries_expire():
+    lookup, calls = counting_tool(cache_policy(ttl=0.05))
+    executor = ToolExecutor()
+    executor.invoke(lookup, {"query": "a"})
+    time.sleep(0.06)
+    executor.invoke(lookup, {"query": "a"})
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("policy", [None, cache_policy(side_effects=True), cache_policy()])
+def test_side_effects_undeclared_and_volatile_tools_are_not_cached(policy):
+    lookup, calls = counting_tool(policy)
+    executor = ToolExecutor()
+    executor.invoke(lookup, {"query": "a"})
+    executor.invoke(lookup, {"query": "a"})
+    assert len(calls) == 2
+    assert executor.stats()["uncached"] == 2
+
+
+def test_side_effect_policy_cannot_be_combined_with_caching():
+    with pytest.raises(ValueError):
+        cache_policy(pure=True, side_effects=True)
+
+
+def test_concurrent_identical_calls_are_coalesced_without_caching():
+    lookup, calls = counting_tool(cache_policy(), delay=0.1)
+    executor = ToolExecutor()
+    barrier = threading.Barrier(8)
+
+    def call(_):
+        barrier.wait()
+        return executor.invoke(lookup, {"query": "a"})
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(call, range(8)))
+    assert len(set(results)) == 1
+    assert len(calls) == 1
+    assert executor.stats()["collapsed"] == 7
+
+
+def test_failed_calls_are_not_cached():
+    attempts = []
+
+    @cache_policy(pure=True)
+    @tool
+    def flaky(query: str) -> str:
+        """처음 한 번은 실패합니다."""
+        attempts.append(query)
+        if len(attempts) == 1:
+            raise ValueError("temporary")
+        return "ok"
+
+    executor = ToolExecutor()
+    with pytest.raises(ValueError):
+        executor.invoke(flaky, {"query": "a"})
+    assert executor.invoke(flaky, {"query": "a"}) == "ok"
+
+
+def test_disk_tier_survives_a_new_executor(tmp_path):
+    lookup, calls = counting_tool(cache_policy(pure=True))
+    ToolExecutor(disk_path=tmp_path / "tools.sqlite").invoke(lookup, {"query": "a"})
+
+    executor = ToolExecutor(disk_path=tmp_path / "tools.sqlite")
+    executor.invoke(lookup, {"query": "a"})
+    assert len(calls) == 1
+    assert executor.stats()["disk_hits"] == 1
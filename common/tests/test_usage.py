@@ -0,0 +1,80 @@
+"""
+토큰 사용량 집계와 요청별 예산 테스트 (langchain-core가 없으면 건너뜁니다)
+실행: python -m pytest common/tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.usage import (  # noqa: E402
+    TokenBudgetExceeded,
+    UsageTracker,
+    attribution,
+    enforce_budget,
+    estimate_message_tokens,
+    request_scope,
+    truncate_messages,
+)
+
+LONG = "긴 내용 " * 100
+
+
+def tool_round(call_id: str):
+    call = AIMessage(content="", tool_calls=[{"name": "lookup", "args": {"q": LONG}, "id": call_id}])
+    return [call, ToolMessage(content=LONG, tool_call_id=call_id)]
+
+
+def test_truncate_keeps_system_prompt_and_tool_call_pairs_together():
+    messages = [SystemMessage(content="system"), HumanMessage(content=LONG), *tool_round("a"), *tool_round("b"), HumanMessage(content="마지막 질문")]
+    budget = estimate_message_tokens(messages[:1] + messages[-3:])
+
+    kept = truncate_messages(messages, budget)
+
+    assert len(kept) < len(messages)
+    assert kept[0].type == "system"
+    assert kept[-1].content == "마지막 질문"
+    # 도구 호출 AIMessage 없이 ToolMessage만 남는 일은 없습니다.
+    for i, message in enumerate(kept):
+        if isinstance(message, ToolMessage):
+            assert kept[i - 1].tool_calls[0]["id"] == message.tool_call_id
+    assert estimate_message_tokens(kept) <= budget
+
+
+def test_truncate_always_keeps_the_last_unit():
+    messages = [HumanMessage(content=LONG), HumanMessage(content=LONG)]
+    assert truncate_messages(messages, 1) == messages[-1:]
+
+
+def test_enforce_budget_reserves_completion_tokens():
+    messages = [HumanMessage(content="짧은 질문")]
+    prompt = estimate_message_tokens(messages)
+    with request_scope(budget=prompt + 100, mode="abort"):
+        assert enforce_budget(messages, max_tokens=100) == messages
+        with pytest.raises(TokenBudgetExceeded):
+            enforce_budget(messages, max_tokens=101)
+
+
+def test_enforce_budget_without_scope_is_a_no_op():
+    messages = [HumanMessage(content=LONG)] * 20
+    assert enforce_budget(messages) is messages
+
+
+def test_usage_is_attributed_to_session_node_and_model():
+    tracker = UsageTracker()
+    response = AIMessage(content="ok", usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15})
+
+    with request_scope(session="thread-1", budget=1000) as budget, attribution(node="classify"):
+        tracker.record_llm("llama-3.3-70b-versatile", [HumanMessage(content="hi")], response)
+        tracker.record_llm("llama-3.3-70b-versatile", [HumanMessage(content="hi")], AIMessage(content="estimated"))
+
+    summary = tracker.summary()
+    assert summary["by_session"]["thread-1"]["calls"] == 2
+    assert summary["by_node"]["classify"]["prompt_tokens"] == 10 + estimate_message_tokens([HumanMessage(content="hi")])
+    assert summary["total"]["estimated_calls"] == 1
+    assert budget.used == summary["total"]["total_tokens"]
+    assert summary["by_model"]["llama-3.3-70b-versatile"]["cost_usd"] > 0
@@ -0,0 +1,273 @@
+"""
+도구 결과 메모이제이션
+도구마다 캐시 정책을 선언하고, 공용 실행기(ToolExecutor)가 그 정책에 따라 결과를 재사용합니다.
+
+    @cache_policy(pure=True)              # 같은 인자면 항상 같은 결과 (계산) → 만료 없이 캐시
+    @cache_policy(ttl=600)                # 천천히 바뀌는 조회 → 10분 동안 캐시
+    @cache_policy()                       # 부작용은 없지만 자주 바뀌는 조회 (주가 등) → 캐시하지 않음
+    @cache_policy(side_effects=True)      # 주문 취소, 메시지 전송 등 → 절대 캐시하지 않음
+
+정책을 선언하지 않은 도구도 캐시하지 않습니다. (부작용이 있는 도구가 실수로 캐시되는 일을 막기 위함)
+캐시 키는 도구 이름 + 정규화한 인자(JSON, 키 정렬)이며, 메모리(LRU)와 선택적인 SQLite 디스크 계층에 저장합니다.
+예외가 난 호출은 캐시하지 않습니다.
+
+정책을 선언했고 부작용이 없는 도구는 같은 인자로 동시에 들어온 호출을 한 번만 실행합니다. (common/singleflight.py)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import BaseTool
+
+from common.singleflight import AsyncSingleFlight, SingleFlight
+from common.tracing import get_tracer
+from common.usage import attribution, usage_tracker
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_TOOL_CACHE_DB = REPO_ROOT / ".cache" / "tool_cache.sqlite"
+
+T = TypeVar("T", bound=BaseTool)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    pure: bool = False
+    ttl: Optional[float] = None
+    side_effects: bool = False
+
+    @property
+    def cacheable(self) -> bool:
+        return not self.side_effects and (self.pure or self.ttl is not None)
+
+
+def cache_policy(pure: bool = False, ttl: Optional[float] = None, side_effects: bool = False) -> Callable[[T], T]:
+    """도구의 metadata["cache"]에 캐시 정책을 기록하는 데코레이터입니다. (@tool 위에 붙입니다)"""
+    if side_effects and (pure or ttl is not None):
+        raise ValueError("부작용이 있는 도구에는 pure/ttl을 함께 지정할 수 없습니다.")
+    policy = CachePolicy(pure=pure, ttl=ttl, side_effects=side_effects)
+
+    def apply(tool: T) -> T:
+        tool.metadata = {**(tool.metadata or {}), "cache": asdict(policy)}
+        return tool
+
+    return apply
+
+
+def get_cache_policy(tool: BaseTool) -> CachePolicy:
+    return CachePolicy(**(tool.metadata or {}).get("cache", {}))
+
+
+def is_coalescable(tool: BaseTool) -> bool:
+    """정책을 선언했고 부작용이 없는 도구만 동시 호출을 합칠 수 있습니다."""
+    policy = (tool.metadata or {}).get("cache")
+    return policy is not None and not policy.get("side_effects", False)
+
+
+def canonical_args(args: Any) -> str:
+    return json.dumps(args, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _split_tool_call(tool_input: Any) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """ToolCall({"name", "args", "id", "type": "tool_call"})이면 (인자, ToolCall)로 나눕니다."""
+    if isinstance(tool_input, dict) and tool_input.get("type") == "tool_call":
+        return tool_input.get("args", {}), tool_input
+    return tool_input, None
+
+
+class ToolExecutor:
+    def __init__(self, max_entries: int = 1024, disk_path: Optional[Union[str, Path]] = None):
+        self.max_entries = max_entries
+        self.counts: Counter = Counter()
+        self.flights = SingleFlight()
+        self.async_flights = AsyncSingleFlight()
+        self._memory: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if disk_path is not None:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(disk_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tool_cache "
+                "(key TEXT PRIMARY KEY, tool TEXT NOT NULL, expires_at REAL, value TEXT NOT NULL)"
+            )
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    # ─── Execution ──────────────────────────────────────────────────────────
+    def invoke(self, tool: BaseTool, tool_input: Any) -> Any:
+        with get_tracer().span(f"tool:{tool.name}", kind="tool", tool=tool.name) as span, attribution(tool=tool.name):
+            result = self._invoke(tool, tool_input, span)
+        # 도구 결과는 다음 LLM 호출의 프롬프트가 되므로 출력 크기를 도구별로 집계합니다.
+        usage_tracker.record_tool_output(tool.name, self._content(result))
+        return result
+
+    async def ainvoke(self, tool: BaseTool, tool_input: Any) -> Any:
+        with get_tracer().span(f"tool:{tool.name}", kind="tool", tool=tool.name) as span, attribution(tool=tool.name):
+            result = await self._ainvoke(tool, tool_input, span)
+        usage_tracker.record_tool_output(tool.name, self._content(result))
+        return result
+
+    def _invoke(self, tool: BaseTool, tool_input: Any, span: Any) -> Any:
+        args, tool_call = _split_tool_call(tool_input)
+        if not is_coalescable(tool):
+            self._count("uncached")
+            return tool.invoke(tool_input)
+
+        policy = get_cache_policy(tool)
+        key = self._key(tool, args)
+        if policy.cacheable:
+            found, value = self._get(key)
+            if span is not None:
+                span.set(cache_hit=found)
+            if found:
+                return self._wrap(tool, tool_call, value)
+        else:
+            self._count("uncached")
+        value = self.flights.do(key, self._load, tool, args, key, policy)
+        return self._wrap(tool, tool_call, value)
+
+    async def _ainvoke(self, tool: BaseTool, tool_input: Any, span: Any) -> Any:
+        args, tool_call = _split_tool_call(tool_input)
+        if not is_coalescable(tool):
+            self._count("uncached")
+            return await tool.ainvoke(tool_input)
+
+        policy = get_cache_policy(tool)
+        key = self._key(tool, args)
+        if policy.cacheable:
+            found, value = self._get(key)
+            if span is not None:
+                span.set(cache_hit=found)
+            if found:
+                return self._wrap(tool, tool_call, value)
+        else:
+            self._count("uncached")
+        value = await self.async_flights.do(key, self._aload, tool, args, key, policy)
+        return self._wrap(tool, tool_call, value)
+
+    def _load(self, tool: BaseTool, args: Any, key: str, policy: CachePolicy) -> Any:
+        value = self._content(tool.invoke(args))
+        if policy.cacheable:
+            self._set(key, tool.name, policy, value)
+        return value
+
+    async def _aload(self, tool: BaseTool, args: Any, key: str, policy: CachePolicy) -> Any:
+        value = self._content(await tool.ainvoke(args))
+        if policy.cacheable:
+            self._set(key, tool.name, policy, value)
+        return value
+
+    @staticmethod
+    def _key(tool: BaseTool, args: Any) -> str:
+        return hashlib.sha256(f"{tool.name}\0{canonical_args(args)}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _content(result: Any) -> Any:
+        return result.content if isinstance(result, ToolMessage) else result
+
+    @staticmethod
+    def _wrap(tool: BaseTool, tool_call: Optional[Dict[str, Any]], value: Any) -> Any:
+        # ToolCall로 호출한 경우에는 tool.invoke와 같이 현재 호출 ID를 가진 ToolMessage를 반환합니다.
+        if tool_call is None:
+            return value
+        content = value if isinstance(value, str) else str(value)
+        return ToolMessage(content=content, tool_call_id=tool_call["id"], name=tool.name)
+
+    # ─── Storage ────────────────────────────────────────────────────────────
+    def _get(self, key: str) -> Tuple[bool, Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.counts["memory_hits"] += 1
+                    return True, value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT expires_at, value FROM tool_cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (key, now),
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[1])
+                    self._remember(key, row[0], value)
+                    self.counts["disk_hits"] += 1
+                    return True, value
+
+            self.counts["misses"] += 1
+            return False, None
+
+    def _set(self, key: str, tool_name: str, policy: CachePolicy, value: Any) -> None:
+        expires_at = time.time() + policy.ttl if policy.ttl is not None else None
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._conn is not None:
+                try:
+                    encoded = json.dumps(value, ensure_ascii=False)
+                except TypeError:
+                    return  # JSON으로 저장할 수 없는 결과는 메모리에만 둡니다.
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tool_cache (key, tool, expires_at, value) VALUES (?, ?, ?, ?)",
+                    (key, tool_name, expires_at, encoded),
+                )
+                self._conn.commit()
+
+    def _remember(self, key: str, expires_at: Optional[float], value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM tool_cache")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counts = dict(self.counts)
+        hits = counts.get("memory_hits", 0) + counts.get("disk_hits", 0)
+        lookups = hits + counts.get("misses", 0)
+        return {
+            **{name: counts.get(name, 0) for name in ("memory_hits", "disk_hits", "misses", "uncached")},
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_size": len(self._memory),
+            "collapsed": self.flights.stats()["collapsed"] + self.async_flights.stats()["collapsed"],
+        }
+
+
+_default_executor: Optional[ToolExecutor] = None
+_default_executor_lock = threading.Lock()
+
+
+def default_executor() -> ToolExecutor:
+    """공용 실행기를 반환합니다. TOOL_CACHE_DB가 설정되어 있으면(또는 "default") 디스크 계층도 사용합니다."""
+    global _default_executor
+    executor = _default_executor
+    if executor is None:
+        # 동시에 처음 호출되어도 캐시가 나뉘지 않도록 실행기는 하나만 만듭니다.
+        with _default_executor_lock:
+            executor = _default_executor
+            if executor is None:
+                disk_path = os.getenv("TOOL_CACHE_DB")
+                if disk_path == "default":
+                    disk_path = str(DEFAULT_TOOL_CACHE_DB)
+                executor = _default_executor = ToolExecutor(disk_path=disk_path or None)
+    return executor
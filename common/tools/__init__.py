@@ -0,0 +1,36 @@
+"""
+공용 도구 패키지
+도구 기준 구현과, 도구를 이름/그룹으로 찾고 스키마/임베딩/바인딩을 한 번만 만드는 레지스트리입니다.
+
+    from common.tools import default_registry
+
+    registry = default_registry()
+    llm_with_tools = registry.bind(llm, ["query_wolfram_alpha", "send_slack_message"])
+    tool = registry.get(tool_call["name"])
+"""
+from functools import lru_cache
+
+from common.tools.registry import ToolEntry, ToolGroup, ToolRegistry
+
+__all__ = ["ToolEntry", "ToolGroup", "ToolRegistry", "default_registry"]
+
+# 스킬 그룹 (계층적 스킬 선택에서 1단계로 고르는 단위)
+DEFAULT_GROUPS = {
+    "Computation": "수학 계산 및 데이터 분석과 관련된 도구입니다.",
+    "Automation": "워크플로우를 자동화하고 다양한 서비스를 통합하는 도구입니다.",
+    "Communication": "커뮤니케이션 및 메시징을 돕는 도구입니다.",
+}
+
+
+@lru_cache(maxsize=None)
+def default_registry() -> ToolRegistry:
+    """기본 도구(Wolfram Alpha, Zapier, Slack)를 등록한 프로세스 공용 레지스트리입니다."""
+    from common.tools.integrations import query_wolfram_alpha, send_slack_message, trigger_zapier_webhook
+
+    registry = ToolRegistry()
+    for name, description in DEFAULT_GROUPS.items():
+        registry.add_group(name, description)
+    registry.register(query_wolfram_alpha, group="Computation")
+    registry.register(trigger_zapier_webhook, group="Automation")
+    registry.register(send_slack_message, group="Communication")
+    return registry
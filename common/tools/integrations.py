@@ -0,0 +1,105 @@
+"""
+외부 서비스 도구 (Wolfram Alpha, Zapier, Slack)
+ch05 스킬 선택 예제들이 함께 사용하는 도구의 기준 구현입니다.
+
+query_wolfram_alpha는 방정식/다항식/산술을 로컬 수학 엔진(common/tools/math_engine.py)으로 먼저 풀고,
+로컬에서 처리하지 못한 질의만 원격 API로 보냅니다. 원격 답에는 시간에 따라 바뀌는 사실 조회(인구, 환율 등)도
+섞여 있으므로, 결과는 공용 실행기(common/tool_cache.py)가 WOLFRAM_CACHE_TTL 동안만 캐시합니다.
+
+HTTP 호출은 common.resilience의 도구별 클라이언트로 보냅니다. (타임아웃, 서킷 브레이커,
+멱등 GET만 재시도/헤지 요청. 웹훅과 메시지 전송은 중복 실행될 수 있으므로 재시도하지 않습니다)
+
+환경 변수
+- WOLFRAM_ALPHA_APP_ID: Wolfram Alpha Short Answers API 앱 ID
+- SLACK_BOT_TOKEN: Slack 봇 토큰 (기본: 자리표시자)
+"""
+import os
+
+import requests
+from langchain_core.tools import tool
+
+from common.resilience import http_client
+from common.tool_cache import cache_policy
+from common.tools.math_engine import solve_locally
+
+
+# 계산 답은 영원히 같지만 사실 조회 답은 바뀔 수 있으므로 만료 없는(pure) 캐시 대신 TTL을 씁니다.
+# (로컬 엔진 답은 다시 계산해도 수 ms 이내)
+WOLFRAM_CACHE_TTL = 24 * 3600.0
+
+
+@cache_policy(ttl=WOLFRAM_CACHE_TTL)
+@tool
+def query_wolfram_alpha(expression: str) -> str:
+    """
+    Wolfram Alpha에 질의를 보내 식을 계산하거나 정보를 조회합니다.
+    Args: expression (str): 계산하거나 평가할 수식 또는 질의입니다.
+    Returns: str: 계산 결과 또는 조회된 정보입니다.
+    """
+    answer = solve_locally(expression)
+    if answer is not None:
+        return answer.text
+    # 자연어 질의는 공백만 정리해서 원문 그대로 보냅니다.
+    return _query_wolfram_remote(" ".join(expression.split()))
+
+
+def _query_wolfram_remote(expression: str) -> str:
+    api_url = "https://api.wolframalpha.com/v1/result"
+    params = {"i": expression, "appid": os.getenv("WOLFRAM_ALPHA_APP_ID")}
+    try:
+        response = http_client("wolfram_alpha", hedge=True).get(api_url, params=params)
+    except requests.exceptions.RequestException as e:
+        raise ValueError(f"Wolfram Alpha 질의에 실패했습니다: {e}")
+    if response.status_code != 200:
+        raise ValueError(f"Wolfram Alpha API 오류: {response.status_code} - {response.text}")
+    return response.text
+
+
+@cache_policy(side_effects=True)
+@tool
+def trigger_zapier_webhook(zap_id: str, payload: dict) -> str:
+    """
+    미리 정의된 Zap을 실행하기 위해 Zapier 웹훅을 트리거합니다.
+    Args:
+    zap_id (str): 트리거할 Zap의 고유 식별자입니다.
+    payload (dict): Zapier 웹훅으로 전송할 데이터입니다.
+    Returns:
+    str: Zap이 성공적으로 트리거되었을 때의 확인 메시지입니다.
+    Raises: ValueError: API 요청이 실패하거나 오류를 반환한 경우 발생합니다.
+    """
+    zapier_webhook_url = f"https://hooks.zapier.com/hooks/catch/{zap_id}/"
+    try:
+        response = http_client("zapier").post(zapier_webhook_url, json=payload)
+    except requests.exceptions.RequestException as e:
+        raise ValueError(f"Zapier 웹훅 '{zap_id}' 트리거에 실패했습니다: {e}")
+    if response.status_code != 200:
+        raise ValueError(f"Zapier API 오류: {response.status_code} - {response.text}")
+    return f"Zapier 웹훅 '{zap_id}'이(가) 성공적으로 트리거되었습니다."
+
+
+@cache_policy(side_effects=True)
+@tool
+def send_slack_message(channel: str, message: str) -> str:
+    """
+    지정한 Slack 채널에 메시지를 보냅니다.
+    Args:
+    channel (str): 메시지를 보낼 Slack 채널 ID 또는 이름입니다.
+    message (str): 전송할 메시지의 내용입니다.
+    Returns:
+    str: Slack 메시지가 성공적으로 전송되었을 때의 확인 메시지입니다.
+    Raises: ValueError: API 요청이 실패하거나 오류를 반환한 경우 발생합니다.
+    """
+    api_url = "https://slack.com/api/chat.postMessage"
+    headers = {
+        "Authorization": f"Bearer {os.getenv('SLACK_BOT_TOKEN', 'YOUR_SLACK_BOT_TOKEN')}",
+        "Content-Type": "application/json",
+    }
+    payload = {"channel": channel, "text": message}
+    try:
+        response = http_client("slack").post(api_url, headers=headers, json=payload)
+        response_data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        raise ValueError(f'Slack 채널 "{channel}"로 메시지 전송에 실패했습니다: {e}')
+    if response.status_code != 200 or not response_data.get("ok"):
+        raise ValueError(f"Slack API 오류: {response_data.get('error', 'Unknown error')}")
+    return f"Slack 채널 '{channel}'에 메시지가 성공적으로 전송되었습니다."
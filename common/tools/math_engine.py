@@ -0,0 +1,353 @@
+"""
+로컬 수학 엔진 (query_wolfram_alpha의 빠른 경로)
+"2x + 3 = 7" 같은 질의를 HTTPS로 보내지 않고 프로세스 안에서 풉니다.
+
+1. 내장 풀이기: 한 변수 다항식을 분수(Fraction)로 정확하게 다룹니다.
+   - 산술 계산 (사칙연산, 정수 거듭제곱, 괄호)
+   - 다항식 전개/정리 ("(x + 1)^2" → "x**2 + 2*x + 1")
+   - 1차/2차 방정식 (무리수/복소수 근은 sqrt(...)와 I로 정확히 표기)
+2. SymPy(설치되어 있을 때만): 3차 이상 방정식, 여러 변수, sin/sqrt/log 같은 함수가 들어간 식
+3. 둘 다 처리하지 못하거나 "what is e"처럼 변수 이름 하나뿐인 질의면 None을 반환하고, 호출한 쪽(query_wolfram_alpha)이 원격 API로 보냅니다.
+
+    answer = solve_locally("solve 2x + 3 = 7")   # MathAnswer(text="x = 2", engine="builtin")
+
+SymPy의 parse_expr는 내부적으로 eval을 쓰므로, 허용한 문자와 함수 이름으로만 이루어진 입력만 넘깁니다.
+"""
+import ast
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple
+
+# 거듭제곱 폭주("9^9^9")를 막기 위한 한도
+MAX_EXPONENT = 1000
+MAX_DEGREE = 64
+
+_PREFIX = re.compile(r"^\s*(solve|simplify|expand|evaluate|calculate|compute|what is|what's|풀어줘|계산)\s*:?\s+", re.IGNORECASE)
+_SUFFIX = re.compile(r"(\s+for\s+[a-z])?\s*[?.]?\s*$", re.IGNORECASE)
+_IMPLICIT_MUL = [
+    (re.compile(r"(\d)\s*(?![eE][+-]?\d)([a-zA-Z(])"), r"\1*\2"),  # 2x, 2(x + 1)
+    (re.compile(r"\)\s*([\w(])"), r")*\1"),  # (x + 1)(x - 1), (x + 1)2
+]
+_ALLOWED_CHARS = re.compile(r"^[0-9a-zA-Z_+\-*/^().,=\s]+$")
+_IDENTIFIER = re.compile(r"[a-zA-Z_]\w*")
+SYMPY_FUNCTIONS = frozenset({
+    "sqrt", "cbrt", "exp", "log", "ln", "sin", "cos", "tan", "asin", "acos", "atan",
+    "sinh", "cosh", "tanh", "abs", "Abs", "factorial", "pi", "E", "I", "oo",
+})
+
+engine_counts: Counter = Counter()
+_counts_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class MathAnswer:
+    text: str
+    engine: str  # "builtin" | "sympy"
+
+
+def normalize_query(query: str) -> str:
+    """질의에서 명령어/물음표를 떼고 기호를 파이썬 표기로 바꿉니다. ("solve 2x + 3 = 7?" → "2*x + 3 = 7")"""
+    text = _SUFFIX.sub("", _PREFIX.sub("", query.strip()))
+    text = text.replace("^", "**").replace("×", "*").replace("÷", "/").replace("−", "-")
+    for pattern, replacement in _IMPLICIT_MUL:
+        text = pattern.sub(replacement, text)
+    return " ".join(text.split())
+
+
+# ─── Polynomial ─────────────────────────────────────────────────────────────
+class _Unsupported(Exception):
+    """내장 풀이기가 다룰 수 없는 입력입니다. (SymPy나 원격 API로 넘김)"""
+
+
+class Poly:
+    """한 변수 다항식입니다. {차수: 계수}로 보관하며 계수가 0인 항은 두지 않습니다."""
+
+    def __init__(self, terms: Optional[Dict[int, Fraction]] = None, var: Optional[str] = None):
+        self.terms = {power: coef for power, coef in (terms or {}).items() if coef != 0}
+        self.var = var if self.terms.keys() - {0} else None
+
+    @classmethod
+    def constant(cls, value: Fraction) -> "Poly":
+        return cls({0: value})
+
+    @property
+    def degree(self) -> int:
+        return max(self.terms, default=0)
+
+    def coef(self, power: int) -> Fraction:
+        return self.terms.get(power, Fraction(0))
+
+    def _merge_var(self, other: "Poly") -> Optional[str]:
+        if self.var and other.var and self.var != other.var:
+            raise _Unsupported("여러 변수")
+        return self.var or other.var
+
+    def __add__(self, other: "Poly") -> "Poly":
+        terms = dict(self.terms)
+        for power, coef in other.terms.items():
+            terms[power] = terms.get(power, Fraction(0)) + coef
+        return Poly(terms, self._merge_var(other))
+
+    def __neg__(self) -> "Poly":
+        return Poly({power: -coef for power, coef in self.terms.items()}, self.var)
+
+    def __sub__(self, other: "Poly") -> "Poly":
+        return self + (-other)
+
+    def __mul__(self, other: "Poly") -> "Poly":
+        var = self._merge_var(other)
+        if self.degree + other.degree > MAX_DEGREE:
+            raise _Unsupported("차수가 너무 큼")
+        terms: Dict[int, Fraction] = {}
+        for p1, c1 in self.terms.items():
+            for p2, c2 in other.terms.items():
+                terms[p1 + p2] = terms.get(p1 + p2, Fraction(0)) + c1 * c2
+        return Poly(terms, var)
+
+    def __truediv__(self, other: "Poly") -> "Poly":
+        if other.var is not None or other.coef(0) == 0:
+            raise _Unsupported("다항식이나 0으로 나누기")
+        return Poly({power: coef / other.coef(0) for power, coef in self.terms.items()}, self.var)
+
+    def __pow__(self, other: "Poly") -> "Poly":
+        exponent = other.coef(0)
+        if other.var is not None or exponent.denominator != 1 or abs(exponent) > MAX_EXPONENT:
+            raise _Unsupported("정수가 아니거나 너무 큰 지수")
+        exponent = int(exponent)
+        if self.var is None:
+            base = self.coef(0)
+            if base == 0 and exponent < 0:
+                raise _Unsupported("0의 음수 거듭제곱")
+            return Poly.constant(base ** exponent)
+        if exponent < 0:
+            raise _Unsupported("다항식의 음수 거듭제곱")
+        result = Poly.constant(Fraction(1))
+        for _ in range(exponent):
+            result = result * self
+        return result
+
+
+_BINARY_OPS = {ast.Add: Poly.__add__, ast.Sub: Poly.__sub__, ast.Mult: Poly.__mul__, ast.Div: Poly.__truediv__, ast.Pow: Poly.__pow__}
+
+
+def _to_poly(node: ast.AST) -> Poly:
+    if isinstance(node, ast.Expression):
+        return _to_poly(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        # 0.1 같은 소수도 repr을 거쳐 정확한 분수로 만듭니다.
+        return Poly.constant(Fraction(repr(node.value)) if isinstance(node.value, float) else Fraction(node.value))
+    if isinstance(node, ast.Name) and len(node.id) == 1:
+        return Poly({1: Fraction(1)}, node.id)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        operand = _to_poly(node.operand)
+        return -operand if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        return _BINARY_OPS[type(node.op)](_to_poly(node.left), _to_poly(node.right))
+    raise _Unsupported(type(node).__name__)
+
+
+def _parse(side: str) -> Poly:
+    try:
+        return _to_poly(ast.parse(side.strip(), mode="eval"))
+    except (SyntaxError, ValueError, RecursionError):
+        raise _Unsupported("구문 오류") from None
+
+
+# ─── Formatting ─────────────────────────────────────────────────────────────
+def format_number(value: Fraction) -> str:
+    return str(value.numerator) if value.denominator == 1 else f"{value.numerator}/{value.denominator}"
+
+
+def _format_term(coef: Fraction, factor: str, first: bool) -> str:
+    """계수와 인수("x**2", "sqrt(2)", "")를 SymPy와 같은 모양의 항으로 만듭니다. ("-3*x/2", "+ x")"""
+    sign = "-" if coef < 0 else "+"
+    coef = abs(coef)
+    if not factor:
+        body = format_number(coef)
+    else:
+        body = factor if coef.numerator == 1 else f"{coef.numerator}*{factor}"
+        if coef.denominator != 1:
+            body += f"/{coef.denominator}"
+    if first:
+        return body if sign == "+" else f"-{body}"
+    return f"{sign} {body}"
+
+
+def format_poly(poly: Poly) -> str:
+    if not poly.terms:
+        return "0"
+    parts = []
+    for power in sorted(poly.terms, reverse=True):
+        factor = "" if power == 0 else poly.var if power == 1 else f"{poly.var}**{power}"
+        parts.append(_format_term(poly.terms[power], factor, first=not parts))
+    return " ".join(parts)
+
+
+def _square_free(n: int) -> Tuple[int, int]:
+    """n = k^2 * m (m은 제곱 인수가 없음)인 (k, m)입니다."""
+    k, m, d = 1, n, 2
+    while d * d <= m:
+        while m % (d * d) == 0:
+            m //= d * d
+            k *= d
+        d += 1
+    return k, m
+
+
+def _solve_quadratic(a: Fraction, b: Fraction, c: Fraction) -> List[str]:
+    center = -b / (2 * a)
+    disc = b * b - 4 * a * c
+    if disc == 0:
+        return [format_number(center)]
+    # sqrt(disc) / 2|a| = sqrt(p*q) / (q * 2|a|) = k * sqrt(m) / (q * 2|a|)
+    radicand = abs(disc.numerator * disc.denominator)
+    if radicand > 10 ** 12:
+        raise _Unsupported("근호 안의 수가 너무 큼")
+    k, m = _square_free(radicand)
+    offset = Fraction(k, disc.denominator) / (2 * abs(a))
+    if disc > 0 and m == 1:
+        return [format_number(center - offset), format_number(center + offset)]
+
+    factor = ("" if m == 1 else f"sqrt({m})") if disc > 0 else ("I" if m == 1 else f"sqrt({m})*I")
+    roots = []
+    for sign in (-1, 1):
+        head = format_number(center) if center != 0 else ""
+        roots.append(head + (" " if head else "") + _format_term(sign * offset, factor, first=not head))
+    return roots
+
+
+# ─── Engines ────────────────────────────────────────────────────────────────
+def _solve_builtin(text: str) -> str:
+    sides = text.split("=")
+    if len(sides) > 2:
+        raise _Unsupported("등호가 여러 개")
+    if len(sides) == 1:
+        poly = _parse(text)
+        if poly.var is not None:
+            return format_poly(poly)
+        value = poly.coef(0)
+        return format_number(value) if value.denominator == 1 else f"{format_number(value)} (≈ {float(value):.10g})"
+
+    poly = _parse(sides[0]) - _parse(sides[1])
+    if poly.var is None:
+        return "모든 값이 해입니다." if poly.coef(0) == 0 else "해가 없습니다."
+    if poly.degree == 1:
+        roots = [format_number(-poly.coef(0) / poly.coef(1))]
+    elif poly.degree == 2:
+        roots = _solve_quadratic(poly.coef(2), poly.coef(1), poly.coef(0))
+    else:
+        raise _Unsupported("3차 이상 방정식")
+    return ", ".join(f"{poly.var} = {root}" for root in roots)
+
+
+def _exponents_bounded(text: str) -> bool:
+    """SymPy는 정수 거듭제곱을 끝까지 계산하므로 지수 탑("9^9^9")이나 MAX_EXPONENT를 넘는 상수 지수는 넘기지 않습니다."""
+    if "^" not in text and "**" not in text:
+        return True
+    try:
+        tree = ast.parse(text.replace("^", "**").replace("=", "-"), mode="eval")
+    except (SyntaxError, ValueError, RecursionError):
+        return False
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow)):
+            continue
+        exponent = node.right
+        if any(isinstance(sub, ast.BinOp) and isinstance(sub.op, ast.Pow) for sub in ast.walk(exponent)):
+            return False
+        try:
+            value = _to_poly(exponent)
+        except _Unsupported:
+            continue  # 변수나 함수가 들어간 지수 ("2^x = 8")
+        if value.var is None and abs(value.coef(0)) > MAX_EXPONENT:
+            return False
+    return True
+
+
+def _sympy_safe(text: str) -> bool:
+    if not _ALLOWED_CHARS.match(text) or "__" in text:
+        return False
+    if not all(len(name) == 1 or name in SYMPY_FUNCTIONS for name in _IDENTIFIER.findall(text)):
+        return False
+    return _exponents_bounded(text)
+
+
+def _solve_sympy(text: str) -> Optional[str]:
+    try:
+        import sympy
+        from sympy.parsing.sympy_parser import convert_xor, implicit_multiplication_application, parse_expr, standard_transformations
+    except ImportError:
+        return None
+    if not _sympy_safe(text):
+        return None
+
+    transformations = standard_transformations + (implicit_multiplication_application, convert_xor)
+    local_dict = {"ln": sympy.log, "abs": sympy.Abs}
+    sides = text.split("=")
+    try:
+        if len(sides) == 2:
+            lhs, rhs = (parse_expr(side, local_dict=local_dict, transformations=transformations) for side in sides)
+            expr = sympy.simplify(lhs - rhs)
+            symbols = sorted(expr.free_symbols, key=str)
+            if not symbols:
+                return "모든 값이 해입니다." if expr == 0 else "해가 없습니다."
+            # 여러 변수면 이름순 첫 변수에 대해 풉니다. ("x + y = 3" → x = 3 - y)
+            roots = sympy.solve(expr, symbols[0])
+            if not roots:
+                return "해가 없습니다."
+            return ", ".join(f"{symbols[0]} = {root}" for root in roots)
+        if len(sides) != 1:
+            return None
+        expr = sympy.simplify(parse_expr(text, local_dict=local_dict, transformations=transformations))
+    except Exception:
+        # 구문 오류, 지원하지 않는 식 등은 원격 API에 맡깁니다.
+        return None
+    if expr.has(sympy.zoo, sympy.nan):
+        return None
+    if expr.free_symbols or expr.is_Integer:
+        return str(expr)
+    if expr.is_Rational:
+        return f"{expr} (≈ {float(expr):.10g})"
+    approx = sympy.N(expr, 10)
+    return f"{expr} (≈ {approx})" if approx.is_number else str(expr)
+
+
+def _is_bare_variable(text: str) -> bool:
+    """연산자도 등호도 없이 한 글자 이름만 있는 식인지 봅니다. ("what is e" → "e", 되풀이할 답밖에 없음)"""
+    try:
+        node = ast.parse(text, mode="eval").body
+    except SyntaxError:
+        return False
+    return isinstance(node, ast.Name) and (len(node.id) == 1 or node.id not in SYMPY_FUNCTIONS)
+
+
+def _count(name: str) -> None:
+    with _counts_lock:
+        engine_counts[name] += 1
+
+
+def solve_locally(query: str) -> Optional[MathAnswer]:
+    """로컬에서 풀 수 있으면 답을, 아니면 None을 반환합니다. (내장 풀이기 → SymPy 순서)"""
+    text = normalize_query(query)
+    if not text or _is_bare_variable(text):
+        _count("unhandled")
+        return None
+    try:
+        answer = _solve_builtin(text)
+        _count("builtin")
+        return MathAnswer(answer, "builtin")
+    except _Unsupported:
+        pass
+    answer = _solve_sympy(text)
+    if answer is not None:
+        _count("sympy")
+        return MathAnswer(answer, "sympy")
+    _count("unhandled")
+    return None
+
+
+def math_engine_stats() -> Dict[str, int]:
+    with _counts_lock:
+        return {name: engine_counts.get(name, 0) for name in ("builtin", "sympy", "unhandled")}
@@ -0,0 +1,168 @@
+"""
+도구 레지스트리
+여러 예제가 같은 도구를 각자 정의하고, 각자 이름 → 도구 dict를 만들고,
+bind_tools를 부를 때마다 도구 JSON 스키마를 다시 만드는 일을 없앱니다.
+
+- 조회: 이름 → 도구를 dict 하나로 보관합니다. (get / tools, O(1))
+- 그룹: 도구를 스킬 그룹(Computation, Automation, ...)으로 묶고 그룹 설명을 함께 보관합니다.
+- 스키마: 도구의 OpenAI 형식 JSON 스키마를 처음 필요할 때 한 번만 만들고 재사용합니다.
+- 임베딩: 도구 설명 임베딩을 임베딩 모델별로 한 번만 계산합니다. (의미 기반 도구 선택용)
+- 바인딩: bind(llm, names)는 미리 만든 스키마로 bind_tools를 호출하고,
+  같은 모델 + 같은 도구 집합이면 이미 바인딩된 Runnable을 그대로 돌려줍니다.
+
+warm()을 호출하면 워커 시작 시점에 모든 스키마를 미리 만들어 둘 수 있습니다.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+@dataclass(frozen=True)
+class ToolGroup:
+    name: str
+    description: str
+    tool_names: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class ToolEntry:
+    tool: BaseTool
+    group: Optional[str]
+    description: str  # 임베딩/라우팅에 쓰는 한 줄 설명
+
+
+def summary_line(tool: BaseTool) -> str:
+    """도구 설명(docstring)의 첫 문장을 한 줄 설명으로 사용합니다."""
+    for line in (tool.description or "").splitlines():
+        if line.strip():
+            return line.strip()
+    return tool.name
+
+
+class ToolRegistry:
+    def __init__(self):
+        self._entries: Dict[str, ToolEntry] = {}
+        self._groups: Dict[str, ToolGroup] = {}
+        self._schemas: Dict[str, Dict[str, Any]] = {}
+        self._embeddings: Dict[int, Tuple[Embeddings, Dict[str, List[float]]]] = {}
+        self._bound: Dict[Tuple[int, Tuple[str, ...], str], Tuple[BaseChatModel, Runnable]] = {}
+        self._lock = threading.RLock()
+
+    # ─── Registration ───────────────────────────────────────────────────────
+    def add_group(self, name: str, description: str) -> None:
+        with self._lock:
+            group = self._groups.get(name)
+            self._groups[name] = ToolGroup(name, description, group.tool_names if group else ())
+
+    def register(self, tool: BaseTool, group: Optional[str] = None, description: Optional[str] = None) -> BaseTool:
+        """도구를 등록합니다. 같은 도구를 다시 등록하면 무시하고, 다른 도구가 같은 이름을 쓰면 ValueError를 발생시킵니다."""
+        with self._lock:
+            existing = self._entries.get(tool.name)
+            if existing is not None:
+                if existing.tool is not tool:
+                    raise ValueError(f"이미 다른 도구가 '{tool.name}' 이름으로 등록되어 있습니다.")
+                return tool
+            if group is not None:
+                if group not in self._groups:
+                    raise ValueError(f"알 수 없는 도구 그룹입니다: {group} (먼저 add_group으로 등록하세요)")
+                current = self._groups[group]
+                self._groups[group] = ToolGroup(current.name, current.description, current.tool_names + (tool.name,))
+            self._entries[tool.name] = ToolEntry(tool, group, description or summary_line(tool))
+            return tool
+
+    # ─── Lookup ─────────────────────────────────────────────────────────────
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def get(self, name: str) -> Optional[BaseTool]:
+        entry = self._entries.get(name)
+        return entry.tool if entry is not None else None
+
+    def entry(self, name: str) -> ToolEntry:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"등록되지 않은 도구입니다: {name}") from None
+
+    def tools(self, names: Optional[Iterable[str]] = None) -> List[BaseTool]:
+        """이름 순서대로 도구를 돌려줍니다. names가 없으면 등록된 모든 도구입니다."""
+        return [self.entry(name).tool for name in (self._entries if names is None else names)]
+
+    def groups(self) -> Dict[str, ToolGroup]:
+        return dict(self._groups)
+
+    def group_tools(self, group: str) -> List[BaseTool]:
+        return self.tools(self._groups[group].tool_names)
+
+    def descriptions(self, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        return {name: self.entry(name).description for name in (self._entries if names is None else names)}
+
+    # ─── Schemas / Embeddings ───────────────────────────────────────────────
+    def schema(self, name: str) -> Dict[str, Any]:
+        """도구의 OpenAI 형식 JSON 스키마입니다. (프로세스에서 도구마다 한 번만 생성)"""
+        schema = self._schemas.get(name)
+        if schema is None:
+            tool = self.entry(name).tool
+            with self._lock:
+                schema = self._schemas.get(name)
+                if schema is None:
+                    schema = self._schemas[name] = convert_to_openai_tool(tool)
+        return schema
+
+    def schemas(self, names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        return [self.schema(name) for name in (self._entries if names is None else names)]
+
+    def embeddings_for(self, embeddings: Embeddings, names: Optional[Iterable[str]] = None) -> Dict[str, List[float]]:
+        """도구 한 줄 설명의 임베딩입니다. 임베딩 모델마다 아직 계산하지 않은 도구만 한 번의 배치로 계산합니다."""
+        names = list(self._entries if names is None else names)
+        with self._lock:
+            _, cached = self._embeddings.setdefault(id(embeddings), (embeddings, {}))
+            missing = [name for name in names if name not in cached]
+            if missing:
+                vectors = embeddings.embed_documents([self.entry(name).description for name in missing])
+                cached.update(zip(missing, vectors))
+            return {name: cached[name] for name in names}
+
+    def warm(self) -> None:
+        """등록된 모든 도구의 스키마를 미리 만듭니다."""
+        self.schemas()
+
+    # ─── Binding ────────────────────────────────────────────────────────────
+    def bind(self, llm: BaseChatModel, names: Optional[Sequence[str]] = None, **kwargs: Any) -> Runnable:
+        """
+        미리 만든 스키마로 도구를 바인딩한 모델을 돌려줍니다.
+        같은 모델 객체 + 같은 도구 목록 + 같은 옵션이면 이전에 바인딩한 결과를 재사용합니다.
+        """
+        names = tuple(self._entries if names is None else names)
+        key = (id(llm), names, repr(sorted(kwargs.items())))
+        with self._lock:
+            cached = self._bound.get(key)
+            # 모델 객체를 함께 보관하므로 키의 id가 다른 객체에 재사용되지 않습니다.
+            if cached is not None and cached[0] is llm:
+                return cached[1]
+        bound = llm.bind_tools(self.schemas(names), **kwargs)
+        with self._lock:
+            self._bound[key] = (llm, bound)
+        return bound
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "tools": len(self._entries),
+                "groups": len(self._groups),
+                "schemas": len(self._schemas),
+                "embedded": sum(len(vectors) for _, vectors in self._embeddings.values()),
+                "bound_sets": len(self._bound),
+            }
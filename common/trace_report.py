@@ -0,0 +1,156 @@
+"""
+트레이스 리포트
+common/tracing.py가 남긴 JSONL 파일을 읽어 요청별 워터폴과 구간별 집계 표를 출력합니다.
+
+실행: python -m common.trace_report [.cache/traces.jsonl] [--last 3] [--trace TRACE_ID] [--top 15]
+
+- 워터폴: trace 안의 span을 부모-자식 순서로 들여쓰고, 시작 시점과 길이를 막대로 표시합니다.
+- 핫 패스: (종류, 이름)별 호출 수, 합계/평균/p50/p95/최대 시간, 전체 요청 시간 대비 비율을 합계가 큰 순서로 보여 줍니다.
+- 모델/도구: LLM 모델별 토큰 수와 캐시 적중률, 도구별 캐시 적중률을 보여 줍니다.
+"""
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_TRACE_FILE = Path(__file__).resolve().parent.parent / ".cache" / "traces.jsonl"
+BAR_WIDTH = 40
+
+
+def load_spans(path: Path) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def group_traces(spans: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        traces[span["trace_id"]].append(span)
+    # 먼저 시작한 trace가 앞에 오도록 정렬합니다.
+    return dict(sorted(traces.items(), key=lambda item: min(s["start"] for s in item[1])))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _label(span: Dict[str, Any]) -> str:
+    attributes = span.get("attributes") or {}
+    extras = []
+    if attributes.get("cache_hit"):
+        extras.append("cache")
+    if attributes.get("prompt_tokens") is not None:
+        extras.append(f"{attributes['prompt_tokens']}→{attributes.get('completion_tokens')} tok")
+    if span.get("status") == "error":
+        extras.append("ERROR")
+    return span["name"] + (f" [{', '.join(extras)}]" if extras else "")
+
+
+def print_waterfall(trace_id: str, spans: List[Dict[str, Any]]) -> None:
+    start = min(s["start"] for s in spans)
+    end = max(s.get("end") or s["start"] for s in spans)
+    total = max(end - start, 1e-9)
+    children: Dict[Optional[str], List[Dict[str, Any]]] = defaultdict(list)
+    span_ids = {s["span_id"] for s in spans}
+    for span in spans:
+        # 부모 span이 파일에 없으면(다른 프로세스 등) 최상위로 취급합니다.
+        parent = span.get("parent_id") if span.get("parent_id") in span_ids else None
+        children[parent].append(span)
+
+    print(f"\ntrace {trace_id}  ({total * 1000:.1f} ms, span {len(spans)}개)")
+    print(f"  {'span':<48} {'start ms':>9} {'dur ms':>9}  timeline")
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in sorted(children.get(parent, []), key=lambda s: s["start"]):
+            offset = span["start"] - start
+            duration = (span.get("duration_ms") or 0.0) / 1000
+            left = int(offset / total * BAR_WIDTH)
+            width = max(1, int(round(duration / total * BAR_WIDTH)))
+            bar = " " * left + "█" * min(width, BAR_WIDTH - left)
+            name = ("  " * depth + _label(span))[:48]
+            print(f"  {name:<48} {offset * 1000:>9.1f} {duration * 1000:>9.1f}  |{bar:<{BAR_WIDTH}}|")
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+
+
+def print_hot_paths(spans: List[Dict[str, Any]], top: int) -> None:
+    durations: Dict[tuple, List[float]] = defaultdict(list)
+    for span in spans:
+        durations[(span["kind"], span["name"])].append(span.get("duration_ms") or 0.0)
+    request_total = sum(span.get("duration_ms") or 0.0 for span in spans if not span.get("parent_id"))
+
+    rows = sorted(durations.items(), key=lambda item: sum(item[1]), reverse=True)[:top]
+    print(f"\n핫 패스 (합계 시간 순, 상위 {top}개)")
+    print(f"  {'kind':<8} {'name':<36} {'count':>6} {'total ms':>10} {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8} {'share':>7}")
+    for (kind, name), values in rows:
+        values.sort()
+        total = sum(values)
+        share = f"{total / request_total:>6.1%}" if request_total else f"{'-':>6}"
+        print(
+            f"  {kind:<8} {name[:36]:<36} {len(values):>6} {total:>10.1f} {total / len(values):>8.1f} "
+            f"{percentile(values, 50):>8.1f} {percentile(values, 95):>8.1f} {values[-1]:>8.1f} {share:>7}"
+        )
+
+
+def print_model_and_tool_tables(spans: List[Dict[str, Any]]) -> None:
+    models: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    tools: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for span in spans:
+        attributes = span.get("attributes") or {}
+        if span["kind"] == "llm":
+            row = models[attributes.get("model") or "unknown"]
+            row["prompt_tokens"] += attributes.get("prompt_tokens") or 0
+            row["completion_tokens"] += attributes.get("completion_tokens") or 0
+        elif span["kind"] == "tool":
+            row = tools[attributes.get("tool") or span["name"]]
+        else:
+            continue
+        row["calls"] += 1
+        row["cache_hits"] += 1 if attributes.get("cache_hit") else 0
+        row["total_ms"] += span.get("duration_ms") or 0.0
+
+    if models:
+        print("\nLLM 모델별")
+        print(f"  {'model':<36} {'calls':>6} {'prompt tok':>11} {'compl tok':>10} {'cache hit':>10} {'total ms':>10}")
+        for model, row in sorted(models.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+            print(
+                f"  {model[:36]:<36} {int(row['calls']):>6} {int(row['prompt_tokens']):>11} "
+                f"{int(row['completion_tokens']):>10} {row['cache_hits'] / row['calls']:>10.1%} {row['total_ms']:>10.1f}"
+            )
+    if tools:
+        print("\n도구별")
+        print(f"  {'tool':<36} {'calls':>6} {'cache hit':>10} {'total ms':>10}")
+        for tool, row in sorted(tools.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+            print(f"  {tool[:36]:<36} {int(row['calls']):>6} {row['cache_hits'] / row['calls']:>10.1%} {row['total_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default=str(DEFAULT_TRACE_FILE), help="span JSONL 파일")
+    parser.add_argument("--last", type=int, default=3, help="워터폴로 보여 줄 최근 trace 수 (0이면 생략)")
+    parser.add_argument("--trace", help="이 trace ID만 워터폴로 출력")
+    parser.add_argument("--top", type=int, default=15, help="핫 패스 표의 행 수")
+    args = parser.parse_args()
+
+    spans = load_spans(Path(args.path))
+    traces = group_traces(spans)
+    print(f"{args.path}: trace {len(traces)}개, span {len(spans)}개")
+
+    if args.trace:
+        selected = {trace_id: s for trace_id, s in traces.items() if trace_id.startswith(args.trace)}
+    else:
+        selected = dict(list(traces.items())[-args.last:]) if args.last > 0 else {}
+    for trace_id, trace_spans in selected.items():
+        print_waterfall(trace_id, trace_spans)
+
+    print_hot_paths(spans, args.top)
+    print_model_and_tool_tables(spans)
+
+
+if __name__ == "__main__":
+    main()
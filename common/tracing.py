@@ -0,0 +1,309 @@
+"""
+트레이싱 / 프로파일링
+그래프 노드, LLM 호출, 도구 호출을 시간 측정 span으로 기록합니다.
+span은 trace_id/parent_id로 이어지므로 요청 하나(trace)의 실행 순서와 시간 분포를 그대로 복원할 수 있습니다.
+
+- 노드: traced_node("name", fn)으로 감싸서 add_node에 넘깁니다. (동기/비동기 노드 모두 지원)
+- LLM: create_chat_model()이 만든 모델에 TracingCallbackHandler가 붙어 모델 이름, 토큰 수, 캐시 적중 여부를 기록합니다.
+- 도구: 공용 ToolExecutor와 MCP 세션 관리자가 도구 이름, 캐시 적중 여부를 기록합니다.
+- 요청 단위: `with get_tracer().span("request", kind="request"):`로 감싸면 그 안의 span이 하나의 trace가 됩니다.
+
+환경 변수 (둘 다 없으면 트레이싱은 꺼져 있고 비용이 거의 없습니다)
+- TRACE_FILE: span을 한 줄에 하나씩 JSON으로 추가할 파일 경로 ("default"이면 .cache/traces.jsonl)
+- TRACE_OTLP_ENDPOINT: OTLP/HTTP(JSON) 수집기 주소 (예: http://localhost:4318/v1/traces)
+- TRACE_SERVICE_NAME: OTLP resource의 service.name (기본: ai-agent-mastery)
+
+결과는 `python -m common.trace_report`로 요청별 워터폴과 구간별 집계 표로 볼 수 있습니다.
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from common.usage import attribution
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_TRACE_FILE = REPO_ROOT / ".cache" / "traces.jsonl"
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str  # "request" | "node" | "llm" | "tool"
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    end: Optional[float] = None
+    duration_ms: Optional[float] = None
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+# ─── Exporters ──────────────────────────────────────────────────────────────
+class JSONLExporter:
+    def __init__(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(asdict(span), ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)}
+
+
+class OTLPExporter:
+    """span을 모아서 OTLP/HTTP JSON으로 수집기에 보냅니다. (외부 의존성 없이 urllib 사용)"""
+
+    def __init__(self, endpoint: str, service_name: str = "ai-agent-mastery", batch_size: int = 100, interval: float = 2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self._pending: List[Span] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._pending.append(span)
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+
+    def _run(self, interval: float) -> None:
+        while not self._stopped:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            spans, self._pending = self._pending, []
+        if not spans:
+            return
+        body = json.dumps(self._payload(spans)).encode("utf-8")
+        request = urllib.request.Request(self.endpoint, data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError as e:
+            logger.warning("OTLP 수집기로 span %d개를 보내지 못했습니다: %s", len(spans), e)
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        otlp_spans = []
+        for span in spans:
+            attributes = {"span.kind": span.kind, **span.attributes}
+            otlp_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(int(span.start * 1e9)),
+                "endTimeUnixNano": str(int((span.end or span.start) * 1e9)),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+                "status": {"code": 2, "message": span.error or ""} if span.status == "error" else {"code": 1},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            otlp_spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "common.tracing"}, "spans": otlp_spans}],
+            }]
+        }
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+
+# ─── Tracer ─────────────────────────────────────────────────────────────────
+class Tracer:
+    def __init__(self, exporters: Optional[List[Any]] = None):
+        self.exporters = exporters or []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def start_span(self, name: str, kind: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        parent = parent if parent is not None else _current_span.get()
+        span = Span(
+            name=name,
+            kind=kind,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start=time.time(),
+        )
+        span.set(**attributes)
+        return span
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        span.end = time.time()
+        span.duration_ms = (span.end - span.start) * 1000
+        if error is not None:
+            span.status, span.error = "error", f"{type(error).__name__}: {error}"
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+        """span을 열고 그 안에서 시작하는 span의 부모로 설정합니다. 트레이싱이 꺼져 있으면 None을 돌려줍니다."""
+        if not self.enabled:
+            yield None
+            return
+        span = self.start_span(name, kind, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            _current_span.reset(token)
+
+    def shutdown(self) -> None:
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """환경 변수로 설정한 전역 트레이서를 반환합니다."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                exporters: List[Any] = []
+                trace_file = os.getenv("TRACE_FILE")
+                if trace_file:
+                    exporters.append(JSONLExporter(DEFAULT_TRACE_FILE if trace_file == "default" else trace_file))
+                endpoint = os.getenv("TRACE_OTLP_ENDPOINT")
+                if endpoint:
+                    exporters.append(OTLPExporter(endpoint, os.getenv("TRACE_SERVICE_NAME", "ai-agent-mastery")))
+                _tracer = Tracer(exporters)
+                atexit.register(_tracer.shutdown)
+    return _tracer
+
+
+def traced_node(name: str, fn: Callable) -> Callable:
+    """
+    LangGraph 노드 함수를 node span으로 감쌉니다. (시그니처는 그대로 유지)
+    노드 안의 LLM 호출 토큰 사용량도 이 노드로 집계됩니다. (common/usage.py)
+    """
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with get_tracer().span(name, kind="node", node=name), attribution(node=name):
+                return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with get_tracer().span(name, kind="node", node=name), attribution(node=name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+# ─── LangChain Callbacks ────────────────────────────────────────────────────
+def _model_name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> Optional[str]:
+    params = kwargs.get("invocation_params") or {}
+    metadata = kwargs.get("metadata") or {}
+    return (
+        params.get("model_name") or params.get("model") or metadata.get("ls_model_name")
+        or ((serialized or {}).get("kwargs") or {}).get("model_name")
+    )
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LLM 호출을 llm span으로 기록합니다. (시작 시점의 현재 span을 부모로 사용)"""
+
+    run_inline = True
+
+    def __init__(self, tracer: Optional[Tracer] = None):
+        self.tracer = tracer or get_tracer()
+        self._spans: Dict[UUID, Span] = {}
+
+    def _start(self, serialized: Optional[Dict[str, Any]], run_id: UUID, **kwargs: Any) -> None:
+        if self.tracer.enabled:
+            model = _model_name(serialized, kwargs)
+            self._spans[run_id] = self.tracer.start_span(f"llm:{model or 'unknown'}", "llm", model=model)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(serialized, run_id, **kwargs)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(serialized, run_id, **kwargs)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        prompt_tokens = completion_tokens = None
+        cache_hit = False
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+        if message is not None:
+            usage = getattr(message, "usage_metadata", None) or {}
+            prompt_tokens, completion_tokens = usage.get("input_tokens"), usage.get("output_tokens")
+            cache_hit = bool((message.response_metadata or {}).get("cache_hit"))
+        if prompt_tokens is None:
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens, completion_tokens = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cache_hit=cache_hit)
+        self.tracer.end_span(span)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            self.tracer.end_span(span, error)
@@ -0,0 +1,254 @@
+"""
+토큰 / 비용 집계와 요청별 토큰 예산
+ManagedChatModel을 지나가는 모든 LLM 호출의 토큰 사용량을 기록합니다.
+
+- 사용량: 모델이 돌려준 usage_metadata를 우선 사용하고, 없으면 글자 수 / 4로 추정합니다. (estimated로 표시)
+- 집계: 세션(request_scope), 그래프 노드(traced_node), 도구(ToolExecutor), 모델별로 합산합니다.
+  도구 결과는 다음 LLM 호출의 프롬프트에 들어가므로 도구별 출력 토큰(추정)도 함께 집계합니다.
+- 비용: MODEL_PRICES(100만 토큰당 USD)에 있는 모델만 계산합니다. (대략적인 값)
+- 예산: request_scope(budget=N)로 요청 하나가 쓸 수 있는 토큰 수를 정합니다.
+  호출 전에 프롬프트 토큰 추정치 + 응답 토큰 예약분(max_tokens, 없으면 DEFAULT_COMPLETION_TOKENS)이 남은 예산을 넘으면
+  "truncate"는 시스템 메시지와 최근 메시지를 남기고 오래된 대화부터 잘라내고,
+  "abort"는 호출하지 않고 TokenBudgetExceeded를 발생시킵니다.
+
+환경 변수
+- REQUEST_TOKEN_BUDGET: 요청별 기본 토큰 예산 (기본: 제한 없음)
+- REQUEST_TOKEN_BUDGET_MODE: "truncate" 또는 "abort" (기본: truncate)
+"""
+import contextvars
+import math
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from common.rate_limit import DEFAULT_COMPLETION_TOKENS
+
+# 100만 토큰당 (입력, 출력) 가격(USD). 공개 가격표 기준의 대략적인 값입니다.
+MODEL_PRICES: Dict[str, tuple] = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "gpt-5-mini": (0.25, 2.00),
+}
+
+# 메시지마다 붙는 역할/구분자 토큰 추정치
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class TokenBudgetExceeded(RuntimeError):
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def _content_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        text = content
+    else:
+        text = " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        text += " ".join(f"{call['name']}{call['args']}" for call in tool_calls)
+    return text
+
+
+def estimate_message_tokens(messages: Sequence[BaseMessage]) -> int:
+    return sum(estimate_tokens(_content_text(m)) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+# ─── Attribution ────────────────────────────────────────────────────────────
+@dataclass
+class RequestBudget:
+    max_tokens: int
+    mode: str = "truncate"
+    used: int = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.max_tokens - self.used
+
+
+@dataclass(frozen=True)
+class _Scope:
+    session: Optional[str] = None
+    node: Optional[str] = None
+    tool: Optional[str] = None
+    budget: Optional[RequestBudget] = None
+
+
+_scope: contextvars.ContextVar[_Scope] = contextvars.ContextVar("usage_scope", default=_Scope())
+
+
+@contextmanager
+def attribution(**fields: Any) -> Iterator[None]:
+    """이 블록 안의 LLM 호출을 주어진 node/tool에 귀속시킵니다."""
+    current = _scope.get()
+    token = _scope.set(_Scope(**{**current.__dict__, **{k: v for k, v in fields.items() if v is not None}}))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+@contextmanager
+def request_scope(session: Optional[str] = None, budget: Optional[int] = None, mode: Optional[str] = None) -> Iterator[Optional[RequestBudget]]:
+    """요청 하나의 범위를 정합니다. budget이 없으면 REQUEST_TOKEN_BUDGET을 사용합니다."""
+    if budget is None and os.getenv("REQUEST_TOKEN_BUDGET"):
+        budget = int(os.environ["REQUEST_TOKEN_BUDGET"])
+    mode = mode or os.getenv("REQUEST_TOKEN_BUDGET_MODE", "truncate")
+    if mode not in ("truncate", "abort"):
+        raise ValueError(f"알 수 없는 예산 초과 처리 방식입니다: {mode}")
+    request_budget = RequestBudget(budget, mode) if budget is not None else None
+    token = _scope.set(_Scope(session=session, budget=request_budget))
+    try:
+        yield request_budget
+    finally:
+        _scope.reset(token)
+
+
+# ─── Budget ─────────────────────────────────────────────────────────────────
+def _message_units(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """도구 호출 AIMessage와 그 결과 ToolMessage들을 하나의 단위로 묶습니다. (잘라낼 때 짝이 깨지지 않도록)"""
+    units: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, ToolMessage) and units and isinstance(units[-1][0], AIMessage) and units[-1][0].tool_calls:
+            units[-1].append(message)
+        else:
+            units.append([message])
+    return units
+
+
+def truncate_messages(messages: Sequence[BaseMessage], max_tokens: int) -> List[BaseMessage]:
+    """앞쪽 시스템 메시지는 남기고, 오래된 대화부터 잘라 max_tokens 안에 들어오게 합니다. (마지막 단위는 항상 유지)"""
+    leading = 0
+    while leading < len(messages) and messages[leading].type == "system":
+        leading += 1
+    system, units = list(messages[:leading]), _message_units(messages[leading:])
+    while len(units) > 1 and estimate_message_tokens(system + [m for unit in units for m in unit]) > max_tokens:
+        units.pop(0)
+    return system + [m for unit in units for m in unit]
+
+
+def enforce_budget(messages: List[BaseMessage], max_tokens: Optional[int] = None) -> List[BaseMessage]:
+    """
+    현재 요청 예산에 맞게 메시지를 그대로 두거나 잘라내거나, 호출을 중단합니다.
+    응답도 예산을 쓰므로 max_tokens(없으면 DEFAULT_COMPLETION_TOKENS)만큼 먼저 떼어 두고 프롬프트와 비교합니다.
+    """
+    budget = _scope.get().budget
+    if budget is None:
+        return messages
+    reserve = max_tokens or DEFAULT_COMPLETION_TOKENS
+    available = budget.remaining - reserve
+    estimate = estimate_message_tokens(messages)
+    if estimate <= available:
+        return messages
+    if budget.mode == "truncate":
+        truncated = truncate_messages(messages, available)
+        if estimate_message_tokens(truncated) <= available:
+            usage_tracker.record_truncation(len(messages) - len(truncated))
+            return truncated
+    raise TokenBudgetExceeded(
+        f"요청 토큰 예산을 초과합니다: 예상 프롬프트 {estimate} + 응답 예약 {reserve} 토큰, "
+        f"남은 예산 {budget.remaining}/{budget.max_tokens} 토큰"
+    )
+
+
+# ─── Accounting ─────────────────────────────────────────────────────────────
+@dataclass
+class _Totals:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    estimated_calls: int = 0
+    cost_usd: float = 0.0
+    tool_output_tokens: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.__dict__, "total_tokens": self.prompt_tokens + self.completion_tokens, "cost_usd": round(self.cost_usd, 6)}
+
+
+@dataclass
+class UsageTracker:
+    totals: _Totals = field(default_factory=_Totals)
+    by_session: Dict[str, _Totals] = field(default_factory=lambda: defaultdict(_Totals))
+    by_node: Dict[str, _Totals] = field(default_factory=lambda: defaultdict(_Totals))
+    by_tool: Dict[str, _Totals] = field(default_factory=lambda: defaultdict(_Totals))
+    by_model: Dict[str, _Totals] = field(default_factory=lambda: defaultdict(_Totals))
+    truncated_messages: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record_llm(self, model: Optional[str], messages: Sequence[BaseMessage], response: BaseMessage) -> None:
+        usage = getattr(response, "usage_metadata", None) or {}
+        estimated = not usage
+        prompt_tokens = usage.get("input_tokens") if usage else estimate_message_tokens(messages)
+        completion_tokens = usage.get("output_tokens") if usage else estimate_tokens(_content_text(response))
+        input_price, output_price = MODEL_PRICES.get(model or "", (0.0, 0.0))
+        cost = (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+        scope = _scope.get()
+        with self._lock:
+            if scope.budget is not None:
+                scope.budget.used += prompt_tokens + completion_tokens
+            for totals in self._targets(scope, model):
+                totals.calls += 1
+                totals.prompt_tokens += prompt_tokens
+                totals.completion_tokens += completion_tokens
+                totals.estimated_calls += int(estimated)
+                totals.cost_usd += cost
+
+    def record_tool_output(self, tool: str, output: Any) -> None:
+        tokens = estimate_tokens(output if isinstance(output, str) else str(output))
+        with self._lock:
+            self.by_tool[tool].tool_output_tokens += tokens
+
+    def record_truncation(self, dropped: int) -> None:
+        with self._lock:
+            self.truncated_messages += dropped
+
+    def _targets(self, scope: _Scope, model: Optional[str]) -> List[_Totals]:
+        targets = [self.totals, self.by_model[model or "unknown"]]
+        if scope.session:
+            targets.append(self.by_session[scope.session])
+        if scope.node:
+            targets.append(self.by_node[scope.node])
+        if scope.tool:
+            targets.append(self.by_tool[scope.tool])
+        return targets
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total": self.totals.as_dict(),
+                "truncated_messages": self.truncated_messages,
+                **{
+                    name: {key: totals.as_dict() for key, totals in table.items()}
+                    for name, table in (
+                        ("by_session", self.by_session),
+                        ("by_node", self.by_node),
+                        ("by_tool", self.by_tool),
+                        ("by_model", self.by_model),
+                    )
+                },
+            }
+
+    def report(self) -> str:
+        summary = self.summary()
+        total = summary["total"]
+        lines = [
+            f"토큰 사용량: 호출 {total['calls']}회, 입력 {total['prompt_tokens']} / 출력 {total['completion_tokens']} 토큰, "
+            f"추정 {total['estimated_calls']}회, 비용 약 ${total['cost_usd']:.6f}, 잘라낸 메시지 {summary['truncated_messages']}개"
+        ]
+        for name, label in (("by_session", "세션"), ("by_node", "노드"), ("by_tool", "도구"), ("by_model", "모델")):
+            for key, row in sorted(summary[name].items(), key=lambda item: item[1]["total_tokens"], reverse=True):
+                extra = f", 도구 출력 {row['tool_output_tokens']} 토큰" if name == "by_tool" else ""
+                lines.append(f"  {label} {key}: 호출 {row['calls']}회, {row['total_tokens']} 토큰{extra}")
+        return "\n".join(lines)
+
+
+usage_tracker = UsageTracker()